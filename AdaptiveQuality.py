@@ -0,0 +1,221 @@
+# AdaptiveQuality.py
+import json
+import os
+import platform
+import time
+
+# Operating points from cheapest (0) to best quality. inference_width of 0
+# means "run detection on the full camera frame".
+QUALITY_LEVELS = [
+    {"inference_width": 256, "model_complexity": 0, "frame_skip": 1, "detection_interval": 3, "enable_animations": False},
+    {"inference_width": 320, "model_complexity": 0, "frame_skip": 1, "detection_interval": 2, "enable_animations": False},
+    {"inference_width": 320, "model_complexity": 0, "frame_skip": 0, "detection_interval": 2, "enable_animations": False},
+    {"inference_width": 480, "model_complexity": 0, "frame_skip": 0, "detection_interval": 1, "enable_animations": True},
+    {"inference_width": 640, "model_complexity": 0, "frame_skip": 0, "detection_interval": 1, "enable_animations": True},
+    {"inference_width": 0, "model_complexity": 0, "frame_skip": 0, "detection_interval": 1, "enable_animations": True},
+    {"inference_width": 0, "model_complexity": 1, "frame_skip": 0, "detection_interval": 1, "enable_animations": True},
+]
+
+# Starting level for each UniversalCompatibility tier when nothing is persisted
+TIER_START_LEVELS = {"low_end": 1, "medium": 3, "high_end": 5}
+
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".beyondthebrush", "quality_profile.json")
+
+
+def machine_id():
+    """Identify this machine for per-machine persisted settings"""
+    return f"{platform.node()}|{platform.machine()}|{platform.processor()}"
+
+
+class AdaptiveQualityController:
+    """Closed-loop controller that steps quality up/down to hold a target FPS"""
+
+    def __init__(self, target_fps, system_type="medium", start_level=None, levels=None,
+                 profile_path=PROFILE_PATH,
+                 down_margin=0.10, up_margin=0.30, down_after=20, up_after=150,
+                 cooldown_frames=60, smoothing=0.1):
+        self.levels = levels or QUALITY_LEVELS
+        self.frame_budget = 1.0 / target_fps
+        self.profile_path = profile_path
+        self.down_margin = down_margin  # Step down above budget * (1 + down_margin)
+        self.up_margin = up_margin  # Step up below budget * (1 - up_margin)
+        self.down_after = down_after  # Consecutive slow frames before stepping down
+        self.up_after = up_after  # Consecutive fast frames before stepping up
+        self.cooldown_frames = cooldown_frames
+        self.smoothing = smoothing
+
+        if start_level is None:
+            start_level = TIER_START_LEVELS.get(system_type, len(self.levels) // 2)
+        self.level = self.load_level(start_level)
+        self.avg_frame_time = None
+        self._slow_frames = 0
+        self._fast_frames = 0
+        self._cooldown = cooldown_frames
+        self._upgrade_block = 0
+        self._upgrade_backoff = up_after
+        self._last_upgrade_frame = None
+        self._frame = 0
+        self._dirty = False
+        self._last_persist = time.monotonic()
+
+        print(f"Adaptive quality starting at level {self.level}: {self.current}")
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    def load_level(self, default_level):
+        """Load the persisted operating point for this machine"""
+        try:
+            if os.path.exists(self.profile_path):
+                with open(self.profile_path, 'r') as f:
+                    profile = json.load(f)
+                level = profile.get(machine_id(), {}).get('level')
+                if isinstance(level, int) and 0 <= level < len(self.levels):
+                    return level
+        except Exception as e:
+            print(f"Error loading quality profile: {e}")
+        return max(0, min(default_level, len(self.levels) - 1))
+
+    def save_level(self):
+        """Persist the current operating point for the next launch"""
+        try:
+            profile = {}
+            if os.path.exists(self.profile_path):
+                with open(self.profile_path, 'r') as f:
+                    profile = json.load(f)
+            profile[machine_id()] = {
+                'level': self.level,
+                'settings': self.current,
+                'avg_frame_ms': round((self.avg_frame_time or 0) * 1000.0, 2),
+                'updated': time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            os.makedirs(os.path.dirname(self.profile_path), exist_ok=True)
+            with open(self.profile_path, 'w') as f:
+                json.dump(profile, f, separators=(',', ':'))
+            self._dirty = False
+        except Exception as e:
+            print(f"Error saving quality profile: {e}")
+
+    def update(self, frame_time):
+        """Feed one frame's busy time (seconds); returns the new settings on a level change"""
+        self._frame += 1
+        if self.avg_frame_time is None:
+            self.avg_frame_time = frame_time
+        else:
+            self.avg_frame_time += self.smoothing * (frame_time - self.avg_frame_time)
+
+        if self._upgrade_block > 0:
+            self._upgrade_block -= 1
+        if self._cooldown > 0:
+            # Let the pipeline settle after a change before judging it
+            self._cooldown -= 1
+            return None
+
+        if self.avg_frame_time > self.frame_budget * (1 + self.down_margin):
+            self._slow_frames += 1
+            self._fast_frames = 0
+        elif self.avg_frame_time < self.frame_budget * (1 - self.up_margin):
+            self._fast_frames += 1
+            self._slow_frames = 0
+        else:
+            # Inside the dead band - hold the current level
+            self._slow_frames = 0
+            self._fast_frames = 0
+
+        if self._slow_frames >= self.down_after and self.level > 0:
+            # An upgrade that immediately turned out too slow blocks further upgrades for longer
+            if (self._last_upgrade_frame is not None and
+                    self._frame - self._last_upgrade_frame < self.up_after * 2):
+                self._upgrade_backoff = min(self._upgrade_backoff * 2, self.up_after * 16)
+                self._upgrade_block = self._upgrade_backoff
+            return self._change_level(-1)
+
+        if (self._fast_frames >= self.up_after and self._upgrade_block == 0 and
+                self.level < len(self.levels) - 1):
+            self._last_upgrade_frame = self._frame
+            return self._change_level(1)
+
+        # Persist the operating point at most once a minute
+        if self._dirty and time.monotonic() - self._last_persist > 60:
+            self._last_persist = time.monotonic()
+            self.save_level()
+        return None
+
+    def _change_level(self, step):
+        self.level += step
+        self._slow_frames = 0
+        self._fast_frames = 0
+        self._cooldown = self.cooldown_frames
+        self._dirty = True
+        print(f"Adaptive quality {'down' if step < 0 else 'up'} to level {self.level} "
+              f"(avg frame {self.avg_frame_time * 1000.0:.1f} ms): {self.current}")
+        return self.current
+
+    def close(self):
+        """Persist the operating point reached in this session"""
+        self.save_level()
+
+
+class IdleModeController:
+    """Low-power state machine: slow detection-only scanning while no hand is present"""
+    ACTIVE = "active"
+    IDLE = "idle"
+
+    def __init__(self, active_fps, idle_fps=10, idle_after=3.0, idle_inference_width=256):
+        self.active_frame_time = 1.0 / active_fps
+        self.idle_frame_time = 1.0 / idle_fps
+        self.idle_after = idle_after  # Seconds without a hand before going idle
+        self.idle_inference_width = idle_inference_width
+        self.state = self.ACTIVE
+        self.idle_entries = 0
+        self.idle_seconds = 0.0
+        self.busy_ms = {self.ACTIVE: None, self.IDLE: None}  # Smoothed busy time per mode
+        self._last_hand_time = time.monotonic()
+        self._idle_since = None
+
+    @property
+    def is_idle(self):
+        return self.state == self.IDLE
+
+    @property
+    def frame_time(self):
+        return self.idle_frame_time if self.is_idle else self.active_frame_time
+
+    def update(self, hand_present, busy=False):
+        """Advance the state machine once per frame; returns the current state"""
+        now = time.monotonic()
+        if hand_present or busy:
+            self._last_hand_time = now
+            if self.is_idle:
+                # Wake in the same frame the hand shows up
+                self.idle_seconds += now - self._idle_since
+                self._idle_since = None
+                self.state = self.ACTIVE
+                print("Hand detected - leaving idle mode")
+        elif not self.is_idle and now - self._last_hand_time > self.idle_after:
+            self.state = self.IDLE
+            self._idle_since = now
+            self.idle_entries += 1
+            print("No hand for a while - entering idle mode")
+        return self.state
+
+    def record_frame(self, busy_time):
+        """Track the smoothed busy time of frames in the current mode"""
+        busy_ms = busy_time * 1000.0
+        previous = self.busy_ms[self.state]
+        self.busy_ms[self.state] = busy_ms if previous is None else previous + 0.1 * (busy_ms - previous)
+
+    def savings(self):
+        """Fraction of per-second frame work saved while idle (0 when unknown)"""
+        active, idle = self.busy_ms[self.ACTIVE], self.busy_ms[self.IDLE]
+        if not active or idle is None:
+            return 0.0
+        active_load = active / self.active_frame_time
+        idle_load = idle / self.idle_frame_time
+        return max(0.0, 1.0 - idle_load / active_load)
+
+    def total_idle_seconds(self):
+        if self._idle_since is not None:
+            return self.idle_seconds + time.monotonic() - self._idle_since
+        return self.idle_seconds
@@ -0,0 +1,145 @@
+# CameraCapture.py
+import cv2
+import time
+
+# Pixel formats to try, in order. Most USB webcams only reach 30+ FPS at
+# 720p with MJPG; YUYV is uncompressed and limited by USB bandwidth.
+FOURCC_PREFERENCES = ("MJPG", "YUYV")
+
+
+def fourcc_to_str(value):
+    """Decode a CAP_PROP_FOURCC value into its four characters"""
+    value = int(value)
+    if value <= 0:
+        return ""
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+class CameraCapture:
+    """VideoCapture wrapper: negotiates fourcc/FPS and timestamps every frame"""
+
+    def __init__(self, cap, monitor=None):
+        self.cap = cap
+        self.monitor = monitor  # Optional PerformanceMonitor for capture counters
+        self.fourcc = fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC))
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.reported_fps = cap.get(cv2.CAP_PROP_FPS)
+        self.measured_fps = None
+        self.timestamp = None  # perf_counter() when the current frame was grabbed
+        self.frames = 0
+        self.dropped = 0
+        self._grabbed = False
+        # MEMORY OPTIMIZATION: Frames are decoded into one reused buffer
+        self._buffer = None
+
+    @property
+    def timestamp_ms(self):
+        return None if self.timestamp is None else int(self.timestamp * 1000)
+
+    def _apply(self, fourcc, width, height, fps):
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        # Size after fourcc - many drivers only list high resolutions for MJPG
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        # Set buffer size to prevent lag
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fourcc = fourcc_to_str(self.cap.get(cv2.CAP_PROP_FOURCC))
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.reported_fps = self.cap.get(cv2.CAP_PROP_FPS)
+
+    def measure_fps(self, frames=15, warmup=3, timeout=2.0):
+        """Frames per second the camera actually delivers (grab only, no decode)"""
+        deadline = time.perf_counter() + timeout
+        for _ in range(warmup):
+            if not self.cap.grab() or time.perf_counter() > deadline:
+                return 0.0
+        start = time.perf_counter()
+        count = 0
+        while count < frames and time.perf_counter() < deadline:
+            if not self.cap.grab():
+                break
+            count += 1
+        elapsed = time.perf_counter() - start
+        return count / elapsed if count and elapsed > 0 else 0.0
+
+    def negotiate(self, width, height, fps, fourccs=FOURCC_PREFERENCES, min_ratio=0.9):
+        """Pick the first pixel format that reaches the target FPS at this size
+
+        Falls back to the fastest format measured when none reaches it.
+        """
+        best = None
+        current = None
+        for fourcc in fourccs:
+            try:
+                self._apply(fourcc, width, height, fps)
+                current = fourcc
+            except cv2.error as e:
+                print(f"Camera rejected {fourcc}: {e}")
+                continue
+            achieved = self.measure_fps()
+            print(f"Camera {fourcc}: asked {width}x{height}@{fps}, got {self.fourcc} "
+                  f"{self.width}x{self.height}, reported {self.reported_fps:.0f} FPS, "
+                  f"measured {achieved:.1f} FPS")
+            if best is None or achieved > best[1]:
+                best = (fourcc, achieved)
+            if achieved >= fps * min_ratio:
+                break
+
+        if best is None:
+            self._apply(None, width, height, fps)
+        elif current != best[0]:
+            # A later format measured slower - go back to the fastest one
+            self._apply(best[0], width, height, fps)
+        self.measured_fps = best[1] if best else None
+        print(f"Camera using {self.fourcc or 'default format'} {self.width}x{self.height}, "
+              f"measured {self.measured_fps or 0:.1f} FPS")
+        return self.measured_fps
+
+    def grab(self):
+        """Take the next frame from the driver without decoding it"""
+        self._grabbed = self.cap.grab()
+        if self._grabbed:
+            self.timestamp = time.perf_counter()
+        return self._grabbed
+
+    def skip(self):
+        """Drop a frame: grab it so the driver queue stays fresh, but never decode it"""
+        if self.grab():
+            self.dropped += 1
+            if self.monitor is not None:
+                self.monitor.count('camera_grab_only')
+        return self._grabbed
+
+    def retrieve(self):
+        """Decode the last grabbed frame into the reused buffer"""
+        if not self._grabbed:
+            return False, None
+        success, frame = self.cap.retrieve(self._buffer)
+        self._grabbed = False
+        if success:
+            self._buffer = frame
+            self.frames += 1
+        return success, frame
+
+    def read(self):
+        """grab() + retrieve(); the frame's capture time is in self.timestamp"""
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+        self._buffer = None
@@ -0,0 +1,264 @@
+# CanvasLayers.py
+import numpy as np
+
+TILE_SIZE = 64
+
+
+class TileGrid:
+    """Splits a frame into fixed-size tiles (edge tiles may be smaller)"""
+
+    def __init__(self, shape, tile_size=TILE_SIZE):
+        self.height, self.width = shape[0], shape[1]
+        self.tile_size = tile_size
+        self.rows = -(-self.height // tile_size)
+        self.cols = -(-self.width // tile_size)
+        self.count = self.rows * self.cols
+        self._row_starts = np.arange(0, self.height, tile_size)
+        self._col_starts = np.arange(0, self.width, tile_size)
+        self.slices = [[(slice(ty * tile_size, min((ty + 1) * tile_size, self.height)),
+                         slice(tx * tile_size, min((tx + 1) * tile_size, self.width)))
+                        for tx in range(self.cols)] for ty in range(self.rows)]
+
+    def rect_tiles(self, rect):
+        """Tile index ranges (rows, cols) covering pixel rect (x0, y0, x1, y1), or None if off-frame"""
+        x0, y0, x1, y1 = rect
+        x0, y0 = max(int(x0), 0), max(int(y0), 0)
+        x1, y1 = min(int(x1), self.width), min(int(y1), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        size = self.tile_size
+        return slice(y0 // size, (y1 - 1) // size + 1), slice(x0 // size, (x1 - 1) // size + 1)
+
+    def reduce_any(self, mask):
+        """Per-tile any() of a full-frame boolean mask"""
+        rows = np.logical_or.reduceat(mask, self._row_starts, axis=0)
+        return np.logical_or.reduceat(rows, self._col_starts, axis=1)
+
+
+class LayerSnapshot:
+    """Tile copies of a layer for undo; unchanged tiles are shared with the previous snapshot"""
+    __slots__ = ('version', 'tiles')
+
+    def __init__(self, version, tiles):
+        self.version = version  # Layer version when taken
+        self.tiles = tiles  # rows x cols of tile arrays, None for empty tiles
+
+    @property
+    def nbytes(self):
+        return sum(tile.nbytes for row in self.tiles for tile in row if tile is not None)
+
+
+def snapshot_nbytes(snapshots):
+    """Memory held by snapshots, counting tiles shared between them once"""
+    seen = {}
+    for snapshot in snapshots:
+        for row in snapshot.tiles:
+            for tile in row:
+                if tile is not None:
+                    seen[id(tile)] = tile.nbytes
+    return sum(seen.values())
+
+
+class Layer:
+    """One full-frame layer: BGR pixels plus a coverage mask of the pixels it paints
+
+    Writers draw into `image` (and `mask`, unless auto_mask derives it from
+    non-black pixels) and then call mark_dirty(), with the changed pixel
+    rect when they know it. Every tile remembers the layer version that
+    last touched it, so each reader (composites, undo, export) only visits
+    tiles changed since it last looked, and only tiles that hold pixels.
+    """
+
+    def __init__(self, name, shape, auto_mask=False, tile_size=TILE_SIZE):
+        self.name = name
+        self.image = np.zeros((shape[0], shape[1], 3), np.uint8)
+        self.mask = np.zeros((shape[0], shape[1]), bool)
+        self.auto_mask = auto_mask  # Coverage = any non-black pixel (ink canvas)
+        self.visible = True
+        self.version = 0
+        self.source = None  # Owner-defined key of what was rendered (header id, text version)
+        self.grid = TileGrid(shape, tile_size)
+        self.tile_versions = np.zeros((self.grid.rows, self.grid.cols), np.int64)
+        self.occupied = np.zeros((self.grid.rows, self.grid.cols), bool)  # Tiles with coverage
+        self._mask_version = 0
+        self._last_snapshot = None
+
+    def mark_dirty(self, rect=None):
+        """Record a change to pixel rect (x0, y0, x1, y1), or to the whole layer"""
+        if rect is None:
+            self.version += 1
+            self.tile_versions.fill(self.version)
+            return
+        tiles = self.grid.rect_tiles(rect)
+        if tiles is None:
+            return
+        self.version += 1
+        self.tile_versions[tiles] = self.version
+
+    def changed_tiles(self, since):
+        """(ty, tx) of tiles written after layer version `since`"""
+        return np.argwhere(self.tile_versions > since)
+
+    def coverage(self):
+        """Mask of painted pixels; only tiles changed since the last call are rescanned"""
+        version = self.version
+        if self._mask_version == version:
+            return self.mask
+        changed = self.changed_tiles(self._mask_version)
+        if len(changed) == self.grid.count:
+            if self.auto_mask:
+                np.any(self.image, axis=2, out=self.mask)
+            self.occupied[:] = self.grid.reduce_any(self.mask)
+        else:
+            for ty, tx in changed:
+                ys, xs = self.grid.slices[ty][tx]
+                if self.auto_mask:
+                    np.any(self.image[ys, xs], axis=2, out=self.mask[ys, xs])
+                self.occupied[ty, tx] = self.mask[ys, xs].any()
+        self._mask_version = version
+        return self.mask
+
+    def clear(self):
+        self.image.fill(0)
+        self.mask.fill(False)
+        self.mark_dirty()
+
+    def snapshot(self):
+        """Undo snapshot: copies only tiles changed since the previous snapshot and skips empty ones"""
+        self.coverage()
+        previous = self._last_snapshot
+        since = previous.version if previous is not None else 0
+        tiles = []
+        for ty in range(self.grid.rows):
+            row = []
+            for tx in range(self.grid.cols):
+                if self.tile_versions[ty, tx] <= since:
+                    # Unchanged since the previous snapshot (or never written)
+                    row.append(previous.tiles[ty][tx] if previous is not None else None)
+                elif self.occupied[ty, tx]:
+                    ys, xs = self.grid.slices[ty][tx]
+                    row.append(self.image[ys, xs].copy())
+                else:
+                    row.append(None)
+            tiles.append(row)
+        self._last_snapshot = LayerSnapshot(self.version, tiles)
+        return self._last_snapshot
+
+    def load(self, snapshot):
+        """Restore a snapshot in place, rewriting only tiles changed since it was taken"""
+        if isinstance(snapshot, np.ndarray):
+            np.copyto(self.image, snapshot)
+            self.mark_dirty()
+            return
+        self.version += 1
+        for ty, tx in self.changed_tiles(snapshot.version):
+            ys, xs = self.grid.slices[ty][tx]
+            tile = snapshot.tiles[ty][tx]
+            if tile is None:
+                self.image[ys, xs] = 0
+            else:
+                self.image[ys, xs] = tile
+            self.tile_versions[ty, tx] = self.version
+
+    def export_onto(self, background):
+        """Paste this layer's painted pixels onto background, visiting only occupied tiles"""
+        mask = self.coverage()
+        for ty, tx in np.argwhere(self.occupied):
+            ys, xs = self.grid.slices[ty][tx]
+            np.copyto(background[ys, xs], self.image[ys, xs], where=mask[ys, xs, None])
+        return background
+
+
+class _Composite:
+    """Merged pixels of a run of layers plus what each layer looked like when merged"""
+    __slots__ = ('image', 'mask', 'occupied', 'seen', 'visible')
+
+    def __init__(self, shape, grid):
+        self.image = np.zeros((shape[0], shape[1], 3), np.uint8)
+        self.mask = np.zeros(shape, bool)
+        self.occupied = np.zeros((grid.rows, grid.cols), bool)
+        self.seen = None  # Layer versions merged so far
+        self.visible = None
+
+
+class LayerStack:
+    """Ordered layers with cached merged composites
+
+    composite(img, names) pastes a run of layers over the camera frame.
+    The run is merged into one pre-composite in which only tiles changed
+    since the last merge are rebuilt, and pasting skips tiles with nothing
+    painted, so the cost follows the painted area, not the resolution.
+    """
+
+    def __init__(self, shape, monitor=None, tile_size=TILE_SIZE):
+        self.shape = (shape[0], shape[1])
+        self.monitor = monitor  # Optional PerformanceMonitor for rebuild counts
+        self.grid = TileGrid(self.shape, tile_size)
+        self.layers = {}
+        self.order = []
+        self._merged = {}  # names -> _Composite
+
+    def add(self, name, auto_mask=False):
+        layer = Layer(name, self.shape, auto_mask, self.grid.tile_size)
+        self.layers[name] = layer
+        self.order.append(name)
+        return layer
+
+    def __getitem__(self, name):
+        return self.layers[name]
+
+    def _merged_for(self, names):
+        layers = [self.layers[n] for n in names]
+        merged = self._merged.get(names)
+        if merged is None:
+            # MEMORY OPTIMIZATION: Merge buffers are allocated once per run of layers
+            merged = self._merged[names] = _Composite(self.shape, self.grid)
+        visible = tuple(layer.visible for layer in layers)
+        seen = tuple(layer.version for layer in layers)
+        if merged.seen == seen and merged.visible == visible:
+            return merged
+
+        if merged.seen is None or merged.visible != visible:
+            dirty = np.ones((self.grid.rows, self.grid.cols), bool)
+        else:
+            dirty = np.zeros((self.grid.rows, self.grid.cols), bool)
+            for layer, version in zip(layers, merged.seen):
+                if layer.version != version:
+                    dirty |= layer.tile_versions > version
+
+        coverages = [layer.coverage() if layer.visible else None for layer in layers]
+        for ty, tx in np.argwhere(dirty):
+            ys, xs = self.grid.slices[ty][tx]
+            image, mask = merged.image[ys, xs], merged.mask[ys, xs]
+            image.fill(0)
+            mask.fill(False)
+            occupied = False
+            for layer, coverage in zip(layers, coverages):
+                if coverage is None or not layer.occupied[ty, tx]:
+                    continue
+                np.copyto(image, layer.image[ys, xs], where=coverage[ys, xs, None])
+                mask |= coverage[ys, xs]
+                occupied = True
+            merged.occupied[ty, tx] = occupied
+        merged.seen = seen
+        merged.visible = visible
+        if self.monitor is not None:
+            self.monitor.count('layer_rebuilds')
+        return merged
+
+    def composite(self, img, names):
+        """Paste the layers `names` (bottom first) over img in place"""
+        merged = self._merged_for(tuple(names))
+        tiles = np.argwhere(merged.occupied)
+        if len(tiles) * 2 > self.grid.count:
+            # Mostly painted: one full-frame masked copy beats many small ones
+            np.copyto(img, merged.image, where=merged.mask[..., None])
+        else:
+            for ty, tx in tiles:
+                ys, xs = self.grid.slices[ty][tx]
+                np.copyto(img[ys, xs], merged.image[ys, xs], where=merged.mask[ys, xs, None])
+        return img
+
+    def flatten(self, background, names):
+        """New image of the layers `names` over a copy of background (export)"""
+        return self.composite(background.copy(), names)
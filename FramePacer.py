@@ -0,0 +1,121 @@
+# FramePacer.py
+import time
+from PerformanceMonitor import TimingRing
+
+# Wake-up slack of a plain sleep() that is not counted as a late frame
+LATE_TOLERANCE = 0.002
+
+
+class FramePacer:
+    """Paces the frame loop against absolute deadlines on the monotonic clock
+
+    Each frame ends at deadline = previous deadline + frame_time, so time spent
+    in the event pump or a slow sleep wake-up does not push later frames back.
+    A frame that overruns by more than max_late frames re-plans from now
+    instead of bursting to catch up (late work is dropped, not owed).
+
+    By default the wait is a plain sleep. A spin_margin > 0 opts in to
+    precise pacing: sleep until that close to the deadline, then busy-wait,
+    at the cost of a core spinning for up to spin_margin every frame.
+
+    Frames the loop skips (frame_skip) still use up a frame slot: skip()
+    moves the deadline on without waiting, so the time spent grabbing the
+    skipped frame is not counted as lateness.
+    """
+
+    def __init__(self, frame_time, spin_margin=0.0, max_late=1.0, capacity=120, monitor=None):
+        self.frame_time = frame_time
+        self.spin_margin = spin_margin  # Busy-wait this close to the deadline (0 = never spin)
+        self.max_late = max_late  # Frames of overrun tolerated before re-planning
+        self.monitor = monitor  # Optional PerformanceMonitor for jitter gauges
+        self.deadline = None
+        self.frames = 0
+        self.late_frames = 0
+        self.resyncs = 0
+        self.skipped = 0
+        self._skipped_since_release = 0
+        self.intervals = TimingRing(capacity)  # Release-to-release intervals (ms)
+        self._last_release = None
+
+    def remaining(self):
+        """Seconds left before this frame's deadline (negative when late)"""
+        if self.deadline is None:
+            return self.frame_time
+        return self.deadline - time.perf_counter()
+
+    def is_late(self, margin=0.0):
+        """True when less than `margin` seconds are left, so optional work should be skipped"""
+        return self.remaining() < margin
+
+    def skip(self):
+        """Give up this frame slot without waiting (the loop skipped a camera frame)"""
+        self.skipped += 1
+        self._skipped_since_release += 1
+        if self.deadline is not None:
+            self.deadline += self.frame_time
+
+    def wait(self, frame_time=None):
+        """Sleep until the frame deadline, then plan the next one; returns the release time"""
+        if frame_time is not None and frame_time != self.frame_time:
+            # Rate change (e.g. idle mode): plan from now at the new rate
+            self.frame_time = frame_time
+            self.deadline = None
+
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = now
+
+        remaining = self.deadline - now
+        if remaining > self.spin_margin:
+            time.sleep(remaining - self.spin_margin)
+        if self.spin_margin > 0:
+            while time.perf_counter() < self.deadline:
+                pass
+
+        release = time.perf_counter()
+        self.frames += 1
+        late = release > self.deadline + max(self.spin_margin, LATE_TOLERANCE)
+        if late:
+            self.late_frames += 1
+            if self.monitor is not None:
+                self.monitor.count('late_frames')
+        if release - self.deadline > self.frame_time * self.max_late:
+            # Too far behind - drop the debt instead of rushing the next frames
+            self.resyncs += 1
+            self.deadline = release + self.frame_time
+            if self.monitor is not None:
+                self.monitor.count('pacer_resyncs')
+        else:
+            self.deadline += self.frame_time
+
+        if self._last_release is not None:
+            # Per frame slot, so skipped frames do not read as jitter
+            slots = 1 + self._skipped_since_release
+            self.intervals.push((release - self._last_release) * 1000.0 / slots)
+        self._last_release = release
+        self._skipped_since_release = 0
+        if self.monitor is not None and self.frames % 30 == 0:
+            self.monitor.set_gauge('jitter_ms', self.jitter())
+        return release
+
+    def jitter(self):
+        """Standard deviation of recent frame intervals (ms)"""
+        if len(self.intervals) < 2:
+            return 0.0
+        return float(self.intervals.values().std())
+
+    def stats(self):
+        values = self.intervals.values()
+        target_ms = self.frame_time * 1000.0
+        if values.size == 0:
+            return {'target_ms': round(target_ms, 2)}
+        deviation = abs(values - target_ms)
+        return {
+            'target_ms': round(target_ms, 2),
+            'mean_ms': round(float(values.mean()), 2),
+            'jitter_ms': round(float(values.std()), 2),
+            'max_deviation_ms': round(float(deviation.max()), 2),
+            'late_frames': self.late_frames,
+            'resyncs': self.resyncs,
+            'skipped': self.skipped,
+        }
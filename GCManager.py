@@ -0,0 +1,149 @@
+# GCManager.py
+import gc
+import time
+
+# Estimated pause per generation (ms) until real collections have been measured
+DEFAULT_PAUSE_MS = (0.3, 1.5, 15.0)
+
+_active = None  # GCManager currently driving collections, if any
+
+
+def request_collection(generation=2):
+    """Ask for a collection; deferred to frame slack while a GCManager is running"""
+    if _active is not None:
+        _active.request(generation)
+    else:
+        gc.collect(generation)
+
+
+class GCManager:
+    """Runs garbage collections in end-of-frame slack instead of mid-frame
+
+    start() collects and freezes everything alive after startup (models,
+    images, UI) so later full collections never traverse it, then disables
+    automatic collection. collect_in_slack() is called once per frame with the
+    time left before the frame deadline and runs the youngest-to-oldest
+    generation that is due and whose measured pause fits that time.
+    """
+
+    def __init__(self, monitor=None, thresholds=(10000, 20, 20), budget_share=0.8,
+                 max_defer=5.0, emergency_factor=10):
+        self.monitor = monitor  # Optional PerformanceMonitor for gauges and counters
+        self.thresholds = thresholds  # Same meaning as gc.set_threshold
+        self.budget_share = budget_share  # Fraction of the slack a collection may use
+        self.max_defer = max_defer  # Seconds a due collection may wait for slack
+        self.emergency_factor = emergency_factor  # gen0 backlog that forces a collection
+        self.pause_ms = list(DEFAULT_PAUSE_MS)  # Smoothed pause per generation
+        self.max_pause_ms = 0.0
+        self.collections = [0, 0, 0]
+        self.forced = 0
+        self.frozen_objects = 0
+        self.running = False
+        self._requested = -1
+        self._due_since = None
+        self._saved_threshold = None
+        self._was_enabled = None
+
+    def start(self):
+        """Freeze long-lived startup objects and take over collection scheduling"""
+        global _active
+        if self.running:
+            return
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+            self.frozen_objects = gc.get_freeze_count()
+        self._saved_threshold = gc.get_threshold()
+        self._was_enabled = gc.isenabled()
+        gc.set_threshold(*self.thresholds)
+        gc.disable()
+        self.running = True
+        _active = self
+        print(f"GC manager started: {self.frozen_objects} objects frozen, "
+              f"thresholds {self.thresholds}")
+
+    def request(self, generation=2):
+        """Schedule a collection of at least this generation at the next slack"""
+        self._requested = max(self._requested, generation)
+
+    def _due_generation(self):
+        count = gc.get_count()
+        due = self._requested
+        for generation in range(3):
+            if count[generation] >= self.thresholds[generation]:
+                due = max(due, generation)
+        return due
+
+    def collect_in_slack(self, slack):
+        """Collect if due and it fits in `slack` seconds; returns the generation or -1"""
+        if not self.running:
+            return -1
+        due = self._due_generation()
+        if due < 0:
+            self._due_since = None
+            return -1
+
+        now = time.perf_counter()
+        if self._due_since is None:
+            self._due_since = now
+        budget_ms = max(0.0, slack) * 1000.0 * self.budget_share
+
+        generation = due
+        while generation >= 0 and self.pause_ms[generation] > budget_ms:
+            generation -= 1
+
+        # Never let garbage pile up indefinitely when frames have no slack
+        overdue = now - self._due_since > self.max_defer
+        backlog = gc.get_count()[0] >= self.thresholds[0] * self.emergency_factor
+        if generation < 0 or (overdue and generation < due):
+            if not (overdue or backlog):
+                if self.monitor is not None:
+                    self.monitor.count('gc_deferred')
+                return -1
+            generation = due
+            self.forced += 1
+            if self.monitor is not None:
+                self.monitor.count('gc_forced')
+
+        self._collect(generation)
+        if generation >= self._requested:
+            self._requested = -1
+        if generation == due:
+            self._due_since = None
+        return generation
+
+    def _collect(self, generation):
+        start = time.perf_counter()
+        gc.collect(generation)
+        pause_ms = (time.perf_counter() - start) * 1000.0
+        self.pause_ms[generation] += 0.2 * (pause_ms - self.pause_ms[generation])
+        self.max_pause_ms = max(self.max_pause_ms, pause_ms)
+        self.collections[generation] += 1
+        if self.monitor is not None:
+            self.monitor.record(f"gc_slack_gen{generation}", pause_ms / 1000.0)
+            self.monitor.set_gauge('gc_max_ms', self.max_pause_ms)
+
+    def stats(self):
+        return {
+            'collections': list(self.collections),
+            'forced': self.forced,
+            'pause_ms': [round(ms, 2) for ms in self.pause_ms],
+            'max_pause_ms': round(self.max_pause_ms, 2),
+            'frozen_objects': self.frozen_objects,
+        }
+
+    def stop(self):
+        """Hand collection back to the interpreter's automatic collector"""
+        global _active
+        if not self.running:
+            return
+        self.running = False
+        if _active is self:
+            _active = None
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+        if self._saved_threshold is not None:
+            gc.set_threshold(*self._saved_threshold)
+        if self._was_enabled:
+            gc.enable()
+        print(f"GC manager stopped: {self.stats()}")
@@ -1,9 +1,14 @@
 # HandTrackingModule.py
 import cv2
 import mediapipe as mp
+import numpy as np
 import time
 import os
-import gc
+import sys
+import math
+import threading
+from collections import deque
+from GCManager import request_collection
 
 class VelocityFilter:
     def __init__(self, smoothing=0.7):
@@ -38,44 +43,246 @@ class VelocityFilter:
         
         return predicted_x, predicted_y
 
+class DetectionScheduler:
+    """Decides which frames run full inference; the rest are predicted"""
+    def __init__(self, interval=1, motion_threshold=25.0, error_threshold=20.0):
+        self.interval = interval  # Maximum frames between inferences
+        self.motion_threshold = motion_threshold  # Predicted px/frame that forces inference
+        self.error_threshold = error_threshold  # Prediction error (px) that forces inference
+        self.frames_since_inference = 0
+        self.last_gap = 1  # Frames between the two most recent inferences
+        self.predicted_speed = 0.0
+        self.prediction_error = 0.0  # Smoothed index-tip prediction error (px)
+        self.last_error = 0.0
+        self.inferences = 0
+        self.predictions = 0
+        self._inference_times = deque(maxlen=30)
+
+    def should_infer(self, have_history):
+        """Advance one frame and decide whether it needs full inference"""
+        self.frames_since_inference += 1
+        if (not have_history or
+                self.frames_since_inference >= self.interval or
+                self.predicted_speed > self.motion_threshold or
+                self.last_error > self.error_threshold):
+            return True
+        self.predictions += 1
+        return False
+
+    def inference_done(self):
+        self.last_gap = max(1, self.frames_since_inference)
+        self.frames_since_inference = 0
+        self.inferences += 1
+        self._inference_times.append(time.perf_counter())
+
+    def record_error(self, error):
+        self.last_error = error
+        self.prediction_error = 0.8 * self.prediction_error + 0.2 * error
+
+    def inference_rate(self):
+        """Actual inferences per second over the recent window"""
+        if len(self._inference_times) < 2:
+            return 0.0
+        span = self._inference_times[-1] - self._inference_times[0]
+        return (len(self._inference_times) - 1) / span if span > 0 else 0.0
+
+    def reset(self):
+        self.predicted_speed = 0.0
+        self.last_error = 0.0
+
+
+class MotionGate:
+    """Cheap frame-difference check that lets static frames skip hand inference"""
+    def __init__(self, size=(64, 48), pixel_threshold=12, motion_fraction=0.01,
+                 max_skip=30, use_roi=True, roi_margin=0.3):
+        self.size = size  # Downsampled (width, height) used for differencing
+        self.pixel_threshold = pixel_threshold  # Gray-level change that counts as motion
+        self.motion_fraction = motion_fraction  # Fraction of moving pixels that wakes inference
+        self.max_skip = max_skip  # Force an inference after this many static frames
+        self.use_roi = use_roi  # Only look around the last hand when one is tracked
+        self.roi_margin = roi_margin
+        self.roi = None  # Normalized (x0, y0, x1, y1) of the last hand
+        self.checked = 0
+        self.skipped = 0
+        self._consecutive_skips = 0
+
+        # MEMORY OPTIMIZATION: Preallocated downsampled buffers
+        w, h = size
+        self._small = np.zeros((h, w, 3), np.uint8)
+        self._gray = np.zeros((h, w), np.uint8)
+        self._diff = np.zeros((h, w), np.uint8)
+        self._reference = None  # Gray frame from the last inference
+
+    def is_static(self, img):
+        """True when nothing moved since the last inference frame"""
+        self.checked += 1
+        cv2.resize(img, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._reference is None or self._consecutive_skips >= self.max_skip:
+            return self._wake()
+
+        cv2.absdiff(self._gray, self._reference, dst=self._diff)
+        region = self._diff
+        if self.use_roi and self.roi is not None:
+            w, h = self.size
+            x0, y0, x1, y1 = self.roi
+            region = self._diff[int(y0 * h):max(int(y1 * h), int(y0 * h) + 1),
+                                int(x0 * w):max(int(x1 * w), int(x0 * w) + 1)]
+
+        moving = np.count_nonzero(region > self.pixel_threshold)
+        if moving > self.motion_fraction * region.size:
+            return self._wake()
+
+        # Keep the old reference so slow drift still adds up to motion
+        self._consecutive_skips += 1
+        self.skipped += 1
+        return True
+
+    def _wake(self):
+        if self._reference is None:
+            self._reference = self._gray.copy()
+        else:
+            np.copyto(self._reference, self._gray)
+        self._consecutive_skips = 0
+        return False
+
+    def update_roi(self, lmList, img_shape, mirrored=False):
+        """Track the last hand bounding box (pass an empty list when no hand)
+
+        mirrored: lmList x coordinates are mirrored relative to the gated frame
+        """
+        if not lmList:
+            self.roi = None
+            return
+        h, w = img_shape[:2]
+        xs = [lm[1] for lm in lmList]
+        ys = [lm[2] for lm in lmList]
+        margin_x = (max(xs) - min(xs)) * self.roi_margin + 10
+        margin_y = (max(ys) - min(ys)) * self.roi_margin + 10
+        x0 = max(0.0, (min(xs) - margin_x) / w)
+        x1 = min(1.0, (max(xs) + margin_x) / w)
+        if mirrored:
+            x0, x1 = 1.0 - x1, 1.0 - x0
+        self.roi = (x0, max(0.0, (min(ys) - margin_y) / h),
+                    x1, min(1.0, (max(ys) + margin_y) / h))
+
+    def skip_ratio(self):
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def reset(self):
+        self._reference = None
+        self._consecutive_skips = 0
+        self.roi = None
+
+
 class HandDetector:
-    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5):
+    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5, monitor=None,
+                 modelComplexity=0, reuse_buffers=False):
         # MEMORY OPTIMIZATION: Initialize variables first
         self.results = None
+        self.monitor = monitor  # Optional PerformanceMonitor for timing probes
         self.lmList = []
         self.mode = mode
         self.maxHands = maxHands
         self.detectionCon = detectionCon
         self.trackCon = trackCon
+        self.modelComplexity = modelComplexity
+        self.scheduler = DetectionScheduler()  # Inference cadence between predicted frames
+        self.motion_gate = None  # Optional MotionGate that skips inference on static frames
+        self._predicting = False
+        self._reusing = False
+        self._timestamp_ms = None
+        # Mirror-free pipeline: detect on the raw camera frame and mirror only the
+        # landmark x coordinates, so lmList matches detection on a flipped frame
+        self.mirror = False
+        # Inference resolution: None runs on the full frame, (width, None) keeps the
+        # frame aspect ratio, (width, height) letterboxes into that box
+        self.inference_size = None
+        self._inference_scaled = False  # Results refer to a downscaled frame
+        self._inference_buffer = None
+        self._inference_roi = None
+        self._inference_layout = None
+        self._letterbox_gain = np.ones(2, np.float64)  # Box-normalized -> frame-normalized
+        self._letterbox_offset = np.zeros(2, np.float64)
 
         # SMOOTHING: Initialize smoothing filters
+        self.smoothing_enabled = True  # False passes raw landmarks through (latency testing)
         self.smoothing_factor = 0.7  # Good balance between smoothness and responsiveness
         self.prev_landmarks = None
         self.velocity_filters = [VelocityFilter(0.7) for _ in range(21)]  # 21 landmarks per hand
         
         # MEMORY OPTIMIZATION: Initialize MediaPipe with resource management
         self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(
-            static_image_mode=self.mode,
-            max_num_hands=self.maxHands,
-            min_detection_confidence=self.detectionCon,
-            min_tracking_confidence=self.trackCon,
-            model_complexity=0  # Reduced complexity for better performance
-        )
+        self.hands = self._create_hands()
         
         self.mpDraw = mp.solutions.drawing_utils
         self.tipIds = [4, 8, 12, 16, 20]
+        # MEMORY OPTIMIZATION: Drawing specs are immutable - build them once
+        self._landmark_spec = self.mpDraw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
+        self._connection_spec = self.mpDraw.DrawingSpec(color=(255, 0, 0), thickness=2)
         
         # MEMORY OPTIMIZATION: Reusable variables to avoid repeated allocations
         self._img_shape = None
         self._landmark_cache = []
 
+        # MEMORY OPTIMIZATION: Buffer-reuse mode - steady-state frames write into
+        # preallocated arrays and persistent rows instead of allocating new ones
+        self.reuse_buffers = reuse_buffers
+        self._rgb_buffer = None
+        self.landmarks = np.zeros((21, 3), np.int32)  # id, x, y of the smoothed landmarks
+        self.landmarks[:, 0] = np.arange(21)
+        self._raw_xy = np.zeros((21, 2), np.float64)
+        self._prev_raw_xy = np.zeros((21, 2), np.float64)
+        self._smoothed_xy = np.zeros((21, 2), np.float64)
+        self._velocity_xy = np.zeros((21, 2), np.float64)
+        self._scratch_xy = np.zeros((21, 2), np.float64)
+        self._frame_scale = np.ones(2, np.float64)
+        self._smoothing_primed = False  # Like VelocityFilter.prev_x: a previous raw position exists
+        self._raw_rows = [[i, 0, 0] for i in range(21)]
+
+    @property
+    def reused_results(self):
+        """True when the last findHands call reused results on a static frame"""
+        return self._reusing
+
+    @property
+    def detection_interval(self):
+        return self.scheduler.interval
+
+    @detection_interval.setter
+    def detection_interval(self, interval):
+        self.scheduler.interval = max(1, int(interval))
+
+    def _create_hands(self):
+        return self.mpHands.Hands(
+            static_image_mode=self.mode,
+            max_num_hands=self.maxHands,
+            min_detection_confidence=self.detectionCon,
+            min_tracking_confidence=self.trackCon,
+            model_complexity=self.modelComplexity  # 0 = fastest, 1 = most accurate
+        )
+
+    def set_model_complexity(self, complexity):
+        """Switch MediaPipe model complexity at runtime (recreates the graph)"""
+        if complexity == self.modelComplexity:
+            return
+        try:
+            old_hands = self.hands
+            self.modelComplexity = complexity
+            self.hands = self._create_hands()
+            old_hands.close()
+            self.results = None
+            self.reset_smoothing()
+        except Exception as e:
+            print(f"Error changing model complexity: {e}")
+
     def smooth_landmarks(self, current_lmList):
         """Apply smoothing to reduce jitter"""
         if not current_lmList or len(current_lmList) < 21:
             return current_lmList
             
-        if self.prev_landmarks is None:
+        if self.prev_landmarks is None or not self.smoothing_enabled:
             self.prev_landmarks = current_lmList
             return current_lmList
         
@@ -108,15 +315,124 @@ class HandDetector:
         self.prev_landmarks = smoothed_lmList
         return smoothed_lmList
 
-    def findHands(self, img, draw=True):
+    def set_inference_resolution(self, width, height=None):
+        """Downscale frames to width (x height, letterboxed) for inference; 0 or None = full frame"""
+        size = (int(width), int(height) if height else None) if width else None
+        if size != self.inference_size:
+            self.inference_size = size
+            self._inference_layout = None
+
+    def _prepare_inference_frame(self, img):
+        """Downscaled, letterboxed copy of img for inference, or img itself at full resolution"""
+        if not self.inference_size:
+            self._inference_scaled = False
+            return img
+        h, w = img.shape[:2]
+        box_w, box_h = self.inference_size
+        if box_h is None:
+            box_h = max(1, int(h * box_w / w))
+        if box_w >= w and box_h >= h:
+            self._inference_scaled = False
+            return img
+
+        layout = (w, h, box_w, box_h)
+        if layout != self._inference_layout:
+            # MEMORY OPTIMIZATION: Padding is written once; frames only refill the image area
+            scale = min(box_w / w, box_h / h)
+            resized_w, resized_h = max(1, round(w * scale)), max(1, round(h * scale))
+            pad_x, pad_y = (box_w - resized_w) // 2, (box_h - resized_h) // 2
+            self._inference_buffer = np.zeros((box_h, box_w, 3), np.uint8)
+            self._inference_roi = self._inference_buffer[pad_y:pad_y + resized_h,
+                                                         pad_x:pad_x + resized_w]
+            self._letterbox_gain[:] = (box_w / resized_w, box_h / resized_h)
+            self._letterbox_offset[:] = (-pad_x / resized_w, -pad_y / resized_h)
+            self._inference_layout = layout
+
+        t_start = time.perf_counter()
+        roi = self._inference_roi
+        cv2.resize(img, (roi.shape[1], roi.shape[0]), dst=roi, interpolation=cv2.INTER_AREA)
+        if self.monitor is not None:
+            self.monitor.record('hands.downscale', time.perf_counter() - t_start)
+        self._inference_scaled = True
+        return self._inference_buffer
+
+    def _to_frame_coords(self, x, y):
+        """Map normalized coordinates of the inference frame back to the full frame"""
+        if not self._inference_scaled:
+            return x, y
+        return (x * self._letterbox_gain[0] + self._letterbox_offset[0],
+                y * self._letterbox_gain[1] + self._letterbox_offset[1])
+
+    def _to_rgb(self, img):
+        """BGR to RGB, into the detector's own buffer in buffer-reuse mode"""
+        if not self.reuse_buffers:
+            return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # MEMORY OPTIMIZATION: Reallocate only when the frame size changes
+        if self._rgb_buffer is None or self._rgb_buffer.shape != img.shape:
+            self._rgb_buffer = np.empty_like(img)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+
+    def _process(self, img):
+        """Run inference on a BGR frame and return the results object"""
+        # MEMORY OPTIMIZATION: Reuse RGB conversion
+        t_start = time.perf_counter()
+        imgRGB = self._to_rgb(img)
+        t_converted = time.perf_counter()
+        results = self.hands.process(imgRGB)
+
+        if self.monitor is not None:
+            self.monitor.record('hands.convert', t_converted - t_start)
+            self.monitor.record('hands.process', time.perf_counter() - t_converted)
+        return results
+
+    def _draw_points(self, img, handLms):
+        # Plain points, for results drawing_utils cannot handle (letterboxed or non-protobuf)
+        h, w = img.shape[:2]
+        for lm in handLms.landmark:
+            x, y = self._to_frame_coords(lm.x, lm.y)
+            cv2.circle(img, (int(x * w), int(y * h)), 2, (0, 255, 0), cv2.FILLED)
+
+    def _draw_hand(self, img, handLms):
+        if self._inference_scaled:
+            self._draw_points(img, handLms)
+            return
+        # Simplified drawing for better performance
+        self.mpDraw.draw_landmarks(
+            img, 
+            handLms,
+            self.mpHands.HAND_CONNECTIONS,
+            landmark_drawing_spec=self._landmark_spec,
+            connection_drawing_spec=self._connection_spec
+        )
+
+    def findHands(self, img, draw=True, timestamp_ms=None):
         """Detect hands in image with memory optimization"""
         if img is None or img.size == 0:
             return img
+        self._timestamp_ms = timestamp_ms  # Capture time, used by streaming backends
         
+        # Nothing moved since the last inference - reuse its results as they are
+        self._reusing = (self.motion_gate is not None and self.results is not None and
+                         self.motion_gate.is_static(img))
+        if self._reusing:
+            if self.monitor is not None:
+                self.monitor.count('gated_frames')
+                self.monitor.set_gauge('gate_skip_ratio', self.motion_gate.skip_ratio())
+            return img
+
+        # Between scheduled inferences findPosition extrapolates the landmarks
+        have_history = self.results is not None and self.prev_landmarks is not None
+        self._predicting = not self.scheduler.should_infer(have_history)
+        if self._predicting:
+            return img
+        self.scheduler.inference_done()
+
         try:
-            # MEMORY OPTIMIZATION: Reuse RGB conversion
-            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            self.results = self.hands.process(imgRGB)
+            self.results = self._process(self._prepare_inference_frame(img))
+
+            if self.monitor is not None:
+                self.monitor.set_gauge('inference_hz', self.scheduler.inference_rate())
+                self.monitor.set_gauge('prediction_err_px', self.scheduler.prediction_error)
             
             # MEMORY OPTIMIZATION: Clear previous results efficiently
             if hasattr(self, '_landmark_cache'):
@@ -125,27 +441,13 @@ class HandDetector:
             if self.results.multi_hand_landmarks:
                 for handLms in self.results.multi_hand_landmarks:
                     if draw:
-                        # Simplified drawing for better performance
-                        self.mpDraw.draw_landmarks(
-                            img, 
-                            handLms,
-                            self.mpHands.HAND_CONNECTIONS,
-                            landmark_drawing_spec=self.mpDraw.DrawingSpec(
-                                color=(0, 255, 0), thickness=2, circle_radius=2
-                            ),
-                            connection_drawing_spec=self.mpDraw.DrawingSpec(
-                                color=(255, 0, 0), thickness=2
-                            )
-                        )
+                        self._draw_hand(img, handLms)
                         
                         # Cache landmarks for reuse
                         if not hasattr(self, '_landmark_cache'):
                             self._landmark_cache = []
                         self._landmark_cache.append(handLms)
             
-            # MEMORY OPTIMIZATION: Clean up temporary variables
-            del imgRGB
-            
         except Exception as e:
             print(f"Error in findHands: {e}")
             
@@ -153,6 +455,12 @@ class HandDetector:
 
     def findPosition(self, img, handNo=0, draw=True):
         """Find hand landmark positions with memory optimization and smoothing"""
+        if self._reusing and handNo == 0 and img is not None:
+            # Static frame - the previous landmarks are still valid
+            if draw:
+                self._draw_tips(img)
+            return self.lmList
+
         self.lmList = []  # Clear previous list
         
         if img is None:
@@ -160,6 +468,17 @@ class HandDetector:
             
         # MEMORY OPTIMIZATION: Cache image shape
         self._img_shape = img.shape
+
+        # No hand at the last inference - gate on the whole frame
+        if (handNo == 0 and self.motion_gate is not None and
+                not (self.results and self.results.multi_hand_landmarks)):
+            self.motion_gate.update_roi([], self._img_shape)
+
+        if self._predicting and handNo == 0:
+            self.lmList = self._predict_landmarks(self.scheduler.frames_since_inference)
+            if draw:
+                self._draw_tips(img)
+            return self.lmList
         
         if self.results and self.results.multi_hand_landmarks:
             try:
@@ -167,25 +486,48 @@ class HandDetector:
                 if handNo >= len(self.results.multi_hand_landmarks):
                     return self.lmList
                     
+                t_start = time.perf_counter()
                 myHand = self.results.multi_hand_landmarks[handNo]
                 h, w, c = self._img_shape
+
+                if self.reuse_buffers and handNo == 0 and len(myHand.landmark) == 21:
+                    self.lmList = self._find_position_in_place(myHand, w, h)
+                    if self.monitor is not None:
+                        self.monitor.record('hands.landmarks', time.perf_counter() - t_start)
+                    if draw:
+                        self._draw_tips(img)
+                    return self.lmList
                 
                 # MEMORY OPTIMIZATION: Pre-allocate list size
                 raw_lmList = [None] * len(myHand.landmark)
                 
                 for id, lm in enumerate(myHand.landmark):
-                    cx, cy = int(lm.x * w), int(lm.y * h)
+                    x, y = self._to_frame_coords(lm.x, lm.y)
+                    if self.mirror:
+                        cx, cy = int((1 - x) * w), int(y * h)
+                    else:
+                        cx, cy = int(x * w), int(y * h)
                     raw_lmList[id] = [id, cx, cy]
                 
+                # Score how well extrapolation would have predicted this frame
+                if handNo == 0 and self.prev_landmarks is not None and len(raw_lmList) > 8:
+                    predicted = self._predict_landmarks(self.scheduler.last_gap)
+                    if predicted:
+                        self.scheduler.record_error(math.hypot(predicted[8][1] - raw_lmList[8][1],
+                                                               predicted[8][2] - raw_lmList[8][2]))
+
                 # Apply smoothing to reduce jitter
                 self.lmList = self.smooth_landmarks(raw_lmList)
+                if handNo == 0:
+                    self._update_predicted_speed()
+                    if self.motion_gate is not None:
+                        self.motion_gate.update_roi(raw_lmList, self._img_shape, self.mirror)
+
+                if self.monitor is not None:
+                    self.monitor.record('hands.landmarks', time.perf_counter() - t_start)
                     
                 if draw:
-                    # Only draw fingertips for performance
-                    for id, cx, cy in self.lmList:
-                        if id in self.tipIds:
-                            cv2.circle(img, (cx, cy), 6, (255, 0, 255), cv2.FILLED)
-                            cv2.circle(img, (cx, cy), 8, (255, 255, 255), 2)
+                    self._draw_tips(img)
             
             except (IndexError, AttributeError) as e:
                 # Silent fail for hand detection errors
@@ -195,6 +537,109 @@ class HandDetector:
                 
         return self.lmList
 
+    def _find_position_in_place(self, myHand, w, h):
+        """Buffer-reuse findPosition: fill, smooth and publish without new containers"""
+        raw = self._raw_xy
+        for id, lm in enumerate(myHand.landmark):
+            raw[id, 0] = lm.x
+            raw[id, 1] = lm.y
+        if self._inference_scaled:
+            # Undo the downscale/letterbox for all 21 landmarks at once
+            raw *= self._letterbox_gain
+            raw += self._letterbox_offset
+        if self.mirror:
+            np.subtract(1.0, raw[:, 0], out=raw[:, 0])
+        self._frame_scale[0] = w
+        self._frame_scale[1] = h
+        np.multiply(raw, self._frame_scale, out=raw)
+        np.trunc(raw, out=raw)
+
+        raw_rows = self._raw_rows
+        for id in range(21):
+            raw_rows[id][1] = int(raw[id, 0])
+            raw_rows[id][2] = int(raw[id, 1])
+
+        if self.prev_landmarks is not None:
+            # Score how well extrapolation would have predicted this frame
+            predicted = self._predict_landmarks(self.scheduler.last_gap)
+            self.scheduler.record_error(math.hypot(predicted[8][1] - raw_rows[8][1],
+                                                   predicted[8][2] - raw_rows[8][2]))
+        self._smooth_in_place()
+
+        self._update_predicted_speed()
+        if self.motion_gate is not None:
+            self.motion_gate.update_roi(raw_rows, self._img_shape, self.mirror)
+        # Callers keep lmList across frames - hand out a copy, not the persistent arrays
+        return self.landmarks.tolist()
+
+    def _smooth_in_place(self):
+        """Vectorized smooth_landmarks (velocity filter + exponential blend) on the persistent arrays"""
+        raw, prev_raw = self._raw_xy, self._prev_raw_xy
+        velocity, smoothed, scratch = self._velocity_xy, self._smoothed_xy, self._scratch_xy
+        if self.prev_landmarks is None or not self.smoothing_enabled:
+            # Pass-through frame: like smooth_landmarks, the velocity filters are not fed
+            smoothed[:] = raw
+        else:
+            if self._smoothing_primed:
+                k = self.velocity_filters[0].smoothing
+                np.subtract(raw, prev_raw, out=scratch)
+                velocity *= k
+                scratch *= 1 - k
+                velocity += scratch
+                # Velocity-based prediction
+                np.multiply(velocity, 0.5, out=scratch)
+                scratch += raw
+            else:
+                # First filter update only records the position (VelocityFilter returns x, y)
+                scratch[:] = raw
+                self._smoothing_primed = True
+            prev_raw[:] = raw
+            # Blend with the previous smoothed position
+            scratch *= self.smoothing_factor
+            smoothed *= 1 - self.smoothing_factor
+            smoothed += scratch
+            np.trunc(smoothed, out=smoothed)
+        self.landmarks[:, 1:] = smoothed
+        self.prev_landmarks = self.landmarks
+
+    def _velocity(self, id):
+        if self.reuse_buffers:
+            return self._velocity_xy[id, 0], self._velocity_xy[id, 1]
+        velocity = self.velocity_filters[id]
+        return velocity.velocity_x, velocity.velocity_y
+
+    def _draw_tips(self, img):
+        # Only draw fingertips for performance
+        w = img.shape[1]
+        for id, cx, cy in self.lmList:
+            if id in self.tipIds:
+                if self.mirror:
+                    cx = w - cx  # Back into the unflipped frame being drawn on
+                cv2.circle(img, (cx, cy), 6, (255, 0, 255), cv2.FILLED)
+                cv2.circle(img, (cx, cy), 8, (255, 255, 255), 2)
+
+    def _predict_landmarks(self, frames_ahead):
+        """Extrapolate the last smoothed landmarks with the filters' velocity state"""
+        if self.prev_landmarks is None or len(self.prev_landmarks) == 0:
+            return []
+        # Filter velocity is per inference; convert it to per frame
+        scale = frames_ahead / self.scheduler.last_gap
+        if self.reuse_buffers and self.prev_landmarks is self.landmarks:
+            predicted = self.landmarks.copy()
+            # Float -> int32 assignment truncates toward zero, like int()
+            predicted[:, 1:] = self.landmarks[:, 1:] + self._velocity_xy * scale
+            return predicted.tolist()
+        predicted = []
+        for (lm_id, x, y), velocity in zip(self.prev_landmarks, self.velocity_filters):
+            predicted.append([lm_id,
+                              int(x + velocity.velocity_x * scale),
+                              int(y + velocity.velocity_y * scale)])
+        return predicted
+
+    def _update_predicted_speed(self):
+        velocity_x, velocity_y = self._velocity(8)
+        self.scheduler.predicted_speed = math.hypot(velocity_x, velocity_y) / self.scheduler.last_gap
+
     def fingersUp(self):
         """Detect which fingers are up with optimized logic"""
         fingers = [0] * 5  # Pre-allocate list
@@ -220,6 +665,27 @@ class HandDetector:
             
         return fingers
 
+    def findTips(self, tip_id=8, extended_only=False):
+        """Pixel position of one landmark (index fingertip by default) on every detected hand
+
+        With extended_only, hands whose finger is folded (tip below its middle joint) are skipped.
+        """
+        tips = []
+        if not (self.results and self.results.multi_hand_landmarks) or self._img_shape is None:
+            return tips
+        h, w = self._img_shape[:2]
+        for hand in self.results.multi_hand_landmarks:
+            if len(hand.landmark) <= tip_id:
+                continue
+            lm = hand.landmark[tip_id]
+            if extended_only and tip_id in self.tipIds[1:] and lm.y >= hand.landmark[tip_id - 2].y:
+                continue
+            x, y = self._to_frame_coords(lm.x, lm.y)
+            if self.mirror:
+                x = 1 - x
+            tips.append((int(x * w), int(y * h)))
+        return tips
+
     def getHandCount(self):
         """Get number of detected hands efficiently"""
         if self.results and self.results.multi_hand_landmarks:
@@ -229,6 +695,9 @@ class HandDetector:
     def reset_smoothing(self):
         """Reset smoothing filters - call this when hand is lost"""
         self.prev_landmarks = None
+        self.scheduler.reset()
+        self._smoothing_primed = False
+        self._velocity_xy.fill(0)
         for filter in self.velocity_filters:
             filter.prev_x = None
             filter.prev_y = None
@@ -252,9 +721,10 @@ class HandDetector:
             # Close MediaPipe resources
             if hasattr(self, 'hands') and self.hands:
                 self.hands.close()
+                self.hands = None
                 
-            # Force garbage collection
-            gc.collect()
+            # Collect now, or at the next frame slack when a GCManager is running
+            request_collection()
             
             print("Hand detector cleanup completed")
             
@@ -263,10 +733,186 @@ class HandDetector:
 
     def __del__(self):
         """Destructor for automatic cleanup"""
-        self.cleanup()
+        if hasattr(self, 'lmList'):  # Skip half-constructed detectors
+            self.cleanup()
+
+
+class _Point:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class _HandLandmarks:
+    __slots__ = ('landmark',)
+
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+class LandmarkResults:
+    """Legacy-shaped results (multi_hand_landmarks[i].landmark[j].x/.y) for other backends"""
+    __slots__ = ('multi_hand_landmarks',)
 
+    def __init__(self, hands=None):
+        # Same convention as mp.solutions: None when no hand was found
+        self.multi_hand_landmarks = hands or None
 
-def main():
+    @classmethod
+    def from_array(cls, hands_xyz):
+        """Build results from an (n_hands, 21, 3) array of normalized coordinates"""
+        return cls([_HandLandmarks([_Point(float(x), float(y), float(z)) for x, y, z in hand])
+                    for hand in hands_xyz])
+
+    @classmethod
+    def from_tasks(cls, result):
+        if result is None or not result.hand_landmarks:
+            return cls()
+        return cls([_HandLandmarks([_Point(lm.x, lm.y, lm.z) for lm in hand])
+                    for hand in result.hand_landmarks])
+
+
+def default_model_path():
+    """Location of the MediaPipe Tasks hand landmarker model"""
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, 'models', 'hand_landmarker.task')
+
+
+class TasksHandDetector(HandDetector):
+    """HandDetector backed by the MediaPipe Tasks HandLandmarker (LIVE_STREAM or VIDEO mode)
+
+    In LIVE_STREAM mode frames are submitted with detect_async and results arrive
+    on MediaPipe's thread, so findHands never waits for inference; findPosition
+    uses the latest result available. VIDEO mode runs synchronously with the
+    same timestamped input and is mainly useful for benchmarking.
+    """
+    def __init__(self, model_path=None, running_mode="live_stream", pending_timeout=0.2, **kwargs):
+        # Needed by _create_hands, which the base constructor calls
+        self.model_path = model_path or default_model_path()
+        self.running_mode = running_mode
+        # A result that has not arrived after this long (a few frames) is given up on
+        self.pending_timeout = pending_timeout
+        self._latest_results = LandmarkResults()
+        self._pending = False
+        self._pending_since = 0.0
+        self._pending_lock = threading.Lock()  # _on_result runs on MediaPipe's thread
+        self._submitted_at = {}
+        self._last_timestamp = -1
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Hand landmarker model not found: {self.model_path}")
+        super().__init__(**kwargs)
+
+    def _create_hands(self):
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        live_stream = self.running_mode == "live_stream"
+        options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM if live_stream else vision.RunningMode.VIDEO,
+            num_hands=self.maxHands,
+            min_hand_detection_confidence=self.detectionCon,
+            min_hand_presence_confidence=self.detectionCon,
+            min_tracking_confidence=self.trackCon,
+            result_callback=self._on_result if live_stream else None
+        )
+        return vision.HandLandmarker.create_from_options(options)
+
+    def set_model_complexity(self, complexity):
+        # The task bundle ships a single model - nothing to switch
+        self.modelComplexity = complexity
+
+    def _next_timestamp(self):
+        timestamp = self._timestamp_ms
+        if timestamp is None:
+            timestamp = int(time.perf_counter() * 1000)
+        # MediaPipe requires strictly increasing timestamps
+        timestamp = max(int(timestamp), self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        return timestamp
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """Called on MediaPipe's thread when a LIVE_STREAM frame finishes"""
+        self._latest_results = LandmarkResults.from_tasks(result)
+        with self._pending_lock:
+            self._pending = False
+            submitted = self._submitted_at.pop(timestamp_ms, None)
+        if self.monitor is not None and submitted is not None:
+            self.monitor.record('hands.async_latency', time.perf_counter() - submitted)
+
+    def _process(self, img):
+        t_start = time.perf_counter()
+        if self.running_mode == "live_stream" and self._pending:
+            if t_start - self._pending_since < self.pending_timeout:
+                # Previous frame still in flight - never queue behind it
+                if self.monitor is not None:
+                    self.monitor.count('async_frames_dropped')
+                return self._latest_results
+            # The callback never came - stop waiting for it
+            with self._pending_lock:
+                self._pending = False
+                self._submitted_at.clear()
+            if self.monitor is not None:
+                self.monitor.count('async_results_expired')
+
+        imgRGB = self._to_rgb(img)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=imgRGB)
+        timestamp = self._next_timestamp()
+        t_converted = time.perf_counter()
+
+        if self.running_mode == "live_stream":
+            with self._pending_lock:
+                self._submitted_at[timestamp] = t_converted
+            try:
+                self.hands.detect_async(mp_image, timestamp)
+            except Exception:
+                with self._pending_lock:
+                    self._submitted_at.pop(timestamp, None)
+                raise
+            with self._pending_lock:
+                # Only in flight if the callback has not already delivered it
+                self._pending = timestamp in self._submitted_at
+                self._pending_since = t_converted
+        else:
+            self._latest_results = LandmarkResults.from_tasks(
+                self.hands.detect_for_video(mp_image, timestamp))
+
+        if self.monitor is not None:
+            self.monitor.record('hands.convert', t_converted - t_start)
+            self.monitor.record('hands.process', time.perf_counter() - t_converted)
+        return self._latest_results
+
+    def _draw_hand(self, img, handLms):
+        # drawing_utils expects protobuf landmark lists, so draw the points directly
+        self._draw_points(img, handLms)
+
+
+HAND_DETECTOR_BACKENDS = ("legacy", "tasks_live_stream", "tasks_video", "process")
+
+
+def create_hand_detector(backend="legacy", model_path=None, **kwargs):
+    """Create a detector for the named backend, falling back to the legacy solution"""
+    if backend in ("tasks_live_stream", "tasks_video"):
+        try:
+            return TasksHandDetector(model_path=model_path,
+                                     running_mode=backend[len("tasks_"):], **kwargs)
+        except Exception as e:
+            print(f"Could not start {backend} hand detector ({e}) - using legacy backend")
+    elif backend == "process":
+        try:
+            from HandTrackingProcess import ProcessHandDetector
+            return ProcessHandDetector(**kwargs)
+        except Exception as e:
+            print(f"Could not start process hand detector ({e}) - using legacy backend")
+    elif backend != "legacy":
+        print(f"Unknown hand detector backend '{backend}' - using legacy backend")
+    return HandDetector(**kwargs)
+
+
+def main(backend="legacy"):
     """Test function with memory optimization and smoothing"""
     pTime = 0
     cap = None
@@ -286,8 +932,8 @@ def main():
         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         
         # Use optimized detector with smoothing
-        detector = HandDetector(detectionCon=0.7, trackCon=0.5)
-        frame_count = 0
+        detector = create_hand_detector(backend, detectionCon=0.7, trackCon=0.5)
+        print(f"Using {type(detector).__name__} ({backend})")
         
         while True:
             success, img = cap.read()
@@ -315,6 +961,8 @@ def main():
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
             cv2.putText(img, f"Smoothing: {detector.smoothing_factor}", (10, 60), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+            cv2.putText(img, f"Backend: {backend}", (10, 90),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
 
             cv2.imshow("Hand Tracking - Smoothed", img)
             
@@ -322,12 +970,6 @@ def main():
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-            # Periodic garbage collection
-            if frame_count % 100 == 0:
-                gc.collect()
-                frame_count = 0
-            frame_count += 1
-
     except KeyboardInterrupt:
         print("Program interrupted by user")
     except Exception as e:
@@ -340,7 +982,8 @@ def main():
         if detector:
             detector.cleanup()
         cv2.destroyAllWindows()
-        gc.collect()
+        request_collection()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python HandTrackingModule.py [legacy|tasks_live_stream|tasks_video]
+    main(sys.argv[1] if len(sys.argv) > 1 else "legacy")
\ No newline at end of file
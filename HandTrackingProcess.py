@@ -0,0 +1,261 @@
+# HandTrackingProcess.py
+import numpy as np
+import multiprocessing as mp_proc
+from multiprocessing import shared_memory
+import queue
+import time
+from HandTrackingModule import HandDetector, LandmarkResults, TasksHandDetector
+
+NUM_LANDMARKS = 21
+FRAME_SLOTS = 3
+# Result block layout (float64): [version, seq, n_hands, process_ms, hands * 21 * 3 ...]
+RESULT_HEADER = 4
+
+
+def _results_to_array(results, max_hands):
+    hands = np.zeros((max_hands, NUM_LANDMARKS, 3), np.float64)
+    count = 0
+    if results is not None and results.multi_hand_landmarks:
+        for handLms in results.multi_hand_landmarks[:max_hands]:
+            for i, lm in enumerate(handLms.landmark[:NUM_LANDMARKS]):
+                hands[count, i] = (lm.x, lm.y, lm.z)
+            count += 1
+    return count, hands
+
+
+def _inference_worker(frames_name, results_name, frame_shape, max_hands, detector_kwargs,
+                      requests, ready):
+    """Worker process: runs HandDetector inference on frames from shared memory"""
+    frames_shm = shared_memory.SharedMemory(name=frames_name)
+    results_shm = shared_memory.SharedMemory(name=results_name)
+    max_h, max_w = frame_shape
+    slot_bytes = max_h * max_w * 3
+    results_block = np.ndarray((RESULT_HEADER + max_hands * NUM_LANDMARKS * 3,), np.float64,
+                               buffer=results_shm.buf)
+    detector = None
+    try:
+        detector = HandDetector(maxHands=max_hands, **detector_kwargs)
+        ready.set()
+        while True:
+            try:
+                message = requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if message is None:
+                break
+
+            # Only the newest frame matters - drain anything that queued up
+            while True:
+                try:
+                    newer = requests.get_nowait()
+                except queue.Empty:
+                    break
+                if newer is None:
+                    return
+                if newer[0] == 'complexity':
+                    detector.set_model_complexity(newer[1])
+                else:
+                    message = newer
+
+            if message[0] == 'complexity':
+                detector.set_model_complexity(message[1])
+                continue
+
+            _, slot, h, w, seq = message
+            start = time.perf_counter()
+            try:
+                frame = np.ndarray((h, w, 3), np.uint8, buffer=frames_shm.buf, offset=slot * slot_bytes)
+                results = detector._process(frame)
+                count, hands = _results_to_array(results, max_hands)
+            except Exception as e:
+                # Publish an empty result for this seq so the main process keeps submitting
+                print(f"Hand tracking worker frame error: {e}")
+                count, hands = 0, np.zeros((max_hands, NUM_LANDMARKS, 3), np.float64)
+            process_ms = (time.perf_counter() - start) * 1000.0
+
+            # Seqlock write: odd version while the block is being updated
+            results_block[0] += 1
+            results_block[1] = seq
+            results_block[2] = count
+            results_block[3] = process_ms
+            results_block[RESULT_HEADER:] = hands.ravel()
+            results_block[0] += 1
+    except Exception as e:
+        print(f"Hand tracking worker error: {e}")
+    finally:
+        del results_block
+        if detector is not None:
+            detector.cleanup()
+        frames_shm.close()
+        results_shm.close()
+
+
+class _WorkerHandle:
+    """Owns the worker process and shared memory; close() mirrors Hands.close()"""
+    def __init__(self, frame_shape, max_hands, detector_kwargs):
+        max_h, max_w = frame_shape
+        self.slot_bytes = max_h * max_w * 3
+        self.frames_shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * FRAME_SLOTS)
+        self.results_shm = shared_memory.SharedMemory(
+            create=True, size=8 * (RESULT_HEADER + max_hands * NUM_LANDMARKS * 3))
+        self.results_block = np.ndarray((RESULT_HEADER + max_hands * NUM_LANDMARKS * 3,), np.float64,
+                                        buffer=self.results_shm.buf)
+        self.results_block[:] = 0
+        self.requests = mp_proc.Queue()
+        ready = mp_proc.Event()
+        self.process = mp_proc.Process(
+            target=_inference_worker,
+            args=(self.frames_shm.name, self.results_shm.name, frame_shape, max_hands,
+                  detector_kwargs, self.requests, ready),
+            name="HandTrackingWorker",
+            daemon=True
+        )
+        self.process.start()
+        deadline = time.monotonic() + 20
+        while not ready.wait(timeout=0.1):
+            if not self.process.is_alive():
+                print("Hand tracking worker exited during startup")
+                break
+            if time.monotonic() > deadline:
+                print("Hand tracking worker is slow to start")
+                break
+
+    def frame_view(self, slot, h, w):
+        return np.ndarray((h, w, 3), np.uint8, buffer=self.frames_shm.buf,
+                          offset=slot * self.slot_bytes)
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.requests.put(None)
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        except Exception as e:
+            print(f"Error stopping hand tracking worker: {e}")
+        self.process = None
+        try:
+            del self.results_block
+            self.frames_shm.close()
+            self.frames_shm.unlink()
+            self.results_shm.close()
+            self.results_shm.unlink()
+        except Exception:
+            pass
+
+
+class ProcessHandDetector(HandDetector):
+    """HandDetector whose MediaPipe inference runs in a separate process
+
+    Frames are copied into a shared-memory ring (never pickled) and landmarks
+    come back through a small shared array, so inference runs on another core
+    without holding this process's GIL. Results lag the submitted frame by the
+    worker's inference time; at most one frame is in flight.
+    """
+    def __init__(self, frame_shape=(1080, 1920), max_restarts=2, **kwargs):
+        self.frame_shape = frame_shape  # Largest (height, width) that will be submitted
+        self.max_restarts = max_restarts  # Worker deaths tolerated before running in-process
+        self._restarts = 0
+        self._in_process = False
+        self._submitted_seq = 0
+        self._result_seq = 0
+        self._latest_results = LandmarkResults()
+        super().__init__(**kwargs)
+
+    def _create_hands(self):
+        detector_kwargs = {
+            'mode': self.mode,
+            'detectionCon': self.detectionCon,
+            'trackCon': self.trackCon,
+            'modelComplexity': self.modelComplexity,
+        }
+        return _WorkerHandle(self.frame_shape, self.maxHands, detector_kwargs)
+
+    def set_model_complexity(self, complexity):
+        if self._in_process:
+            HandDetector.set_model_complexity(self, complexity)
+            return
+        if complexity == self.modelComplexity:
+            return
+        self.modelComplexity = complexity
+        self.hands.requests.put(('complexity', complexity))
+
+    def _recover_worker(self):
+        """Replace a dead worker, or fall back to in-process inference after max_restarts"""
+        print("Hand tracking worker stopped unexpectedly")
+        try:
+            self.hands.close()
+        except Exception as e:
+            print(f"Error closing hand tracking worker: {e}")
+        # A new worker (or none) starts counting from zero
+        self._submitted_seq = 0
+        self._result_seq = 0
+        self._latest_results = LandmarkResults()
+        try:
+            if self._restarts < self.max_restarts:
+                self._restarts += 1
+                self.hands = self._create_hands()
+                print(f"Hand tracking worker restarted ({self._restarts}/{self.max_restarts})")
+                if self.monitor is not None:
+                    self.monitor.count('worker_restarts')
+                return
+        except Exception as e:
+            print(f"Error restarting hand tracking worker: {e}")
+        self._in_process = True
+        self.hands = HandDetector._create_hands(self)
+        print("Hand tracking now runs in-process")
+
+    def _read_results(self):
+        """Copy the worker's latest results if a consistent new block is available"""
+        block = self.hands.results_block
+        for _ in range(3):
+            version = block[0]
+            if int(version) % 2:
+                continue  # Worker is mid-write
+            seq = int(block[1])
+            count = int(block[2])
+            process_ms = float(block[3])
+            hands = block[RESULT_HEADER:].reshape(self.maxHands, NUM_LANDMARKS, 3)[:count].copy()
+            if block[0] == version:
+                return seq, hands, process_ms
+        return None
+
+    def _process(self, img):
+        if self._in_process:
+            return HandDetector._process(self, img)
+        if self.hands.process is None or not self.hands.process.is_alive():
+            self._recover_worker()
+            if self._in_process:
+                return HandDetector._process(self, img)
+
+        h, w = img.shape[:2]
+        max_h, max_w = self.frame_shape
+
+        snapshot = self._read_results()
+        if snapshot is not None and snapshot[0] > self._result_seq:
+            self._result_seq, hands, process_ms = snapshot
+            self._latest_results = LandmarkResults.from_array(hands)
+            if self.monitor is not None:
+                self.monitor.record('hands.worker_process', process_ms / 1000.0)
+
+        if self._submitted_seq > self._result_seq:
+            # Previous frame still in the worker - drop this one rather than queue
+            if self.monitor is not None:
+                self.monitor.count('async_frames_dropped')
+        elif h > max_h or w > max_w or img.ndim != 3:
+            if self.monitor is not None:
+                self.monitor.count('process_frames_oversize')
+        else:
+            t_start = time.perf_counter()
+            self._submitted_seq += 1
+            slot = self._submitted_seq % FRAME_SLOTS
+            np.copyto(self.hands.frame_view(slot, h, w), img)
+            self.hands.requests.put(('frame', slot, h, w, self._submitted_seq))
+            if self.monitor is not None:
+                self.monitor.record('hands.handoff', time.perf_counter() - t_start)
+
+        return self._latest_results
+
+    # Results are plain LandmarkResults, drawn the same way as the Tasks backend
+    _draw_hand = TasksHandDetector._draw_hand
@@ -0,0 +1,366 @@
+# InfiniteCanvas.py
+import cv2
+import numpy as np
+import math
+import os
+import shutil
+import struct
+import zlib
+import tempfile
+import threading
+from collections import OrderedDict
+from PaintingPipeline import interpolate_points, draw_segments, ERASER_COLOR
+
+CANVAS_ROOT = os.path.join(os.path.expanduser("~"), ".beyondthebrush", "canvas")
+
+
+def prune_sessions(root=CANVAS_ROOT, keep=1):
+    """Delete all but the `keep` most recent session directories; returns how many were removed"""
+    try:
+        sessions = [os.path.join(root, name) for name in os.listdir(root) if name.startswith("session_")]
+    except OSError:
+        return 0
+    sessions = [path for path in sessions if os.path.isdir(path)]
+    sessions.sort(key=os.path.getmtime, reverse=True)
+    for path in sessions[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+    return max(0, len(sessions) - keep)
+
+
+class TileStore:
+    """Square BGR world tiles in .npy files, memory-mapped on demand
+
+    Only the max_resident most recently used tiles stay mapped; older ones
+    are flushed and unmapped, so memory does not grow with the artwork.
+    Tiles that were never drawn on have no file at all.
+    """
+
+    def __init__(self, directory, tile_size=256, max_resident=64, monitor=None):
+        self.directory = directory
+        self.tile_size = tile_size
+        self.max_resident = max_resident
+        self.monitor = monitor  # Optional PerformanceMonitor for tile counters
+        self._resident = OrderedDict()  # (tx, ty) -> memmap, least recently used first
+        self._lock = threading.RLock()  # The save thread exports tiles while the loop draws
+        # Tiles on disk, so lookups of empty space never touch the filesystem
+        self._known = set()
+        for name in os.listdir(directory):
+            if name.startswith("tile_") and name.endswith(".npy"):
+                tx, ty = name[5:-4].split("_")
+                self._known.add((int(tx), int(ty)))
+
+    def _path(self, tx, ty):
+        return os.path.join(self.directory, f"tile_{tx}_{ty}.npy")
+
+    def __contains__(self, key):
+        return key in self._known
+
+    def __len__(self):
+        return len(self._known)
+
+    def get(self, tx, ty, create=False):
+        """Mapped tile (tile_size x tile_size x 3), or None if it is empty and create is False"""
+        key = (tx, ty)
+        with self._lock:
+            tile = self._resident.get(key)
+            if tile is not None:
+                self._resident.move_to_end(key)
+                return tile
+            if key in self._known:
+                tile = np.lib.format.open_memmap(self._path(tx, ty), mode='r+')
+            elif create:
+                # New files are sparse zeros - blank ink until drawn on
+                tile = np.lib.format.open_memmap(self._path(tx, ty), mode='w+', dtype=np.uint8,
+                                                 shape=(self.tile_size, self.tile_size, 3))
+                self._known.add(key)
+            else:
+                return None
+            if self.monitor is not None:
+                self.monitor.count('canvas_tile_maps')
+            self._resident[key] = tile
+            while len(self._resident) > self.max_resident:
+                _, evicted = self._resident.popitem(last=False)
+                evicted.flush()
+                if self.monitor is not None:
+                    self.monitor.count('canvas_tile_evictions')
+            return tile
+
+    def keys(self):
+        """(tx, ty) of every tile on disk"""
+        with self._lock:
+            return list(self._known)
+
+    def flush(self):
+        with self._lock:
+            for tile in self._resident.values():
+                tile.flush()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._resident.clear()
+
+    def stats(self):
+        return {'tiles': len(self._known), 'resident': len(self._resident),
+                'resident_mb': round(len(self._resident) * self.tile_size ** 2 * 3 / (1024 * 1024), 1)}
+
+
+class InfiniteCanvas:
+    """Ink canvas larger than the screen, viewed through a pan/zoom viewport
+
+    The world (tiles on disk) holds the artwork; the ink layer only holds
+    the current view. Strokes go to both: the layer for this frame, the
+    world tiles in world coordinates so they survive panning and zooming.
+    """
+
+    def __init__(self, view_shape, directory=None, tile_size=256, max_resident=64,
+                 min_zoom=0.25, max_zoom=4.0, monitor=None, keep_sessions=2):
+        if directory is None:
+            # One session directory per run, kept on close so no artwork is lost.
+            # Only the last keep_sessions runs stay on disk (shared lab PCs);
+            # pass an old session's directory to reopen its tiles.
+            os.makedirs(CANVAS_ROOT, exist_ok=True)
+            removed = prune_sessions(CANVAS_ROOT, keep=max(0, keep_sessions - 1))
+            if removed:
+                print(f"Removed {removed} old canvas session(s)")
+            directory = tempfile.mkdtemp(prefix="session_", dir=CANVAS_ROOT)
+        self.directory = directory
+        self.store = TileStore(directory, tile_size, max_resident, monitor)
+        self.tile_size = tile_size
+        self.view_height, self.view_width = view_shape[0], view_shape[1]
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.offset_x = 0.0  # World position of the view's top-left pixel
+        self.offset_y = 0.0
+        self.zoom = 1.0  # Screen pixels per world pixel
+
+    def to_world(self, x, y):
+        return self.offset_x + x / self.zoom, self.offset_y + y / self.zoom
+
+    def pan(self, dx, dy):
+        """Move the artwork by (dx, dy) screen pixels"""
+        self.offset_x -= dx / self.zoom
+        self.offset_y -= dy / self.zoom
+        if self.zoom == 1.0:
+            # Whole-pixel offsets keep 1:1 views exact copies of the tiles
+            self.offset_x, self.offset_y = round(self.offset_x), round(self.offset_y)
+
+    def zoom_at(self, factor, anchor):
+        """Scale the view by factor, keeping the world point under anchor in place"""
+        zoom = min(self.max_zoom, max(self.min_zoom, self.zoom * factor))
+        if abs(zoom - 1.0) < 0.05:
+            zoom = 1.0  # Snap back to 1:1 so drawing there is pixel-exact
+        wx, wy = self.to_world(*anchor)
+        self.zoom = zoom
+        self.offset_x = wx - anchor[0] / zoom
+        self.offset_y = wy - anchor[1] / zoom
+        if zoom == 1.0:
+            self.offset_x, self.offset_y = round(self.offset_x), round(self.offset_y)
+
+    def _tiles_in(self, wx0, wy0, wx1, wy1):
+        size = self.tile_size
+        for ty in range(math.floor(wy0 / size), math.ceil(wy1 / size)):
+            for tx in range(math.floor(wx0 / size), math.ceil(wx1 / size)):
+                yield tx, ty
+
+    def draw_stroke(self, xp, yp, x1, y1, color, brush_size, eraser_size):
+        """Replay a screen-space draw_stroke() onto the world tiles it touches"""
+        points = [(xp, yp)] + interpolate_points(xp, yp, x1, y1)
+        world = [(int(round(wx)), int(round(wy))) for wx, wy in (self.to_world(x, y) for x, y in points)]
+        brush = max(1, int(round(brush_size / self.zoom)))
+        eraser = max(1, int(round(eraser_size / self.zoom)))
+        pad = max(brush, eraser) // 2 + 2
+        bx0 = min(p[0] for p in world) - pad
+        by0 = min(p[1] for p in world) - pad
+        bx1 = max(p[0] for p in world) + pad + 1
+        by1 = max(p[1] for p in world) + pad + 1
+        size = self.tile_size
+        erasing = color == ERASER_COLOR
+
+        # Draw the segment into one patch covering it whole: clipping a thick line
+        # at every tile edge would not match the same line drawn on the screen
+        patch = np.zeros((by1 - by0, bx1 - bx0, 3), np.uint8)
+        regions = []
+        for tx, ty in self._tiles_in(bx0, by0, bx1, by1):
+            cx0, cy0 = max(tx * size, bx0), max(ty * size, by0)
+            cx1, cy1 = min((tx + 1) * size, bx1), min((ty + 1) * size, by1)
+            tile_slices = (slice(cy0 - ty * size, cy1 - ty * size), slice(cx0 - tx * size, cx1 - tx * size))
+            patch_slices = (slice(cy0 - by0, cy1 - by0), slice(cx0 - bx0, cx1 - bx0))
+            tile = self.store.get(tx, ty)
+            if tile is not None:
+                patch[patch_slices] = tile[tile_slices]
+            regions.append((tx, ty, tile_slices, patch_slices))
+        local = [(x - bx0, y - by0) for x, y in world]
+        draw_segments(patch, local[0][0], local[0][1], local[1:], color, brush, eraser)
+
+        for tx, ty, tile_slices, patch_slices in regions:
+            src = patch[patch_slices]
+            # Erasing never creates tiles - empty space is already blank
+            tile = self.store.get(tx, ty, create=not erasing and bool(src.any()))
+            if tile is not None:
+                tile[tile_slices] = src
+
+    def render_view(self, layer):
+        """Fill the ink layer with the world as seen through the current viewport"""
+        layer.image.fill(0)
+        size = self.tile_size
+        wx0, wy0 = self.offset_x, self.offset_y
+        wx1 = wx0 + self.view_width / self.zoom
+        wy1 = wy0 + self.view_height / self.zoom
+        interpolation = cv2.INTER_NEAREST if self.zoom >= 1.0 else cv2.INTER_AREA
+        for tx, ty in self._tiles_in(wx0, wy0, wx1, wy1):
+            if (tx, ty) not in self.store:
+                continue
+            tile = self.store.get(tx, ty)
+            # Part of this tile inside the view, in world and then screen pixels
+            cx0, cy0 = max(tx * size, wx0), max(ty * size, wy0)
+            cx1, cy1 = min((tx + 1) * size, wx1), min((ty + 1) * size, wy1)
+            sx0 = int(round((cx0 - wx0) * self.zoom))
+            sy0 = int(round((cy0 - wy0) * self.zoom))
+            sx1 = min(int(round((cx1 - wx0) * self.zoom)), self.view_width)
+            sy1 = min(int(round((cy1 - wy0) * self.zoom)), self.view_height)
+            if sx1 <= sx0 or sy1 <= sy0:
+                continue
+            src = tile[int(cy0 - ty * size):int(math.ceil(cy1 - ty * size)),
+                       int(cx0 - tx * size):int(math.ceil(cx1 - tx * size))]
+            if src.size == 0:
+                continue
+            dst = layer.image[sy0:sy1, sx0:sx1]
+            if src.shape[:2] == dst.shape[:2]:
+                dst[:] = src
+            else:
+                dst[:] = cv2.resize(src, (sx1 - sx0, sy1 - sy0), interpolation=interpolation)
+        layer.mark_dirty()
+
+    def _sync_pixels(self, patch, x0, y0):
+        """Make the world match a 1:1 screen patch at (x0, y0), writing only pixels that differ"""
+        wx0, wy0 = int(self.offset_x) + x0, int(self.offset_y) + y0
+        h, w = patch.shape[:2]
+        size = self.tile_size
+        for tx, ty in self._tiles_in(wx0, wy0, wx0 + w, wy0 + h):
+            cx0, cy0 = max(tx * size, wx0), max(ty * size, wy0)
+            cx1, cy1 = min((tx + 1) * size, wx0 + w), min((ty + 1) * size, wy0 + h)
+            src = patch[cy0 - wy0:cy1 - wy0, cx0 - wx0:cx1 - wx0]
+            tile = self.store.get(tx, ty)
+            if tile is None:
+                # Empty space is blank - only ink needs a new tile
+                if not src.any():
+                    continue
+                tile = self.store.get(tx, ty, create=True)
+            dst = tile[cy0 - ty * size:cy1 - ty * size, cx0 - tx * size:cx1 - tx * size]
+            changed = np.any(dst != src, axis=2)
+            if changed.any():
+                np.copyto(dst, src, where=changed[..., None])
+
+    def restore_layer(self, layer, snapshot):
+        """Load an undo snapshot into the view layer and write the pixels it changed to the world
+
+        Only valid at zoom 1, where the view is an exact copy of the world;
+        at other zooms writing the view back would resample the artwork.
+        """
+        if self.zoom != 1.0:
+            raise ValueError("undo snapshots can only be restored at zoom 1")
+        restored = layer.changed_tiles(snapshot.version)
+        layer.load(snapshot)
+        for ty, tx in restored:
+            ys, xs = layer.grid.slices[ty][tx]
+            # Whole tiles are reloaded, but only the undone stroke differs from the world
+            self._sync_pixels(layer.image[ys, xs], xs.start, ys.start)
+
+    def ink_bounds(self):
+        """(x0, y0, x1, y1) world rect of the drawn pixels, scanned a tile at a time; None if blank"""
+        bounds = None
+        size = self.tile_size
+        for tx, ty in self.store.keys():
+            tile = self.store.get(tx, ty)
+            if tile is None:
+                continue
+            ink = np.any(tile, axis=2)
+            rows, cols = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+            if rows.size == 0:
+                continue
+            box = (tx * size + cols[0], ty * size + rows[0], tx * size + cols[-1] + 1, ty * size + rows[-1] + 1)
+            bounds = box if bounds is None else (min(bounds[0], box[0]), min(bounds[1], box[1]),
+                                                 max(bounds[2], box[2]), max(bounds[3], box[3]))
+        return bounds
+
+    def export_png(self, path, background=255):
+        """Write the whole artwork at 1:1 on a plain background to a PNG, cropped to the ink
+
+        The image is streamed one band of tiles at a time, so memory stays at
+        one tile row of the artwork's width however tall the world grows.
+        Returns (width, height), or None for a blank canvas (nothing written).
+        """
+        bounds = self.ink_bounds()
+        if bounds is None:
+            return None
+        x0, y0, x1, y1 = (int(v) for v in bounds)
+        width, height = x1 - x0, y1 - y0
+        size = self.tile_size
+        compressor = zlib.compressobj(6)
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            _write_png_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            band = np.empty((size, width, 3), np.uint8)
+            for ty in range(y0 // size, (y1 - 1) // size + 1):
+                by0, by1 = max(ty * size, y0), min((ty + 1) * size, y1)
+                rows = band[:by1 - by0]
+                rows.fill(background)
+                for tx in range(x0 // size, (x1 - 1) // size + 1):
+                    if (tx, ty) not in self.store:
+                        continue
+                    tile = self.store.get(tx, ty)
+                    cx0, cx1 = max(tx * size, x0), min((tx + 1) * size, x1)
+                    src = tile[by0 - ty * size:by1 - ty * size, cx0 - tx * size:cx1 - tx * size]
+                    np.copyto(rows[:, cx0 - x0:cx1 - x0], src, where=np.any(src, axis=2)[..., None])
+                # PNG rows: filter byte 0, then RGB
+                scanlines = np.zeros((len(rows), 1 + width * 3), np.uint8)
+                scanlines[:, 1:] = rows[:, :, ::-1].reshape(len(rows), -1)
+                data = compressor.compress(scanlines.tobytes())
+                if data:
+                    _write_png_chunk(f, b'IDAT', data)
+            _write_png_chunk(f, b'IDAT', compressor.flush())
+            _write_png_chunk(f, b'IEND', b'')
+        return width, height
+
+    def close(self):
+        self.store.close()
+
+
+def _write_png_chunk(f, kind, data):
+    f.write(struct.pack('>I', len(data)) + kind + data)
+    f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+class PanZoomGesture:
+    """Two-hand navigation: the midpoint of the fingertips pans, their spread zooms"""
+
+    def __init__(self, dead_zone=2.0, zoom_dead_zone=0.02):
+        self.dead_zone = dead_zone  # Pixels of midpoint motion ignored (hand jitter)
+        self.zoom_dead_zone = zoom_dead_zone  # Relative spread change ignored
+        self._midpoint = None
+        self._spread = None
+
+    def reset(self):
+        self._midpoint = None
+        self._spread = None
+
+    def update(self, tips):
+        """Feed fingertip positions; returns (dx, dy, zoom_factor, anchor) or None"""
+        if len(tips) < 2:
+            self.reset()
+            return None
+        (ax, ay), (bx, by) = tips[0], tips[1]
+        midpoint = ((ax + bx) / 2.0, (ay + by) / 2.0)
+        spread = max(math.hypot(ax - bx, ay - by), 1.0)
+        if self._midpoint is None:
+            self._midpoint, self._spread = midpoint, spread
+            return None
+        dx = midpoint[0] - self._midpoint[0]
+        dy = midpoint[1] - self._midpoint[1]
+        factor = spread / self._spread
+        if abs(dx) < self.dead_zone and abs(dy) < self.dead_zone and abs(factor - 1.0) < self.zoom_dead_zone:
+            # Below the dead zone: keep the reference so slow motion still adds up
+            return None
+        self._midpoint, self._spread = midpoint, spread
+        return dx, dy, factor, (int(midpoint[0]), int(midpoint[1]))
@@ -0,0 +1,107 @@
+# InputPump.py
+import cv2
+import time
+import _tkinter
+from collections import deque
+
+NO_KEY = -1
+ESC_KEY = 27
+# waitKey() & 0xFF on a frame without a key; queued so key-repeat state resets between presses
+EMPTY_KEY = NO_KEY & 0xFF
+
+
+class KeyEvent:
+    __slots__ = ('key', 'time')
+
+    def __init__(self, key, timestamp):
+        self.key = key  # Low byte of the HighGUI key code, as waitKey() & 0xFF
+        self.time = timestamp  # time.time() when this key was read
+
+    def __repr__(self):
+        return f"KeyEvent({self.key}, {self.time:.3f})"
+
+
+class InputPump:
+    """Pumps HighGUI and Tk events once per frame into a timestamped key queue
+
+    Every consumer (text input, ESC, hotkeys) reads from the same queue, so a
+    key is never swallowed by a waitKey() call meant for someone else.
+    """
+
+    def __init__(self, tk_root=None, max_keys_per_pump=8, monitor=None, max_queue=64,
+                 tk_budget_ms=2.0):
+        self.tk_root = tk_root
+        self.max_keys_per_pump = max_keys_per_pump  # Keys drained from HighGUI per pump
+        self.monitor = monitor  # Optional PerformanceMonitor for pump timing
+        self.tk_budget = tk_budget_ms / 1000.0  # Time Tk may take per pump; the rest waits
+        self.tk_closed = False
+        # MEMORY OPTIMIZATION: Bounded queue - old keys drop if nobody consumes them
+        self.queue = deque(maxlen=max_queue)
+        # pollKey() (OpenCV 4.5+) pumps HighGUI without the 1 ms waitKey() sleep
+        self._poll = getattr(cv2, 'pollKey', None)
+
+    def _read_key(self, first):
+        if self._poll is not None:
+            return self._poll()
+        # Old OpenCV: one blocking 1 ms wait per pump, nothing more
+        return cv2.waitKey(1) if first else NO_KEY
+
+    def pump(self):
+        """Pump HighGUI and Tk once; returns the number of keys queued
+
+        A pump that reads no key queues one EMPTY_KEY event, as the old
+        per-frame waitKey() returned 255, so a letter typed twice is seen
+        as two presses rather than a held key.
+        """
+        t_start = time.perf_counter()
+        count = 0
+        for i in range(self.max_keys_per_pump):
+            key = self._read_key(i == 0)
+            if key == NO_KEY:
+                break
+            self.queue.append(KeyEvent(key & 0xFF, time.time()))
+            count += 1
+        if count == 0 and (not self.queue or self.queue[-1].key != EMPTY_KEY):
+            self.queue.append(KeyEvent(EMPTY_KEY, time.time()))
+
+        if self.tk_root is not None and not self.tk_closed:
+            self._pump_tk()
+
+        if self.monitor is not None:
+            self.monitor.record('input_pump', time.perf_counter() - t_start)
+        return count
+
+    def _pump_tk(self):
+        """Handle pending Tk events one at a time until none are left or the budget is spent"""
+        try:
+            if not self.tk_root.winfo_exists():
+                self.tk_closed = True
+                return
+            deadline = time.perf_counter() + self.tk_budget
+            interpreter = self.tk_root.tk
+            while interpreter.dooneevent(_tkinter.DONT_WAIT):
+                if time.perf_counter() >= deadline:
+                    # Leftover events (e.g. a fast slider drag) continue next frame
+                    if self.monitor is not None:
+                        self.monitor.count('tk_budget_hits')
+                    break
+        except Exception:
+            # TclError once the window is destroyed
+            self.tk_closed = True
+
+    def consume(self, key):
+        """Remove the oldest queued event for key; True if there was one"""
+        for event in self.queue:
+            if event.key == key:
+                self.queue.remove(event)
+                return True
+        return False
+
+    def drain(self):
+        """Take every queued event, oldest first"""
+        events = list(self.queue)
+        self.queue.clear()
+        return events
+
+    def clear(self):
+        self.queue.clear()
@@ -3,6 +3,10 @@ import cv2
 import numpy as np
 from collections import deque
 import time
+from TextSprite import TextSpriteCache, text_metrics, blit_sprite
+from TextIndex import TextGridIndex
+from TextObjectStore import TextObjectStore
+from TypingAnimation import TypingAnimator, PrefixWidths
 
 class KeyboardInput:
     def __init__(self):
@@ -11,9 +15,9 @@ class KeyboardInput:
         self.cursor_visible = True
         self.cursor_timer = 0
         self.cursor_blink_interval = 0.5
-        self.text_objects = deque(maxlen=15)  # Reduced from 20 for memory
+        self.text_objects = TextObjectStore()  # Labels by stable id, no count limit
         self.dragging = False
-        self.drag_object_index = -1
+        self.drag_object_id = None
         self.drag_offset = (0, 0)
         self.default_font = cv2.FONT_HERSHEY_SIMPLEX
         self.default_scale = 1.0
@@ -24,19 +28,24 @@ class KeyboardInput:
         self.current_input_position = (640, 360)
         self.input_dragging = False
         self.input_drag_offset = (0, 0)
-        self.selected_object_index = -1
         
         # MEMORY OPTIMIZATIONS:
-        self.text_history = deque(maxlen=8)  # Limited undo history
+        self.text_history = deque(maxlen=8)  # Limited undo history (shared snapshots)
         self.history_index = -1
-        self.smooth_text = deque(maxlen=30)  # Limited animation buffer
+        self.sprites = TextSpriteCache()  # Text objects render once, then blit
+        self._index = None  # Hit-test grid, rebuilt lazily after changes
+        self._index_version = -1
+        self._rendered = {}  # id -> (record, sprite box) as last drawn into the text layer
         
         self.last_key_time = time.time()
         self.key_repeat_delay = 0.03
         self.initial_delay = 0.2
         self.last_key = None
         self.animation_speed = 0.1
-        self.char_delay = 0.01
+        self.animations_enabled = True  # Typing animations can be turned off on slow machines
+        # MEMORY OPTIMIZATION: Fixed ring of animation slots instead of a deque of dicts
+        self.typing = TypingAnimator(slots=30, duration=self.animation_speed)
+        self.input_widths = PrefixWidths(self.default_font, self.default_scale, self.default_thickness)
 
     def toggle_keyboard_mode(self):
         self.active = not self.active
@@ -54,32 +63,32 @@ class KeyboardInput:
             while len(self.text_history) > self.history_index + 1:
                 self.text_history.pop()
         
-        # Create minimal state copy
-        state = []
-        for obj in self.text_objects:
-            state.append({
-                'text': obj['text'],
-                'position': obj['position'],
-                'color': obj['color']
-                # Omit constant values to save memory
-            })
-        
-        self.text_history.append(state)
+        # MEMORY OPTIMIZATION: Copy-on-write snapshot - records are shared, not copied
+        self.text_history.append(self.text_objects.snapshot())
         self.history_index = len(self.text_history) - 1
 
+    def text_index(self):
+        """Grid index over the current text objects, rebuilt only when they changed"""
+        if self._index is None or self._index_version != self.text_objects.version:
+            self._index = TextGridIndex(self.text_objects)
+            self._index_version = self.text_objects.version
+        return self._index
+
+    def hit_test(self, x, y):
+        """Id of the topmost text object under (x, y), or None"""
+        return self.text_index().hit(x, y)
+
+    def erase_at(self, x, y):
+        """Remove the topmost text object under (x, y); True if one was removed"""
+        object_id = self.hit_test(x, y)
+        if object_id is None:
+            return False
+        return self.text_objects.remove(object_id)
+
     def restore_state(self, state):
-        """Restore from minimal state"""
-        self.text_objects.clear()
-        for obj_data in state:
-            self.text_objects.append({
-                'text': obj_data['text'],
-                'position': obj_data['position'],
-                'color': obj_data['color'],
-                'font': self.default_font,
-                'scale': self.default_scale,
-                'thickness': self.default_thickness,
-                'selected': False
-            })
+        """Restore a text_history snapshot"""
+        self.text_objects.restore(state)
+        self.drag_object_id = None
 
     def undo(self):
         if self.history_index > 0:
@@ -95,18 +104,16 @@ class KeyboardInput:
             return True
         return False
 
-    def get_selected_index(self):
-        """Get the index of currently selected text object"""
-        for i, obj in enumerate(self.text_objects):
-            if obj.get('selected', False):
-                return i
-        return -1
+    def get_selected_id(self):
+        """Get the id of currently selected text object (None if nothing is selected)"""
+        return self.text_objects.selected_id
 
-    def process_key_input(self, key):
+    def process_key_input(self, key, timestamp=None):
         if not self.active:
             return False
 
-        current_time = time.time()
+        # Key repeat timing uses when the key was read, not when it is handled
+        current_time = time.time() if timestamp is None else timestamp
         time_since_last_key = current_time - self.last_key_time
 
         # Handle key repeat logic
@@ -119,10 +126,10 @@ class KeyboardInput:
         else:
             self.last_key_time = current_time
 
-        selected_index = self.get_selected_index()
+        selected = self.text_objects.selected
         
         if key == 13:  # Enter key
-            if selected_index >= 0:
+            if selected is not None:
                 self.clear_selection()
                 self.text = ""
             else:
@@ -130,29 +137,24 @@ class KeyboardInput:
                     # Save state before adding new text
                     self.save_state()
                     left_position = (50, self.current_input_position[1])
-                    self.text_objects.append({
-                        'text': self.text,
-                        'position': left_position,
-                        'color': self.default_color,
-                        'font': self.default_font,
-                        'scale': self.default_scale,
-                        'thickness': self.default_thickness,
-                        'selected': False
-                    })
+                    self.text_objects.add(self.text, left_position, self.default_color,
+                                          self.default_font, self.default_scale,
+                                          self.default_thickness)
                     self.text = ""
                     self.current_input_position = (640, 360)
             return True
             
         elif key == 8:  # Backspace
-            if selected_index >= 0:
-                text = self.text_objects[selected_index]['text']
+            if selected is not None:
+                text = selected.text
                 if text:  # Only save state if there's something to delete
                     self.save_state()
                 chars_to_delete = 1
                 if time_since_last_key < self.key_repeat_delay:
                     chars_to_delete = min(3, len(text))
-                self.text_objects[selected_index]['text'] = text[:-chars_to_delete]
-                if not self.text_objects[selected_index]['text']:
+                if text[:-chars_to_delete]:
+                    self.text_objects.update(selected.id, text=text[:-chars_to_delete])
+                else:
                     self.delete_selected()
             else:
                 if self.text:  # Only save state if there's something to delete
@@ -164,29 +166,28 @@ class KeyboardInput:
             return True
             
         elif 32 <= key <= 126:  # Printable characters
-            if selected_index >= 0:
-                if not self.text_objects[selected_index]['text']:  # First character
+            if selected is not None:
+                if not selected.text:  # First character
                     self.save_state()
-                self.text_objects[selected_index]['text'] += chr(key)
+                selected = self.text_objects.update(selected.id, text=selected.text + chr(key))
             else:
                 if not self.text:  # First character
                     self.save_state()
                 self.text += chr(key)
                 
-            # Add to smooth text buffer with size limit
-            if len(self.smooth_text) >= 30:
-                self.smooth_text.popleft()  # Remove oldest if at limit
-                
-            char_time = len(self.smooth_text) * self.char_delay
-            self.smooth_text.append({
-                'char': chr(key),
-                'alpha': 0,
-                'scale': 0.8,
-                'y_offset': 10,
-                'time': char_time,
-                'elapsed': 0,
-                'target_pos': len(self.text) - 1 if selected_index < 0 else len(self.text_objects[selected_index]['text']) - 1
-            })
+            if not self.animations_enabled:
+                return True
+
+            # Animate the new character at its x offset, measured once now
+            if selected is None:
+                self.input_widths.update(self.text)
+                self.typing.add(chr(key), self.input_widths.width(len(self.text) - 1),
+                                self.default_color, self.default_scale, self.default_thickness)
+            else:
+                x_offset = text_metrics(selected.text[:-1], selected.font,
+                                        selected.scale, selected.thickness)[0]
+                self.typing.add(chr(key), x_offset, selected.color, selected.scale,
+                                selected.thickness, owner=selected.id)
             return True
 
         return False
@@ -197,29 +198,21 @@ class KeyboardInput:
 
         self.save_state()
 
-        self.text_objects.append({
-            'text': self.text,
-            'position': self.current_input_position,
-            'color': self.default_color,
-            'font': self.default_font,
-            'scale': self.default_scale,
-            'thickness': self.default_thickness,
-            'selected': False
-        })
+        self.text_objects.add(self.text, self.current_input_position, self.default_color,
+                              self.default_font, self.default_scale, self.default_thickness)
 
     def delete_selected(self):
         """Delete the currently selected text object"""
-        selected_index = self.get_selected_index()
-        if selected_index >= 0:
+        selected_id = self.text_objects.selected_id
+        if selected_id is not None:
             self.save_state()
-            del self.text_objects[selected_index]
-            self.drag_object_index = -1
+            self.text_objects.remove(selected_id)
+            self.drag_object_id = None
 
     def update(self, dt):
         if not self.active:
             # Clean up animations when inactive
-            if self.smooth_text:
-                self.smooth_text.clear()
+            self.typing.clear()
             return
 
         # Update cursor blink
@@ -228,99 +221,111 @@ class KeyboardInput:
             self.cursor_timer = 0
             self.cursor_visible = not self.cursor_visible
 
-        # Update smooth text animations with cleanup
-        current_time = time.time()
-        completed_animations = []
-        
-        for char_data in self.smooth_text:
-            char_data['elapsed'] += dt
-            progress = min(1.0, char_data['elapsed'] / self.animation_speed)
-            
-            if progress >= 1.0:
-                completed_animations.append(char_data)
-            else:
-                char_data['alpha'] = progress
-                char_data['scale'] = 0.9 + (0.1 * progress)
-                char_data['y_offset'] = 5 * (1 - progress)
-        
-        # Remove completed animations
-        for completed in completed_animations:
-            if completed in self.smooth_text:
-                self.smooth_text.remove(completed)
+        # Advance typing animations (finished slots just go inactive)
+        self.typing.update(dt)
 
     def draw(self, img):
         # Draw all existing text objects
-        for i, obj in enumerate(self.text_objects):
-            # Draw outline
-            cv2.putText(
-                img,
-                obj['text'],
-                obj['position'],
-                obj['font'],
-                obj['scale'],
-                self.outline_color,
-                self.outline_thickness
+        self.draw_labels(img)
+        self.draw_overlay(img)
+
+    def _sprite(self, obj):
+        return self.sprites.get(obj.text, obj.font, obj.scale, obj.color, obj.thickness,
+                                self.outline_color, self.outline_thickness)
+
+    @staticmethod
+    def _sprite_box(sprite, position):
+        h, w = sprite.image.shape[:2]
+        x0, y0 = position[0] - sprite.anchor[0], position[1] - sprite.anchor[1]
+        return (x0, y0, x0 + w, y0 + h)
+
+    def draw_labels(self, img, mask=None, rect=None):
+        """Draw every placed text object (marking its pixels in mask, if given)
+
+        With rect (x0, y0, x1, y1) only that part of img is drawn, in draw order.
+        """
+        self.sprites.reserve(len(self.text_objects))
+        if rect is not None:
+            x0, y0, x1, y1 = rect
+            img = img[y0:y1, x0:x1]
+            mask = mask[y0:y1, x0:x1] if mask is not None else None
+        for obj in self.text_objects:
+            # Outline and fill come from one cached sprite
+            sprite = self._sprite(obj)
+            if rect is None:
+                blit_sprite(img, sprite, obj.position, mask)
+                continue
+            left, top, right, bottom = self._sprite_box(sprite, obj.position)
+            if right <= x0 or left >= x1 or bottom <= y0 or top >= y1:
+                continue
+            blit_sprite(img, sprite, (obj.position[0] - x0, obj.position[1] - y0), mask)
+
+    def render_layer(self, layer, max_partial=8):
+        """Bring the text layer up to date with the text objects
+
+        Only the old and new boxes of labels that changed are cleared and
+        redrawn (one drag frame touches one label); more than max_partial
+        changed labels, e.g. after an undo, redraw the whole layer.
+        """
+        if layer.source == self.text_objects.version:
+            return False
+        rendered = {}
+        changed = []
+        for obj in self.text_objects:
+            previous = self._rendered.get(obj.id)
+            if previous is not None and previous[0] is obj:
+                rendered[obj.id] = previous  # Records are immutable - same object, same pixels
+                continue
+            box = self._sprite_box(self._sprite(obj), obj.position)
+            rendered[obj.id] = (obj, box)
+            changed.append(box if previous is None else self._union(previous[1], box))
+        changed.extend(box for object_id, (_, box) in self._rendered.items() if object_id not in rendered)
+
+        if layer.source is None or len(changed) > max_partial:
+            layer.clear()
+            self.draw_labels(layer.image, layer.mask)
+            layer.mark_dirty()
+        else:
+            height, width = layer.image.shape[:2]
+            for left, top, right, bottom in changed:
+                rect = (max(left, 0), max(top, 0), min(right, width), min(bottom, height))
+                if rect[0] >= rect[2] or rect[1] >= rect[3]:
+                    continue  # Entirely off screen
+                layer.image[rect[1]:rect[3], rect[0]:rect[2]] = 0
+                layer.mask[rect[1]:rect[3], rect[0]:rect[2]] = False
+                self.draw_labels(layer.image, layer.mask, rect)
+                layer.mark_dirty(rect)
+        self._rendered = rendered
+        layer.source = self.text_objects.version
+        return True
+
+    @staticmethod
+    def _union(a, b):
+        return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+    def draw_overlay(self, img):
+        """Per-frame text UI: selection box, input line, typing animations and cursor"""
+        # Draw selection rectangle if selected
+        selected = self.text_objects.selected
+        if selected is not None:
+            text_size = text_metrics(selected.text, selected.font, selected.scale, selected.thickness)
+            top_left = (
+                selected.position[0] - 5,
+                selected.position[1] - text_size[1] - 5
             )
-            # Draw main text
-            cv2.putText(
-                img,
-                obj['text'],
-                obj['position'],
-                obj['font'],
-                obj['scale'],
-                obj['color'],
-                obj['thickness']
+            bottom_right = (
+                selected.position[0] + text_size[0] + 5,
+                selected.position[1] + 5
             )
-
-            # Draw selection rectangle if selected
-            if obj.get('selected', False):
-                text_size = cv2.getTextSize(
-                    obj['text'],
-                    obj['font'],
-                    obj['scale'],
-                    obj['thickness']
-                )[0]
-                top_left = (
-                    obj['position'][0] - 5,
-                    obj['position'][1] - text_size[1] - 5
-                )
-                bottom_right = (
-                    obj['position'][0] + text_size[0] + 5,
-                    obj['position'][1] + 5
-                )
-                cv2.rectangle(img, top_left, bottom_right, (0, 255, 0), 2)
+            cv2.rectangle(img, top_left, bottom_right, (0, 255, 0), 2)
 
         # Draw current input text with smooth animation
         if self.active and (self.text or self.cursor_visible):
-            base_text = self.text
-            
-            # Draw smooth text animations
-            for char_data in self.smooth_text:
-                pos = char_data['target_pos']
-                alpha = char_data['alpha']
-                scale = char_data['scale']
-                y_offset = int(char_data['y_offset'])
-                
-                # Calculate position with offset
-                text_before = base_text[:pos]
-                text_size = cv2.getTextSize(text_before, self.default_font, 
-                                         self.default_scale, self.default_thickness)[0]
-                
-                base_x = self.current_input_position[0] + text_size[0]
-                base_y = self.current_input_position[1]
-                
-                # Apply animation offsets
-                char_pos = (base_x, base_y + y_offset)
-                
-                # Calculate color with alpha
-                color = tuple(int(c * alpha) for c in self.default_color)
-                
-                # Draw character with current scale and alpha
-                font_scale = self.default_scale * scale
-                cv2.putText(img, char_data['char'], char_pos, 
-                          self.default_font, font_scale, 
-                          color, self.default_thickness, 
-                          cv2.LINE_AA)
+            # Draw typing animations in one batch
+            origins = {None: self.current_input_position}
+            if selected is not None:
+                origins[selected.id] = selected.position
+            self.typing.draw(img, self.default_font, origins)
 
             # Draw main text
             cv2.putText(img, self.text, self.current_input_position,
@@ -329,14 +334,9 @@ class KeyboardInput:
 
             # Draw cursor
             if self.cursor_visible:
-                text_size = cv2.getTextSize(
-                    self.text,
-                    self.default_font,
-                    self.default_scale,
-                    self.default_thickness
-                )[0]
+                self.input_widths.update(self.text)
                 cursor_pos = (
-                    self.current_input_position[0] + text_size[0],
+                    self.current_input_position[0] + self.input_widths.width(),
                     self.current_input_position[1]
                 )
                 cv2.line(
@@ -349,42 +349,26 @@ class KeyboardInput:
 
     def check_drag_start(self, x, y):
         # First check if we're selecting existing text objects
-        for i, obj in enumerate(reversed(self.text_objects)):
-            idx = len(self.text_objects) - 1 - i  # Get original index
-            text_size = cv2.getTextSize(
-                obj['text'],
-                obj['font'],
-                obj['scale'],
-                obj['thickness']
-            )[0]
-
-            text_left = obj['position'][0]
-            text_right = obj['position'][0] + text_size[0]
-            text_top = obj['position'][1] - text_size[1]
-            text_bottom = obj['position'][1]
-
-            if (text_left <= x <= text_right and
-                    text_top <= y <= text_bottom):
-                # Deselect all other objects
-                for other_obj in self.text_objects:
-                    other_obj['selected'] = False
-                # Select this object
-                self.text_objects[idx]['selected'] = True
-                self.drag_object_index = idx
-                self.drag_offset = (x - obj['position'][0], y - obj['position'][1])
-                self.dragging = True
-                # Make keyboard active when selecting text
-                self.active = True
-                return True
+        object_id = self.hit_test(x, y)
+        if object_id is not None:
+            obj = self.text_objects.get(object_id)
+            # Selecting replaces any previous selection
+            self.text_objects.select(object_id)
+            self.drag_object_id = object_id
+            self.drag_offset = (x - obj.position[0], y - obj.position[1])
+            self.dragging = True
+            # Make keyboard active when selecting text
+            self.active = True
+            return True
     
         # Then check if we're dragging current input text (only if keyboard active)
         if self.active and (self.text or self.cursor_visible):
-            text_size = cv2.getTextSize(
+            text_size = text_metrics(
                 self.text,
                 self.default_font,
                 self.default_scale,
                 self.default_thickness
-            )[0]
+            )
 
             text_left = self.current_input_position[0]
             text_right = self.current_input_position[0] + text_size[0]
@@ -411,60 +395,49 @@ class KeyboardInput:
                 x - self.input_drag_offset[0],
                 y - self.input_drag_offset[1]
             )
-        elif self.dragging and self.drag_object_index >= 0:
-            # Update position of dragged text object
-            if 0 <= self.drag_object_index < len(self.text_objects):
-                obj = self.text_objects[self.drag_object_index]
-                new_pos = (x - self.drag_offset[0], y - self.drag_offset[1])
-                self.text_objects[self.drag_object_index]['position'] = new_pos
+        elif self.dragging and self.drag_object_id is not None:
+            # Update position of dragged text object (no-op if it was erased meanwhile)
+            new_pos = (x - self.drag_offset[0], y - self.drag_offset[1])
+            self.text_objects.update(self.drag_object_id, position=new_pos)
 
     def end_drag(self):
         self.input_dragging = False
         self.dragging = False
-        self.drag_object_index = -1
+        self.drag_object_id = None
 
     def clear_selection(self):
         """Clear all text selections"""
-        for obj in self.text_objects:
-            obj['selected'] = False
-        self.drag_object_index = -1
+        self.text_objects.clear_selection()
+        self.drag_object_id = None
 
     def cleanup(self):
         """Explicit cleanup method to prevent memory leaks"""
         self.text_objects.clear()
         self.text_history.clear()
-        self.smooth_text.clear()
+        self.typing.clear()
+        self.sprites.clear()
         self.text = ""
         self.active = False
         self.cursor_visible = True
         self.cursor_timer = 0
         self.dragging = False
-        self.drag_object_index = -1
+        self.drag_object_id = None
         self.input_dragging = False
-        self.selected_object_index = -1
         self.current_input_position = (640, 360)
 
     def get_state_for_save(self):
         """Get minimal state for canvas saving"""
-        return [{
-            'text': obj['text'],
-            'position': obj['position'],
-            'color': obj['color'],
-            'font': obj['font'],
-            'scale': obj['scale'],
-            'thickness': obj['thickness']
-        } for obj in self.text_objects]
+        return [obj.to_dict() for obj in self.text_objects]
 
     def restore_state_from_save(self, saved_state):
         """Restore state from saved canvas data"""
         self.text_objects.clear()
         for obj_data in saved_state:
-            self.text_objects.append({
-                'text': obj_data['text'],
-                'position': obj_data['position'],
-                'color': obj_data['color'],
-                'font': obj_data.get('font', self.default_font),
-                'scale': obj_data.get('scale', self.default_scale),
-                'thickness': obj_data.get('thickness', self.default_thickness),
-                'selected': False
-            })
\ No newline at end of file
+            self.text_objects.add(
+                obj_data['text'],
+                tuple(obj_data['position']),
+                tuple(obj_data['color']),
+                obj_data.get('font', self.default_font),
+                obj_data.get('scale', self.default_scale),
+                obj_data.get('thickness', self.default_thickness)
+            )
\ No newline at end of file
@@ -0,0 +1,362 @@
+# LatencyHarness.py
+import cv2
+import numpy as np
+import argparse
+import json
+import math
+import threading
+import time
+from CanvasLayers import LayerStack
+from FramePacer import FramePacer
+from HandTrackingModule import HandDetector, LandmarkResults, MotionGate, _HandLandmarks, _Point
+from PaintingPipeline import draw_stroke, stroke_bounds
+
+# Index-finger-up pose as pixel offsets from the index fingertip (landmark 8) at
+# 640x480. fingersUp() reads it as "drawing mode" (index up, middle folded).
+HAND_TEMPLATE = [
+    (20, 170),                                   # 0 wrist
+    (-15, 150), (-30, 130), (-35, 115), (-30, 105),  # 1-4 thumb
+    (0, 90), (0, 60), (0, 30), (0, 0),           # 5-8 index (up)
+    (25, 90), (25, 70), (25, 95), (25, 105),     # 9-12 middle (folded)
+    (45, 95), (45, 75), (45, 100), (45, 110),    # 13-16 ring (folded)
+    (62, 100), (62, 85), (62, 105), (62, 112),   # 17-20 pinky (folded)
+]
+TEMPLATE_SIZE = (640, 480)
+
+BACKGROUND_COLOR = (60, 60, 60)
+MARKER_COLOR = (0, 255, 0)
+STROKE_COLOR = (255, 0, 255)
+
+# Configurations compared by default: threading, smoothing, inference cadence and the motion gate
+CONFIGS = [
+    {"name": "sync", "threaded": False, "smoothing": True, "detection_interval": 1},
+    {"name": "sync-raw", "threaded": False, "smoothing": False, "detection_interval": 1},
+    {"name": "sync-cadence2", "threaded": False, "smoothing": True, "detection_interval": 2},
+    {"name": "sync-cadence3", "threaded": False, "smoothing": True, "detection_interval": 3},
+    {"name": "threaded", "threaded": True, "smoothing": True, "detection_interval": 1},
+    {"name": "threaded-raw", "threaded": True, "smoothing": False, "detection_interval": 1},
+    # The marker is much smaller than a real hand, so the motion gate sees less
+    # motion than it would in the app; measured on its own, off elsewhere
+    {"name": "sync-gated", "threaded": False, "smoothing": True, "detection_interval": 1,
+     "motion_gate": True},
+]
+
+
+class SyntheticFrameSource:
+    """Camera stand-in: paced, timestamped frames with a marker on a scripted zigzag path"""
+
+    def __init__(self, width=640, height=480, fps=30, speed=300.0, margin=80, row_step=80,
+                 marker_radius=6, realtime=True):
+        self.width = width
+        self.height = height
+        self.frame_interval = 1.0 / fps
+        self.speed = speed  # Marker speed in pixels per second
+        self.marker_radius = marker_radius
+        self.realtime = realtime  # Pace frames like a camera (False = as fast as possible)
+        self.timestamp = None
+        self.position = None  # Marker position in the current frame
+        self.frames = 0
+
+        # Scripted path: left-right sweeps moving down the frame, then back up
+        rows = list(range(margin, height - 200, row_step)) or [height // 3]
+        waypoints = []
+        for i, y in enumerate(rows + rows[-2:0:-1]):
+            xs = (margin, width - margin) if i % 2 == 0 else (width - margin, margin)
+            waypoints += [(xs[0], y), (xs[1], y)]
+        self._waypoints = np.array(waypoints + [waypoints[0]], np.float64)
+        segments = np.diff(self._waypoints, axis=0)
+        self._lengths = np.hypot(segments[:, 0], segments[:, 1])
+        self._offsets = np.concatenate(([0.0], np.cumsum(self._lengths)))
+
+        # Lightly textured background so the frame is not trivially compressible
+        rng = np.random.default_rng(7)
+        self._background = np.full((height, width, 3), BACKGROUND_COLOR, np.uint8)
+        self._background += rng.integers(0, 8, (height, width, 3), dtype=np.uint8)
+        self._frame = np.empty_like(self._background)
+        self._start = None
+        self._next_frame = None
+
+    @property
+    def timestamp_ms(self):
+        return None if self.timestamp is None else int(self.timestamp * 1000)
+
+    def position_at(self, seconds):
+        """Marker position (pixels) after moving along the path for this long"""
+        distance = (seconds * self.speed) % self._offsets[-1]
+        i = min(int(np.searchsorted(self._offsets, distance, side='right')) - 1, len(self._lengths) - 1)
+        t = (distance - self._offsets[i]) / self._lengths[i] if self._lengths[i] else 0.0
+        x, y = self._waypoints[i] + t * (self._waypoints[i + 1] - self._waypoints[i])
+        return int(round(x)), int(round(y))
+
+    def read(self):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+            self._next_frame = now
+        if self.realtime and now < self._next_frame:
+            time.sleep(self._next_frame - now)
+        self.timestamp = time.perf_counter()
+        # A late reader gets the newest frame, like a camera with a 1-frame buffer
+        self._next_frame = max(self._next_frame + self.frame_interval, self.timestamp)
+
+        self.position = self.position_at(self.timestamp - self._start)
+        np.copyto(self._frame, self._background)
+        cv2.circle(self._frame, self.position, self.marker_radius, MARKER_COLOR, cv2.FILLED)
+        self.frames += 1
+        return True, self._frame
+
+    def grab(self):
+        return self.read()[0]
+
+    def skip(self):
+        return self.grab()
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class _ScriptedHands:
+    """Marker 'inference' with a simulated model cost, optionally on a worker thread"""
+
+    def __init__(self, inference_ms, threaded):
+        self.inference_ms = inference_ms
+        self.threaded = threaded
+        self.latest = LandmarkResults()
+        self._pending = None
+        self._busy = False
+        self._lock = threading.Condition()
+        self._stop = False
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="ScriptedHands", daemon=True)
+            self._thread.start()
+
+    def detect(self, img):
+        """Find the marker and build a hand around it"""
+        mask = cv2.inRange(img, (0, 200, 0), (80, 255, 80))
+        moments = cv2.moments(mask, binaryImage=True)
+        if self.inference_ms:
+            time.sleep(self.inference_ms / 1000.0)
+        if moments['m00'] == 0:
+            return LandmarkResults()
+        h, w = img.shape[:2]
+        tip_x = moments['m10'] / moments['m00'] / w
+        tip_y = moments['m01'] / moments['m00'] / h
+        ref_w, ref_h = TEMPLATE_SIZE
+        scale = min(w / ref_w, h / ref_h)
+        hand = [_Point(tip_x + dx * scale / w, tip_y + dy * scale / h) for dx, dy in HAND_TEMPLATE]
+        return LandmarkResults([_HandLandmarks(hand)])
+
+    def process(self, img):
+        if not self.threaded:
+            self.latest = self.detect(img)
+            return self.latest
+        with self._lock:
+            if not self._busy:
+                # One frame in flight, like the live-stream backend
+                self._pending = img.copy()
+                self._busy = True
+                self._lock.notify()
+        return self.latest
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._pending is None and not self._stop:
+                    self._lock.wait()
+                if self._stop:
+                    return
+                img, self._pending = self._pending, None
+            results = self.detect(img)
+            with self._lock:
+                self.latest = results
+                self._busy = False
+
+    def close(self):
+        if self._thread is not None:
+            with self._lock:
+                self._stop = True
+                self._lock.notify()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+class ScriptedHandDetector(HandDetector):
+    """HandDetector whose inference finds the synthetic marker instead of running MediaPipe
+
+    Everything after inference (cadence scheduling, prediction, smoothing,
+    letterbox mapping, gestures) is the real detector code.
+    """
+
+    def __init__(self, inference_ms=15.0, threaded=False, **kwargs):
+        self.inference_ms = inference_ms
+        self.threaded = threaded
+        super().__init__(**kwargs)
+
+    def _create_hands(self):
+        return _ScriptedHands(self.inference_ms, self.threaded)
+
+    def set_model_complexity(self, complexity):
+        self.modelComplexity = complexity
+
+    def _process(self, img):
+        t_start = time.perf_counter()
+        results = self.hands.process(img)
+        if self.monitor is not None:
+            self.monitor.record('hands.process', time.perf_counter() - t_start)
+        return results
+
+    def _draw_hand(self, img, handLms):
+        self._draw_points(img, handLms)
+
+
+def _stroke_visible(output, position, tolerance):
+    x, y = position
+    h, w = output.shape[:2]
+    region = output[max(0, y - tolerance):min(h, y + tolerance + 1),
+                    max(0, x - tolerance):min(w, x + tolerance + 1)]
+    return bool(np.any(np.all(region == STROKE_COLOR, axis=2)))
+
+
+def measure_config(config, frames=150, warmup=15, fps=30, speed=300.0, inference_ms=15.0,
+                   brush_size=3, tolerance=1, timeout=1.0, realtime=True):
+    """Run the painter pipeline on synthetic frames; returns motion-to-photon latencies (ms)
+
+    Follows the VirtualPainter frame loop for the parts that set latency:
+    frame skipping, detection on the raw frame with mirrored landmarks, the
+    motion gate, the flip into a reused display buffer, strokes into the
+    tiled ink layer, the LayerStack composite and FramePacer deadlines.
+    Not modelled: the header/text layers, Tk/HighGUI event pumping
+    (InputPump) and idle mode, which never engages while a hand is in view.
+    """
+    source = SyntheticFrameSource(fps=fps, speed=speed, realtime=realtime)
+    detector = ScriptedHandDetector(inference_ms=inference_ms, threaded=config['threaded'],
+                                    maxHands=1, reuse_buffers=True)
+    detector.smoothing_enabled = config['smoothing']
+    detector.detection_interval = config['detection_interval']
+    if config.get('inference_width'):
+        detector.set_inference_resolution(config['inference_width'])
+    if config.get('motion_gate'):
+        detector.motion_gate = MotionGate(pixel_threshold=12, motion_fraction=0.01, max_skip=30)
+    detector.mirror = True
+    frames_to_skip = config.get('frame_skip', 0)
+
+    layers = LayerStack((source.height, source.width))
+    ink_layer = layers.add('ink', auto_mask=True)
+    pacer = FramePacer(1.0 / fps) if realtime else None
+    display_buffer = None
+    xp, yp = 0, 0
+    pending = []  # (capture time, marker position on screen) not yet painted
+    latencies = []
+    missed = 0
+    frame_skip_counter = 0
+
+    try:
+        frame_index = 0
+        while frame_index < frames + warmup:
+            frame_skip_counter += 1
+            if frame_skip_counter <= frames_to_skip:
+                source.skip()
+                if pacer is not None:
+                    pacer.skip()
+                continue
+            frame_skip_counter = 0
+
+            success, img = source.read()
+            captured = source.timestamp
+            # The screen shows the mirrored frame
+            position = (source.width - 1 - source.position[0], source.position[1])
+
+            img = detector.findHands(img, draw=False, timestamp_ms=source.timestamp_ms)
+            lmList = detector.findPosition(img, draw=False)
+            if display_buffer is None or display_buffer.shape != img.shape:
+                display_buffer = np.empty_like(img)
+            img = cv2.flip(img, 1, dst=display_buffer)
+            if lmList and len(lmList) >= 21:
+                fingers = detector.fingersUp()
+                if fingers[1] and not fingers[2]:
+                    x1, y1 = lmList[8][1:]
+                    if xp == 0 and yp == 0:
+                        xp, yp = x1, y1
+                    stroke_rect = stroke_bounds(xp, yp, x1, y1, brush_size)
+                    xp, yp = draw_stroke(img, ink_layer.image, xp, yp, x1, y1, STROKE_COLOR,
+                                         brush_size, brush_size)
+                    ink_layer.mark_dirty(stroke_rect)
+                else:
+                    xp, yp = 0, 0
+            else:
+                detector.reset_smoothing()
+                xp, yp = 0, 0
+            output = layers.composite(img, ('ink',))
+            shown = time.perf_counter()  # Where the app calls cv2.imshow
+
+            if frame_index >= warmup:
+                pending.append((captured, position))
+            still_pending = []
+            for captured_at, marker in pending:
+                if _stroke_visible(output, marker, tolerance):
+                    latencies.append((shown - captured_at) * 1000.0)
+                elif shown - captured_at > timeout:
+                    missed += 1
+                else:
+                    still_pending.append((captured_at, marker))
+            pending = still_pending
+            frame_index += 1
+            if pacer is not None:
+                pacer.wait()
+    finally:
+        detector.cleanup()
+
+    return latencies, missed + len(pending)
+
+
+def summarize(name, latencies, missed):
+    values = np.array(latencies) if latencies else np.zeros(0)
+    stats = {'config': name, 'samples': int(values.size), 'missed': int(missed)}
+    if values.size:
+        stats.update({
+            'mean_ms': round(float(values.mean()), 1),
+            'p50_ms': round(float(np.percentile(values, 50)), 1),
+            'p90_ms': round(float(np.percentile(values, 90)), 1),
+            'p99_ms': round(float(np.percentile(values, 99)), 1),
+            'max_ms': round(float(values.max()), 1),
+        })
+    return stats
+
+
+def run(configs=CONFIGS, **kwargs):
+    """Measure every configuration and print a latency table"""
+    report = []
+    for config in configs:
+        latencies, missed = measure_config(config, **kwargs)
+        report.append(summarize(config['name'], latencies, missed))
+
+    print(f"{'config':<16}{'n':>6}{'miss':>6}{'mean':>8}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}")
+    for row in report:
+        print(f"{row['config']:<16}{row['samples']:>6}{row['missed']:>6}" +
+              "".join(f"{row.get(key, math.nan):>8.1f}"
+                      for key in ('mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Motion-to-photon latency harness (no camera needed)")
+    parser.add_argument('--frames', type=int, default=150, help="measured frames per configuration")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--speed', type=float, default=300.0, help="marker speed in pixels/second")
+    parser.add_argument('--inference-ms', type=float, default=15.0, help="simulated inference cost")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(frames=args.frames, fps=args.fps, speed=args.speed, inference_ms=args.inference_ms)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
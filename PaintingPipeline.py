@@ -0,0 +1,49 @@
+# PaintingPipeline.py
+import cv2
+import numpy as np
+
+ERASER_COLOR = (0, 0, 0)
+
+
+def interpolate_points(x1, y1, x2, y2, num_points=5):  # Reduced points for performance
+    points = []
+    for i in range(num_points):
+        x = int(x1 + (x2 - x1) * (i / num_points))
+        y = int(y1 + (y2 - y1) * (i / num_points))
+        points.append((x, y))
+    return points
+
+
+def draw_segments(target, xp, yp, points, color, brush_size, eraser_size):
+    """Draw the stroke from (xp, yp) through points onto one image; returns the last point"""
+    for point in points:
+        if color == ERASER_COLOR:
+            half_size = eraser_size // 2
+            top_left = (point[0] - half_size, point[1] - half_size)
+            bottom_right = (point[0] + half_size, point[1] + half_size)
+            cv2.rectangle(target, top_left, bottom_right, color, -1)
+        else:
+            cv2.line(target, (xp, yp), point, color, brush_size)
+        xp, yp = point
+    return xp, yp
+
+
+def draw_stroke(img, canvas, xp, yp, x1, y1, color, brush_size, eraser_size):
+    """Draw one smoothed stroke segment onto the frame and canvas; returns the new (xp, yp)"""
+    points = interpolate_points(xp, yp, x1, y1)
+    draw_segments(img, xp, yp, points, color, brush_size, eraser_size)
+    return draw_segments(canvas, xp, yp, points, color, brush_size, eraser_size)
+
+
+def stroke_bounds(xp, yp, x1, y1, size):
+    """Pixel rect (x0, y0, x1, y1) that draw_stroke() can touch for a stroke of this size"""
+    pad = size // 2 + 2
+    return (min(xp, x1) - pad, min(yp, y1) - pad, max(xp, x1) + pad + 1, max(yp, y1) + pad + 1)
+
+
+def composite_canvas(img, canvas):
+    """Blend the drawing canvas over the camera frame (painted pixels replace the frame)"""
+    mask = cv2.cvtColor(cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    mask = (mask > 0).astype(np.uint8) * 255
+    img = cv2.bitwise_and(img, 255 - mask)
+    return cv2.add(img, canvas)
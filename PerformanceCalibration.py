@@ -0,0 +1,227 @@
+# PerformanceCalibration.py
+import cv2
+import numpy as np
+import json
+import os
+import time
+from AdaptiveQuality import QUALITY_LEVELS, machine_id
+from PaintingPipeline import composite_canvas
+
+CALIBRATION_VERSION = 2
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".beyondthebrush", "performance_profile.json")
+
+# Inference resolutions to probe (width, height)
+INFERENCE_RESOLUTIONS = [(256, 144), (320, 180), (480, 270), (640, 360), (1280, 720)]
+
+# Tier capture settings mirrored from UniversalCompatibility, plus the
+# detection width each tier needs to run at comfortably
+TIER_TARGETS = [
+    ("high_end", 60, 1280, 720, 640),
+    ("medium", 45, 1024, 576, 480),
+    ("low_end", 30, 640, 480, 320),
+]
+
+# Fraction of the frame budget that detection + compositing may use
+BUDGET_SHARE = 0.7
+
+
+def _library_versions():
+    versions = {'opencv': cv2.__version__}
+    try:
+        import mediapipe as mp
+        versions['mediapipe'] = getattr(mp, '__version__', 'unknown')
+    except Exception:
+        versions['mediapipe'] = None
+    return versions
+
+
+def _median_ms(func, repeats, deadline):
+    """Median wall time of func() in ms, stopping early at the deadline"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if time.perf_counter() > deadline:
+            break
+    return float(np.median(samples)) if samples else None
+
+
+def _synthetic_frame(width, height):
+    """Deterministic textured frame so the probes do real work"""
+    rng = np.random.default_rng(1234)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(frame, (9, 9), 0)
+
+
+def measure_inference(resolutions=INFERENCE_RESOLUTIONS, time_budget=1.4, repeats=5,
+                      frame_size=(1280, 720)):
+    """Time detector downscale + inference of a full frame at each resolution (ms per frame)"""
+    results = {}
+    try:
+        from HandTrackingModule import HandDetector
+        detector = HandDetector(maxHands=1, detectionCon=0.5, trackCon=0.5,
+                                modelComplexity=0, reuse_buffers=True)
+    except Exception as e:
+        print(f"Calibration: MediaPipe unavailable ({e})")
+        return results
+
+    try:
+        frame = _synthetic_frame(*frame_size)
+        deadline = time.perf_counter() + time_budget
+        per_resolution = time_budget / len(resolutions)
+        for width, height in resolutions:
+            # Same path as the painter: the detector letterboxes into the inference size
+            detector.set_inference_resolution(width, height)
+            infer = lambda: detector._process(detector._prepare_inference_frame(frame))
+            infer()  # Warm up the graph at this size
+            step_deadline = min(deadline, time.perf_counter() + per_resolution)
+            results[str(width)] = _median_ms(infer, repeats, step_deadline)
+            if time.perf_counter() > deadline:
+                break
+    finally:
+        detector.cleanup()
+    return results
+
+
+def measure_compositing(width=1280, height=720, time_budget=0.3, repeats=10):
+    """Time the VirtualPainter canvas blend for one full frame (ms)"""
+    img = _synthetic_frame(width, height)
+    canvas = np.zeros((height, width, 3), np.uint8)
+    cv2.line(canvas, (100, 100), (width - 100, height - 100), (255, 0, 255), 15)
+
+    return _median_ms(lambda: composite_canvas(img, canvas), repeats,
+                      time.perf_counter() + time_budget)
+
+
+def measure_png_encoding(width=1280, height=642, time_budget=0.3, repeats=3):
+    """Time PNG encoding of a saved-canvas sized image (ms)"""
+    img = np.full((height, width, 3), 255, np.uint8)
+    cv2.line(img, (50, 50), (width - 50, height - 50), (255, 0, 0), 10)
+    cv2.putText(img, "Beyond The Brush", (100, 300), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+    return _median_ms(lambda: cv2.imencode('.png', img), repeats, time.perf_counter() + time_budget)
+
+
+def _inference_cost(inference_ms, width):
+    """Estimated inference cost for a width, using the nearest probed width at or above it"""
+    if not inference_ms:
+        return None
+    probed = sorted((int(w), ms) for w, ms in inference_ms.items() if ms is not None)
+    if not probed:
+        return None
+    for probed_width, ms in probed:
+        if probed_width >= width:
+            return ms
+    return probed[-1][1]
+
+
+def derive_settings(measurements):
+    """Turn raw measurements into a tier and an adaptive quality start level"""
+    inference_ms = measurements.get('inference_ms') or {}
+    composite_ms = measurements.get('composite_ms') or 0.0
+
+    system_type = None
+    for tier, fps, width, height, detection_width in TIER_TARGETS:
+        budget = 1000.0 / fps * BUDGET_SHARE
+        cost = _inference_cost(inference_ms, detection_width)
+        if cost is None:
+            continue
+        scaled_composite = composite_ms * (width * height) / (1280 * 720)
+        if cost + scaled_composite <= budget:
+            system_type = tier
+            break
+    if system_type is None and inference_ms:
+        system_type = "low_end"
+
+    start_level = None
+    if system_type is not None:
+        fps, width, height = next((f, w, h) for t, f, w, h, _ in TIER_TARGETS if t == system_type)
+        budget = 1000.0 / fps * BUDGET_SHARE
+        scaled_composite = composite_ms * (width * height) / (1280 * 720)
+        start_level = 0
+        for level, point in enumerate(QUALITY_LEVELS):
+            inference_width = point['inference_width'] or width
+            cost = _inference_cost(inference_ms, inference_width)
+            if cost is None:
+                break
+            # Complexity 1 is roughly twice the cost of complexity 0
+            cost *= 2.0 if point['model_complexity'] else 1.0
+            cost /= point['detection_interval'] * (point['frame_skip'] + 1)
+            if cost + scaled_composite <= budget:
+                start_level = level
+
+    return {'system_type': system_type, 'start_level': start_level}
+
+
+def is_complete(profile):
+    """True when every probe produced a number and a tier could be derived"""
+    measurements = profile.get('measurements') or {}
+    inference_ms = measurements.get('inference_ms') or {}
+    return (profile.get('system_type') is not None and
+            bool(inference_ms) and all(ms is not None for ms in inference_ms.values()) and
+            measurements.get('composite_ms') is not None and
+            measurements.get('png_encode_ms') is not None)
+
+
+def run_calibration(profile_path=PROFILE_PATH):
+    """Run the ~2 second microbenchmark and persist the machine profile"""
+    print("Calibrating performance for this machine (one time)...")
+    start = time.perf_counter()
+    measurements = {
+        'inference_ms': measure_inference(),
+        'composite_ms': measure_compositing(),
+        'png_encode_ms': measure_png_encoding(),
+    }
+    profile = {
+        'version': CALIBRATION_VERSION,
+        'libraries': _library_versions(),
+        'measured': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'duration_s': round(time.perf_counter() - start, 2),
+        'measurements': measurements,
+    }
+    profile.update(derive_settings(measurements))
+    print(f"Calibration finished in {profile['duration_s']} s: {profile}")
+
+    # A failed probe (e.g. MediaPipe not loading) must not stick - measure again next launch
+    if not is_complete(profile):
+        print("Calibration incomplete - performance profile not saved")
+        return profile
+
+    try:
+        profiles = {}
+        if os.path.exists(profile_path):
+            with open(profile_path, 'r') as f:
+                profiles = json.load(f)
+        profiles[machine_id()] = profile
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        with open(profile_path, 'w') as f:
+            json.dump(profiles, f, indent=2)
+    except Exception as e:
+        print(f"Error saving performance profile: {e}")
+    return profile
+
+
+def load_profile(profile_path=PROFILE_PATH):
+    """Load this machine's cached profile, or None if missing or stale"""
+    try:
+        if not os.path.exists(profile_path):
+            return None
+        with open(profile_path, 'r') as f:
+            profile = json.load(f).get(machine_id())
+        if not profile or profile.get('version') != CALIBRATION_VERSION:
+            return None
+        # Library upgrades change inference speed - measure again
+        if profile.get('libraries') != _library_versions():
+            return None
+        return profile
+    except Exception as e:
+        print(f"Error loading performance profile: {e}")
+        return None
+
+
+def get_profile(profile_path=PROFILE_PATH):
+    """Cached profile for this machine, calibrating on first use"""
+    profile = load_profile(profile_path)
+    if profile is None:
+        profile = run_calibration(profile_path)
+    return profile
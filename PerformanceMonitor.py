@@ -0,0 +1,346 @@
+# PerformanceMonitor.py
+import cv2
+import numpy as np
+import time
+import gc
+import os
+import sys
+import queue
+import threading
+import traceback
+import logging
+from logging.handlers import RotatingFileHandler
+from datetime import datetime
+
+
+class TimingRing:
+    """Fixed-size ring buffer of timing samples (single writer, lock-free reads)"""
+
+    def __init__(self, capacity=120):
+        self.capacity = capacity
+        # MEMORY OPTIMIZATION: Preallocate storage once, never grows
+        self._samples = np.zeros(capacity, dtype=np.float64)
+        self._index = 0
+        self._count = 0
+
+    def push(self, value):
+        self._samples[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def last(self):
+        if not self._count:
+            return 0.0
+        return float(self._samples[self._index - 1])
+
+    def mean(self):
+        if not self._count:
+            return 0.0
+        return float(self._samples[:self._count].mean())
+
+    def max(self):
+        if not self._count:
+            return 0.0
+        return float(self._samples[:self._count].max())
+
+    def values(self):
+        """Return a copy of the samples ordered oldest to newest"""
+        if self._count < self.capacity:
+            return self._samples[:self._count].copy()
+        return np.concatenate((self._samples[self._index:], self._samples[:self._index]))
+
+    def clear(self):
+        self._index = 0
+        self._count = 0
+
+
+# Stages recorded off the frame thread (GC callbacks fire on whichever thread
+# allocates; async hand results arrive on MediaPipe's thread). They exist from
+# the start so those threads never add keys while the loop iterates stages.
+CROSS_THREAD_STAGES = ('gc', 'hands.async_latency', 'gc_slack_gen0', 'gc_slack_gen1', 'gc_slack_gen2')
+
+
+class PerformanceMonitor:
+    """Per-stage frame timing probes with an optional on-frame overlay"""
+
+    def __init__(self, target_fps=30, capacity=120):
+        self.frame_budget = 1.0 / target_fps
+        self.capacity = capacity
+        self.stages = {name: TimingRing(capacity) for name in CROSS_THREAD_STAGES}  # name -> ms ring
+        self.frame_times = TimingRing(capacity)  # busy time per frame (ms)
+        self.frame_intervals = TimingRing(capacity)  # start-to-start interval (ms)
+        self.counters = {}
+        self.gauges = {}
+        self.idle_stages = {'sleep'}  # Laps that are waiting, not working
+        self.overlay_enabled = False
+        self.frame_index = 0
+        self.watchdog = None  # Optional FrameWatchdog notified at frame boundaries
+
+        self._frame_start = None
+        self._last_mark = None
+        self._idle_time = 0.0
+        self._gc_start = None
+
+        # Time every garbage collection pause, whoever triggers it
+        gc.callbacks.append(self._on_gc)
+
+    def stage(self, name):
+        """Get (or lazily create) the timing ring for a stage"""
+        ring = self.stages.get(name)
+        if ring is None:
+            # setdefault is atomic, so two threads creating a stage share one ring
+            ring = self.stages.setdefault(name, TimingRing(self.capacity))
+        return ring
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_intervals.push((now - self._frame_start) * 1000.0)
+        self._frame_start = now
+        self._last_mark = now
+        self._idle_time = 0.0
+        if self.watchdog is not None:
+            self.watchdog.frame_started(now)
+
+    def lap(self, stage):
+        """Record the time since the previous lap (or frame start) under a stage"""
+        now = time.perf_counter()
+        if self._last_mark is not None:
+            elapsed = now - self._last_mark
+            self.record(stage, elapsed)
+            if stage in self.idle_stages:
+                self._idle_time += elapsed
+        self._last_mark = now
+
+    def mark(self):
+        """Move the lap reference point without recording anything"""
+        self._last_mark = time.perf_counter()
+
+    def record(self, stage, seconds):
+        self.stage(stage).push(seconds * 1000.0)
+
+    def end_frame(self):
+        if self._frame_start is None:
+            return
+        busy = time.perf_counter() - self._frame_start - self._idle_time
+        self.frame_times.push(busy * 1000.0)
+        if busy > self.frame_budget:
+            self.count('dropped_frames')
+        if self.watchdog is not None:
+            self.watchdog.frame_finished(busy)
+        self.frame_index += 1
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def fps(self):
+        interval = self.frame_intervals.mean()
+        return 1000.0 / interval if interval > 0 else 0.0
+
+    def toggle_overlay(self):
+        self.overlay_enabled = not self.overlay_enabled
+        return self.overlay_enabled
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self.record('gc', time.perf_counter() - self._gc_start)
+            self.count(f"gc_gen{info.get('generation', 0)}")
+            self._gc_start = None
+
+    def summary(self):
+        """Snapshot of the current statistics as plain Python values"""
+        return {
+            'fps': round(self.fps(), 1),
+            'frame_ms': round(self.frame_times.mean(), 2),
+            'frame_max_ms': round(self.frame_times.max(), 2),
+            'stages': {name: round(ring.mean(), 2) for name, ring in self.stages.copy().items() if len(ring)},
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+        }
+
+    def draw_overlay(self, img, origin=(10, 90)):
+        """Draw the statistics panel onto the frame (only when toggled on)"""
+        if not self.overlay_enabled or img is None:
+            return img
+
+        lines = [
+            f"FPS: {self.fps():.1f}  frame: {self.frame_times.mean():.1f} ms "
+            f"(max {self.frame_times.max():.1f})",
+            f"Dropped: {self.counters.get('dropped_frames', 0)}  "
+            f"Skipped: {self.counters.get('skipped_frames', 0)}",
+        ]
+        # Copies: other threads may add stages or gauges mid-draw (dict.copy() runs
+        # no Python code, unlike list(items()) whose allocations can fire GC callbacks)
+        for name, ring in self.stages.copy().items():
+            if len(ring):
+                lines.append(f"{name}: {ring.mean():.2f} ms")
+        for name, value in self.gauges.copy().items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            lines.append(f"{name}: {value}")
+
+        line_height = 18
+        x, y = origin
+        h, w = img.shape[:2]
+        panel_w = min(330, w - x)
+        panel_h = min(line_height * len(lines) + 10, h - y)
+        if panel_w <= 0 or panel_h <= 0:
+            return img
+
+        # Darken the panel area instead of painting an opaque box
+        roi = img[y:y + panel_h, x:x + panel_w]
+        cv2.addWeighted(roi, 0.35, roi, 0, 0, dst=roi)
+
+        for i, line in enumerate(lines):
+            ty = y + 15 + i * line_height
+            if ty >= y + panel_h:
+                break
+            cv2.putText(img, line, (x + 6, ty), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.45, (0, 255, 255), 1)
+        return img
+
+    def close(self):
+        """Detach from the garbage collector callbacks"""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+
+class FrameWatchdog:
+    """Writes a post-mortem trace whenever a frame blows its time budget"""
+
+    def __init__(self, monitor, frame_budget, stall_factor=3.0, log_path=None,
+                 max_bytes=1024 * 1024, backup_count=3, sample_interval=0.01,
+                 warmup_frames=30, cooldown=5.0):
+        self.monitor = monitor
+        self.frame_budget = frame_budget
+        self.stall_factor = stall_factor
+        self.sample_interval = sample_interval
+        self.warmup_frames = warmup_frames
+        self.cooldown = cooldown
+        self.max_samples = 20
+        self.stall_count = 0
+
+        if log_path is None:
+            log_path = os.path.join(os.path.expanduser("~"), "beyondthebrush_diagnostics",
+                                    "frame_stalls.log")
+        self.log_path = log_path
+
+        # Rotating diagnostics file so stall dumps never grow without bound
+        self._logger = logging.getLogger(f"btb.diagnostics.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        try:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes,
+                                          backupCount=backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+        except Exception as e:
+            print(f"Frame watchdog could not open {log_path}: {e}")
+
+        self._target_ident = threading.get_ident()  # Thread running the frame loop
+        self._frame_start = None
+        self._samples = []
+        self._last_dump_time = 0.0
+        self._frames_seen = 0
+        self._dumps = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="FrameWatchdog", daemon=True)
+        self._thread.start()
+
+    def frame_started(self, start_time):
+        # Swap in a fresh list so the sampler never touches the previous frame's samples
+        self._samples = []
+        self._frame_start = start_time
+
+    def frame_finished(self, busy):
+        self._frame_start = None
+        self._frames_seen += 1
+        if self._frames_seen <= self.warmup_frames:
+            return
+        if busy <= self.frame_budget * self.stall_factor:
+            return
+
+        self.stall_count += 1
+        self.monitor.count('stalls')
+        now = time.monotonic()
+        if now - self._last_dump_time < self.cooldown:
+            return
+        self._last_dump_time = now
+
+        # Snapshot on the frame thread, format and write on the watchdog thread
+        self._dumps.put({
+            'time': datetime.now(),
+            'frame': self.monitor.frame_index,
+            'busy_ms': busy * 1000.0,
+            'stages': {name: (ring.last(), ring.mean(), ring.values()[-30:])
+                       for name, ring in self.monitor.stages.copy().items() if len(ring)},
+            'counters': dict(self.monitor.counters),
+            'gauges': dict(self.monitor.gauges),
+            'gc_count': gc.get_count(),
+            'gc_threshold': gc.get_threshold(),
+            'gc_stats': gc.get_stats(),
+            'samples': self._samples,
+        })
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval):
+            start = self._frame_start
+            if start is not None:
+                elapsed = time.perf_counter() - start
+                samples = self._samples
+                if elapsed > self.frame_budget and len(samples) < self.max_samples:
+                    frame = sys._current_frames().get(self._target_ident)
+                    if frame is not None:
+                        samples.append((elapsed, traceback.extract_stack(frame, limit=25)))
+                    del frame
+
+            try:
+                while True:
+                    self._write_dump(self._dumps.get_nowait())
+            except queue.Empty:
+                pass
+
+    def _write_dump(self, dump):
+        try:
+            lines = [
+                f"=== Frame stall {dump['time']:%Y-%m-%d %H:%M:%S.%f} frame #{dump['frame']}: "
+                f"{dump['busy_ms']:.1f} ms busy (budget {self.frame_budget * 1000.0:.1f} ms, "
+                f"factor {self.stall_factor}) ===",
+                "Stages (last / mean ms, recent samples):",
+            ]
+            for name, (last, mean, recent) in dump['stages'].items():
+                recent_text = ", ".join(f"{v:.1f}" for v in recent)
+                lines.append(f"  {name}: {last:.2f} / {mean:.2f}  [{recent_text}]")
+            lines.append(f"GC count: {dump['gc_count']}  threshold: {dump['gc_threshold']}")
+            for generation, stats in enumerate(dump['gc_stats']):
+                lines.append(f"  gen{generation}: {stats}")
+            lines.append(f"Counters: {dump['counters']}")
+            lines.append(f"Gauges: {dump['gauges']}")
+            lines.append(f"Stack samples ({len(dump['samples'])}):")
+            for elapsed, stack in dump['samples']:
+                lines.append(f"  -- at +{elapsed * 1000.0:.1f} ms --")
+                for entry in traceback.format_list(stack):
+                    lines.append("  " + entry.rstrip())
+            lines.append("")
+            self._logger.info("\n".join(lines))
+        except Exception as e:
+            print(f"Error writing frame stall trace: {e}")
+
+    def stop(self):
+        """Stop the sampler thread and close the diagnostics file"""
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        for handler in list(self._logger.handlers):
+            handler.close()
+            self._logger.removeHandler(handler)
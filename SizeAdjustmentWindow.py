@@ -9,7 +9,7 @@ import numpy as np
 from PIL import Image, ImageGrab
 import cv2
 import time
-import gc
+from GCManager import request_collection
 
 class SizeAdjustmentWindow:
     def __init__(self):
@@ -45,6 +45,8 @@ class SizeAdjustmentWindow:
         self.canvas_region = None
         self.last_brush_size = self.current_brush_size
         self.last_eraser_size = self.current_eraser_size
+        # (brush, eraser) published as one tuple - the render loop reads it without locking
+        self.sizes = (self.current_brush_size, self.current_eraser_size)
         
         # Create main container with padding and black background
         main_frame = ttk.Frame(self.window, padding="15 15 15 15")
@@ -308,8 +310,8 @@ class SizeAdjustmentWindow:
             # Ensure window is shown again in case of error
             self.window.deiconify()
         finally:
-            # MEMORY OPTIMIZATION: Force garbage collection after screenshot
-            gc.collect()
+            # MEMORY OPTIMIZATION: Collect after the screenshot, at the next frame slack
+            request_collection()
 
     def capture_canvas_region(self):
         """Capture only canvas region - optimized for memory"""
@@ -355,7 +357,7 @@ class SizeAdjustmentWindow:
             self.status_label.config(text="Error capturing canvas", foreground='#FF4444')
             messagebox.showerror("Error", f"Failed to capture canvas: {str(e)}")
         finally:
-            gc.collect()
+            request_collection()
     
     def set_canvas_region(self, x, y, width, height):
         """Set the canvas region for screenshot capture - memory optimized"""
@@ -400,6 +402,7 @@ class SizeAdjustmentWindow:
             if abs(size - self.current_brush_size) >= 1:
                 self.brush_label.config(text=f"Current Size: {size}")
                 self.current_brush_size = size
+                self.sizes = (size, self.sizes[1])
                 if self.on_size_change_callback:
                     self.on_size_change_callback('brush', size)
         except (ValueError, TypeError) as e:
@@ -413,6 +416,7 @@ class SizeAdjustmentWindow:
             if abs(size - self.current_eraser_size) >= 1:
                 self.eraser_label.config(text=f"Current Size: {size}")
                 self.current_eraser_size = size
+                self.sizes = (self.sizes[0], size)
                 if self.on_size_change_callback:
                     self.on_size_change_callback('eraser', size)
         except (ValueError, TypeError) as e:
@@ -433,6 +437,7 @@ class SizeAdjustmentWindow:
     def on_closing(self):
         """Handle window closing with cleanup"""
         # Restore last applied values before closing
+        self.sizes = (self.last_brush_size, self.last_eraser_size)
         if self.on_size_change_callback:
             self.on_size_change_callback('brush', self.last_brush_size)
             self.on_size_change_callback('eraser', self.last_eraser_size)
@@ -453,8 +458,8 @@ class SizeAdjustmentWindow:
             if hasattr(self, 'window') and self.window:
                 self.window.destroy()
                 
-            # Force garbage collection
-            gc.collect()
+            # Collect now, or at the next frame slack when a GCManager is running
+            request_collection()
             
         except Exception as e:
             print(f"Error during cleanup: {e}")
@@ -0,0 +1,50 @@
+# TextIndex.py
+from TextSprite import text_metrics
+
+
+def text_bbox(obj):
+    """(left, top, right, bottom) of a text object, as the hit-tests always measured it"""
+    width, height = text_metrics(obj.text, obj.font, obj.scale, obj.thickness)
+    x, y = obj.position
+    return (x, y - height, x + width, y)
+
+
+class TextGridIndex:
+    """Uniform grid over text bounding boxes for point hit-tests
+
+    Built from the text objects in draw order; the owner rebuilds it after
+    any change (see KeyboardInput.text_index). Queries return the id of
+    the topmost (last drawn) object under the point, or None.
+    """
+
+    def __init__(self, objects=(), cell_size=64):
+        self.cell_size = cell_size
+        self.ids = []
+        self.boxes = []
+        self._cells = {}
+        for obj in objects:
+            self.insert(obj.id, text_bbox(obj))
+
+    def insert(self, object_id, box):
+        i = len(self.boxes)
+        self.ids.append(object_id)
+        self.boxes.append(box)
+        left, top, right, bottom = box
+        size = self.cell_size
+        for cx in range(left // size, right // size + 1):
+            for cy in range(top // size, bottom // size + 1):
+                self._cells.setdefault((cx, cy), []).append(i)
+
+    def hit(self, x, y):
+        candidates = self._cells.get((int(x) // self.cell_size, int(y) // self.cell_size))
+        if not candidates:
+            return None
+        # Cells list indices in insertion order - walk back for the topmost
+        for i in reversed(candidates):
+            left, top, right, bottom = self.boxes[i]
+            if left <= x <= right and top <= y <= bottom:
+                return self.ids[i]
+        return None
+
+    def __len__(self):
+        return len(self.boxes)
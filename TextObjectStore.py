@@ -0,0 +1,117 @@
+# TextObjectStore.py
+
+
+class TextObject:
+    """One placed label; records are never mutated, so snapshots can share them"""
+    __slots__ = ('id', 'text', 'position', 'color', 'font', 'scale', 'thickness')
+
+    def __init__(self, id, text, position, color, font, scale, thickness):
+        self.id = id
+        self.text = text
+        self.position = position
+        self.color = color
+        self.font = font
+        self.scale = scale
+        self.thickness = thickness
+
+    def replace(self, **changes):
+        """Copy of this record with some fields changed (same id)"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return TextObject(**fields)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'id'}
+
+    def __repr__(self):
+        return f"TextObject({self.id}, {self.text!r}, {self.position})"
+
+
+class TextObjectStore:
+    """Text objects by stable id, in draw order, with O(1) selection and snapshots
+
+    Snapshots are copy-on-write: snapshot() hands out the live table and
+    the next change copies it once. Undo history therefore costs one dict
+    per change, not a copy of every label.
+    """
+
+    def __init__(self):
+        self._objects = {}  # id -> TextObject; insertion order is draw order
+        self._shared = False  # True while a snapshot references _objects
+        self._next_id = 1
+        self.selected_id = None
+        self.version = 0  # Bumped on every change (hit-test index, caches)
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(self._objects.values())
+
+    def __contains__(self, object_id):
+        return object_id in self._objects
+
+    def __bool__(self):
+        return bool(self._objects)
+
+    def get(self, object_id):
+        return self._objects.get(object_id)
+
+    def _writable(self):
+        if self._shared:
+            self._objects = dict(self._objects)
+            self._shared = False
+        self.version += 1
+        return self._objects
+
+    def add(self, text, position, color, font, scale, thickness):
+        """Place a new label on top; returns its id"""
+        object_id = self._next_id
+        self._next_id += 1
+        self._writable()[object_id] = TextObject(object_id, text, position, color, font, scale, thickness)
+        return object_id
+
+    def update(self, object_id, **changes):
+        obj = self._objects.get(object_id)
+        if obj is None:
+            return None
+        obj = obj.replace(**changes)
+        self._writable()[object_id] = obj
+        return obj
+
+    def remove(self, object_id):
+        if object_id not in self._objects:
+            return False
+        del self._writable()[object_id]
+        if self.selected_id == object_id:
+            self.selected_id = None
+        return True
+
+    def clear(self):
+        self._objects = {}
+        self._shared = False
+        self.selected_id = None
+        self.version += 1
+
+    @property
+    def selected(self):
+        """The selected record, or None"""
+        return None if self.selected_id is None else self._objects.get(self.selected_id)
+
+    def select(self, object_id):
+        self.selected_id = object_id if object_id in self._objects else None
+
+    def clear_selection(self):
+        self.selected_id = None
+
+    def snapshot(self):
+        """O(1) read-only view of the current labels for undo"""
+        self._shared = True
+        return self._objects
+
+    def restore(self, snapshot):
+        """Return to a snapshot; ids stay valid and the selection is cleared"""
+        self._objects = snapshot
+        self._shared = True
+        self.selected_id = None
+        self.version += 1
@@ -0,0 +1,109 @@
+# TextSprite.py
+import cv2
+import numpy as np
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+
+class TextSprite:
+    """Outlined text pre-rendered once into a small BGRA image"""
+    __slots__ = ('image', 'mask', 'anchor', 'text_size')
+
+    def __init__(self, image, anchor, text_size):
+        self.image = image  # BGRA; alpha is 0 or 255 (putText without LINE_AA)
+        self.mask = image[:, :, 3:] > 0  # Blit mask, computed once
+        self.anchor = anchor  # Text origin (putText org) inside the sprite
+        self.text_size = text_size  # getTextSize() of the fill text, for selection boxes
+
+
+@lru_cache(maxsize=1024)
+def text_metrics(text, font, scale, thickness):
+    """Cached cv2.getTextSize() width and height (baseline excluded)"""
+    return tuple(cv2.getTextSize(text, font, scale, thickness)[0])
+
+
+def render_text_sprite(text, font, scale, color, thickness, outline_color, outline_thickness):
+    """Draw text with its outline into a tight BGRA sprite"""
+    (width, height), baseline = cv2.getTextSize(text, font, scale, max(thickness, outline_thickness))
+    pad = max(thickness, outline_thickness) + 2
+    # Hershey descenders reach past the reported baseline by about the stroke width
+    # at large scales, so leave that much room again below it
+    descent = baseline + max(thickness, outline_thickness)
+    sprite = np.zeros((height + descent + 2 * pad, width + 2 * pad, 4), np.uint8)
+    anchor = (pad, pad + height)
+    if outline_thickness > 0:
+        cv2.putText(sprite, text, anchor, font, scale, (*outline_color, 255), outline_thickness)
+    cv2.putText(sprite, text, anchor, font, scale, (*color, 255), thickness)
+    text_size = text_metrics(text, font, scale, thickness)
+    return TextSprite(sprite, anchor, text_size)
+
+
+def blit_sprite(img, sprite, position, mask=None):
+    """Copy the sprite's opaque pixels onto img with the text origin at position
+
+    When mask is given (a layer's coverage), the painted pixels are marked in it.
+    """
+    h, w = sprite.image.shape[:2]
+    x0 = position[0] - sprite.anchor[0]
+    y0 = position[1] - sprite.anchor[1]
+    # Clip against the frame - text can be dragged partly off screen
+    left, top = max(x0, 0), max(y0, 0)
+    right, bottom = min(x0 + w, img.shape[1]), min(y0 + h, img.shape[0])
+    if left >= right or top >= bottom:
+        return
+    sy, sx = slice(top - y0, bottom - y0), slice(left - x0, right - x0)
+    np.copyto(img[top:bottom, left:right], sprite.image[sy, sx, :3], where=sprite.mask[sy, sx])
+    if mask is not None:
+        mask[top:bottom, left:right] |= sprite.mask[sy, sx, 0]
+
+
+class TextSpriteCache:
+    """LRU cache of text sprites keyed by everything that changes the pixels
+
+    Editing, recoloring or rescaling an object changes its key, so stale
+    sprites simply stop being used and age out.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        # MEMORY OPTIMIZATION: Bounded LRU - one small sprite per visible label
+        self._sprites = OrderedDict()
+        self._lock = threading.Lock()  # The save thread draws from the same cache
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, font, scale, color, thickness, outline_color, outline_thickness):
+        key = (text, font, scale, tuple(color), thickness, tuple(outline_color), outline_thickness)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+        sprite = render_text_sprite(text, font, scale, color, thickness, outline_color, outline_thickness)
+        with self._lock:
+            self.misses += 1
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.capacity:
+                self._sprites.popitem(last=False)
+        return sprite
+
+    def reserve(self, count):
+        """Grow the cache so count labels drawn every frame never evict each other"""
+        if count * 2 > self.capacity:
+            self.capacity = count * 2
+
+    def draw(self, img, text, position, font, scale, color, thickness,
+             outline_color=(0, 0, 0), outline_thickness=0, mask=None):
+        """Blit cached text at position; returns the sprite (for its text_size)"""
+        sprite = self.get(text, font, scale, color, thickness, outline_color, outline_thickness)
+        blit_sprite(img, sprite, position, mask)
+        return sprite
+
+    def clear(self):
+        with self._lock:
+            self._sprites.clear()
+
+    def __len__(self):
+        return len(self._sprites)
@@ -0,0 +1,102 @@
+# TypingAnimation.py
+import cv2
+import numpy as np
+from TextSprite import text_metrics
+
+
+class PrefixWidths:
+    """Pixel width of every prefix of a line of text, updated as it is typed
+
+    Appending or deleting at the end measures only the changed characters,
+    so looking up a character's x offset never calls getTextSize.
+    """
+
+    def __init__(self, font, scale, thickness):
+        self.font = font
+        self.scale = scale
+        self.thickness = thickness
+        self.text = ""
+        self.widths = [0]  # widths[i] = width of text[:i]
+
+    def update(self, text):
+        if text == self.text:
+            return
+        if text.startswith(self.text):
+            # Typed at the end: measure only the new prefixes
+            for i in range(len(self.text) + 1, len(text) + 1):
+                self.widths.append(text_metrics(text[:i], self.font, self.scale, self.thickness)[0])
+        elif self.text.startswith(text):
+            # Backspace: drop the removed prefixes
+            del self.widths[len(text) + 1:]
+        else:
+            self.widths = [0] + [text_metrics(text[:i], self.font, self.scale, self.thickness)[0]
+                                 for i in range(1, len(text) + 1)]
+        self.text = text
+
+    def width(self, n=None):
+        """Width of the first n characters (the whole text by default)"""
+        return self.widths[-1] if n is None else self.widths[n]
+
+
+class TypingAnimator:
+    """Fade-and-settle animation for typed characters in a fixed ring of slots
+
+    Per-slot state lives in preallocated arrays, so update() is a couple of
+    vector operations and finished slots are simply marked inactive. When
+    typing outpaces the animation the oldest slot is reused.
+    """
+
+    def __init__(self, slots=30, duration=0.1):
+        self.duration = duration  # Seconds from faded-in to settled
+        self.chars = [""] * slots
+        self.owners = [None] * slots  # None = input line, else text object id
+        self.x_offsets = np.zeros(slots, np.int32)  # Pixels after the owner's text origin
+        self.colors = np.zeros((slots, 3), np.float32)
+        self.scales = np.zeros(slots, np.float32)
+        self.thickness = np.zeros(slots, np.int32)
+        self.elapsed = np.zeros(slots, np.float32)
+        self.active = np.zeros(slots, bool)
+        self._next = 0
+
+    def add(self, char, x_offset, color, scale, thickness, owner=None):
+        """Start animating a character drawn x_offset pixels after its owner's text origin"""
+        slot = self._next
+        self._next = (slot + 1) % len(self.chars)
+        self.chars[slot] = char
+        self.owners[slot] = owner
+        self.x_offsets[slot] = x_offset
+        self.colors[slot] = color
+        self.scales[slot] = scale
+        self.thickness[slot] = thickness
+        self.elapsed[slot] = 0.0
+        self.active[slot] = True
+
+    def update(self, dt):
+        if not self.active.any():
+            return
+        self.elapsed[self.active] += dt
+        self.active &= self.elapsed < self.duration
+
+    def clear(self):
+        self.active[:] = False
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def draw(self, img, font, origins):
+        """Draw active characters; origins maps owner -> text origin (missing owners are skipped)"""
+        slots = np.flatnonzero(self.active)
+        if slots.size == 0:
+            return
+        # Whole batch at once: alpha-scaled colors, settle offsets and scales
+        progress = self.elapsed[slots] / self.duration
+        colors = (self.colors[slots] * progress[:, None]).astype(np.int32).tolist()
+        y_offsets = (5 * (1 - progress)).astype(np.int32).tolist()
+        scales = (self.scales[slots] * (0.9 + 0.1 * progress)).tolist()
+        for i, slot in enumerate(slots.tolist()):
+            origin = origins.get(self.owners[slot])
+            if origin is None:
+                continue
+            position = (origin[0] + int(self.x_offsets[slot]), origin[1] + y_offsets[i])
+            cv2.putText(img, self.chars[slot], position, font, scales[i],
+                        colors[i], int(self.thickness[slot]), cv2.LINE_AA)
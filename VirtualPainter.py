@@ -7,12 +7,21 @@ import HandTrackingModule as htm
 from tkinter import *
 from PIL import Image, ImageTk
 from KeyboardInput import KeyboardInput
-import tkinter as tk
 from tkinter import messagebox
 import sys
 import atexit
 import threading
 from SizeAdjustmentWindow import SizeAdjustmentWindow
+from PerformanceMonitor import PerformanceMonitor, FrameWatchdog
+from CameraCapture import CameraCapture
+from PaintingPipeline import draw_stroke, stroke_bounds
+from CanvasLayers import LayerStack, snapshot_nbytes
+from InfiniteCanvas import InfiniteCanvas, PanZoomGesture
+from InputPump import InputPump, ESC_KEY
+from FramePacer import FramePacer
+from GCManager import GCManager, request_collection
+from AdaptiveQuality import AdaptiveQualityController, IdleModeController
+import PerformanceCalibration
 import gc
 import platform
 import json
@@ -27,6 +36,12 @@ import hashlib
 
 class UniversalCompatibility:
     def __init__(self):
+        # Measured machine profile (cached after the first launch)
+        try:
+            self.profile = PerformanceCalibration.get_profile()
+        except Exception as e:
+            print(f"Performance calibration failed: {e}")
+            self.profile = None
         self.system_type = self.detect_system_type()
         self.settings = self.get_optimal_settings()
         print(f"Detected system: {self.system_type}")
@@ -34,6 +49,9 @@ class UniversalCompatibility:
     
     def detect_system_type(self):
         """Detect if system is low-end, medium, or high-end"""
+        # Prefer measured performance over hardware guesses
+        if self.profile and self.profile.get('system_type'):
+            return self.profile['system_type']
         try:
             import psutil
             ram_gb = psutil.virtual_memory().total / (1024**3)
@@ -82,7 +100,11 @@ class UniversalCompatibility:
                 "hand_tracking_quality": "accurate"
             }
         }
-        return base_settings[self.system_type]
+        settings = dict(base_settings[self.system_type])
+        if self.profile:
+            settings['calibrated'] = True
+            settings['start_level'] = self.profile.get('start_level')
+        return settings
 
 # Initialize universal compatibility
 compat = UniversalCompatibility()
@@ -91,6 +113,29 @@ compat = UniversalCompatibility()
 fps = compat.settings['fps']
 time_per_frame = 1.0 / fps
 
+# Per-stage timing probes (Tab toggles the on-frame overlay)
+perf_monitor = PerformanceMonitor(target_fps=fps)
+PERF_OVERLAY_KEY = 9  # Tab - not used by KeyboardInput
+
+# Dump a trace when a frame takes longer than STALL_FACTOR x the frame budget
+STALL_FACTOR = 3.0
+perf_monitor.watchdog = FrameWatchdog(perf_monitor, time_per_frame, stall_factor=STALL_FACTOR)
+
+# Frames are released on absolute deadlines; jitter_ms shows up in the overlay
+frame_pacer = FramePacer(time_per_frame, monitor=perf_monitor)
+
+# Runtime quality controller - the tier only picks the starting point
+quality_controller = AdaptiveQualityController(fps, system_type=compat.system_type,
+                                               start_level=compat.settings.get('start_level'))
+
+# Drop to slow low-resolution scanning after IDLE_AFTER seconds without a hand
+IDLE_AFTER = 3.0
+IDLE_FPS = 10
+idle_mode = IdleModeController(fps, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER)
+
+# Garbage collection runs only in end-of-frame slack once startup is done
+gc_manager = GCManager(monitor=perf_monitor)
+
 # =============================================================================
 # MONGODB IMAGE SAVER
 # =============================================================================
@@ -264,24 +309,12 @@ def find_working_camera_universal():
                     if ret and frame is not None:
                         print(f"✅ Found working camera: Index {camera_index} with {backend_name}")
                         
-                        # Apply optimal resolution
-                        target_width = compat.settings['width']
-                        target_height = compat.settings['height']
-                        
-                        # Try to set resolution (not all cameras support this)
-                        cap.set(cv2.CAP_PROP_FRAME_WIDTH, target_width)
-                        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, target_height)
-                        
-                        # Set buffer size to prevent lag
-                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                        cap.set(cv2.CAP_PROP_FPS, compat.settings['fps'])
-                        
-                        # Verify actual resolution
-                        actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                        actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                        print(f"Camera resolution: {actual_width}x{actual_height}")
-                        
-                        return cap
+                        # Negotiate pixel format, resolution and FPS (not all cameras
+                        # support every combination) and verify the achieved frame rate
+                        camera = CameraCapture(cap, monitor=perf_monitor)
+                        camera.negotiate(compat.settings['width'], compat.settings['height'],
+                                         compat.settings['fps'])
+                        return camera
                     else:
                         cap.release()
             except Exception as e:
@@ -297,7 +330,7 @@ def find_working_camera_universal():
                 ret, frame = cap.read()
                 if ret:
                     print(f"✅ Using fallback camera at index {camera_index}")
-                    return cap
+                    return CameraCapture(cap, monitor=perf_monitor)
                 cap.release()
         except:
             continue
@@ -340,8 +373,6 @@ def resource_path(relative_path):
 # =============================================================================
 
 # Initialize variables
-brushSize = 10
-eraserSize = 100
 overlayList = []
 guideList = []
 header = None
@@ -451,19 +482,70 @@ detection_config = {
     "high_end": {"detectionCon": 0.8, "trackCon": 0.6, "maxHands": 1}
 }
 
+# Hand detector backend: "legacy" (mp.solutions.hands), "tasks_live_stream"
+# (asynchronous HandLandmarker, needs models/hand_landmarker.task), "tasks_video"
+# or "process" (legacy inference in a worker process, frames via shared memory)
+DETECTOR_BACKEND = "legacy"
+
+# Canvas larger than the screen, stored as memory-mapped tiles on disk and
+# navigated with two hands (midpoint pans, spread zooms). Off by default: it
+# needs a second tracked hand, and MediaPipe reruns palm detection every frame
+# while fewer than maxHands hands are tracked, so one-hand drawing gets slower.
+INFINITE_CANVAS = False
+
 config = detection_config[compat.system_type]
-detector = htm.HandDetector(
+detector = htm.create_hand_detector(
+    DETECTOR_BACKEND,
     detectionCon=config['detectionCon'],
     trackCon=config['trackCon'],  
-    maxHands=config['maxHands']
+    maxHands=2 if INFINITE_CANVAS else config['maxHands'],
+    monitor=perf_monitor,
+    modelComplexity=quality_controller.current['model_complexity'],
+    reuse_buffers=True  # Steady-state frames allocate (almost) nothing
 )
+detector.detection_interval = quality_controller.current['detection_interval']
+
+# Skip hand inference on frames where nothing moved (paused student, empty frame)
+MOTION_GATE_CONFIG = {
+    "pixel_threshold": 12,    # Gray-level change that counts as motion
+    "motion_fraction": 0.01,  # Fraction of changed pixels that wakes inference
+    "max_skip": 30,           # Always re-run inference after this many static frames
+}
+detector.motion_gate = htm.MotionGate(**MOTION_GATE_CONFIG)
+
+# Detect on the raw camera frame and mirror only the landmark x coordinates;
+# the frame itself is flipped once, into a reused display buffer
+MIRROR_IN_DETECTOR = True
+detector.mirror = MIRROR_IN_DETECTOR
+display_buffer = None  # Mirrored frame that everything is drawn onto
 
 # =============================================================================
 # CANVAS AND STATE MANAGEMENT
 # =============================================================================
 
-# Create Image Canvas with adaptive size but maintain header area
-imgCanvas = np.zeros((compat.settings['height'], compat.settings['width'], 3), np.uint8)
+# Layered canvas (bottom to top): ink strokes, header UI, placed text. Layers are
+# tiled (64x64): composites, undo snapshots and saves only visit changed or
+# painted tiles.
+canvas_layers = LayerStack((compat.settings['height'], compat.settings['width']), monitor=perf_monitor)
+ink_layer = canvas_layers.add('ink', auto_mask=True)
+header_layer = canvas_layers.add('header')
+text_layer = canvas_layers.add('text')
+header_layer_height = 78  # Height of the header currently in header_layer
+last_upload_versions = None  # (ink, text) versions of the last drawing sent to MongoDB
+
+# Create Image Canvas with adaptive size but maintain header area (strokes draw
+# straight into the ink layer)
+imgCanvas = ink_layer.image
+
+# The ink layer shows a viewport onto the tiled world canvas
+infinite_canvas = None
+pan_zoom = PanZoomGesture()
+if INFINITE_CANVAS:
+    try:
+        infinite_canvas = InfiniteCanvas(imgCanvas.shape, monitor=perf_monitor)
+        print(f"Infinite canvas tiles in {infinite_canvas.directory}")
+    except Exception as e:
+        print(f"Infinite canvas unavailable, using a fixed canvas: {e}")
 
 # Previous points
 xp, yp = 0, 0
@@ -475,11 +557,18 @@ MAX_UNDO_STACK_SIZE = 30  # Reduced for low-end systems
 
 # Create keyboard input handler
 keyboard_input = KeyboardInput()
+keyboard_input.animations_enabled = quality_controller.current['enable_animations']
 last_time = time.time()
 
 # Create size adjuster window
 size_adjuster = SizeAdjustmentWindow()
 
+# One HighGUI + Tk event pump per frame; text input, ESC and hotkeys share its queue.
+# Tk gets at most TK_PUMP_BUDGET_MS per pump so slider drags cannot stall a frame.
+TK_PUMP_BUDGET_MS = 2.0
+input_pump = InputPump(tk_root=size_adjuster.window, monitor=perf_monitor,
+                       tk_budget_ms=TK_PUMP_BUDGET_MS)
+
 # =============================================================================
 # CORE FUNCTIONS (Optimized for performance)
 # =============================================================================
@@ -491,14 +580,21 @@ def save_state():
         del old_state
     
     return {
-        'canvas': imgCanvas.copy(),
-        'text_objects': keyboard_input.text_objects.copy()
+        'canvas': ink_layer.snapshot(),
+        'text_objects': keyboard_input.text_objects.snapshot()
     }
 
 def restore_state(state):
-    global imgCanvas
-    imgCanvas = state['canvas'].copy()
-    keyboard_input.text_objects = state['text_objects'].copy()
+    if infinite_canvas is not None:
+        # Undo works on the view; the restored pixels are written back to the world
+        infinite_canvas.restore_layer(ink_layer, state['canvas'])
+    else:
+        ink_layer.load(state['canvas'])
+    keyboard_input.restore_state(state['text_objects'])
+
+def undo_available():
+    """Undo snapshots are 1:1 views, so a zoomed infinite canvas has no undo"""
+    return infinite_canvas is None or infinite_canvas.zoom == 1.0
 
 def show_transient_notification(message, duration=1.0):
     global notification_text, notification_time
@@ -506,10 +602,8 @@ def show_transient_notification(message, duration=1.0):
     notification_time = time.time() + duration
 
 def optimize_memory_usage():
-    """Aggressive memory optimization for low-end systems"""
-    if compat.system_type == "low_end":
-        # Force garbage collection
-        gc.collect()
+    """Freeze startup objects and move garbage collection into frame slack"""
+    gc_manager.start()
 
 def cleanup_resources():
     """Enhanced cleanup for all system types"""
@@ -517,6 +611,15 @@ def cleanup_resources():
     
     print("Cleaning up resources...")
     
+    # Flush this session's canvas tiles (kept on disk)
+    if 'infinite_canvas' in globals() and infinite_canvas is not None:
+        try:
+            print(f"Canvas tiles: {infinite_canvas.store.stats()}")
+            infinite_canvas.close()
+            print(f"Canvas tiles kept in {infinite_canvas.directory}")
+        except Exception as e:
+            print(f"Error closing canvas tiles: {e}")
+
     # Close MongoDB connection
     if 'db_saver' in globals() and db_saver is not None:
         try:
@@ -561,7 +664,22 @@ def cleanup_resources():
     except Exception as e:
         print(f"Error clearing data structures: {e}")
     
-    # Force garbage collection
+    # Remember the quality level reached on this machine
+    if 'quality_controller' in globals() and quality_controller is not None:
+        quality_controller.close()
+    
+    if 'frame_pacer' in globals() and frame_pacer is not None:
+        print(f"Frame pacing: {frame_pacer.stats()}")
+
+    # Stop timing garbage collection pauses
+    if 'perf_monitor' in globals() and perf_monitor is not None:
+        perf_monitor.close()
+        if perf_monitor.watchdog is not None:
+            perf_monitor.watchdog.stop()
+    
+    # Give collection back to the interpreter and clear what is left
+    if 'gc_manager' in globals() and gc_manager is not None:
+        gc_manager.stop()
     gc.collect()
 
 def save_to_template(canvas_img):
@@ -611,26 +729,47 @@ def save_to_template(canvas_img):
         print(f"Error saving to template: {e}")
         return None
 
-def btb_saved_canvas_async():
-    """Save canvas with compatibility optimizations, save to template, and optionally to MongoDB"""
-    global notification_text, notification_time
-    
+def save_world_export():
+    """Save every tile of the infinite canvas at 1:1 next to the template saves"""
     try:
-        # Create white canvas
-        saved_img = np.ones_like(imgCanvas) * 255
-        
-        # Copy non-black pixels
-        mask = imgCanvas.any(axis=2)
-        saved_img[mask] = imgCanvas[mask]
-
-        # Draw text objects
-        for obj in keyboard_input.text_objects:
-            if obj['position'][1] > 78:  # Only draw text below header
-                cv2.putText(saved_img, obj['text'], obj['position'],
-                          obj['font'], obj['scale'], (0, 0, 0), obj['thickness'] + 2)
-                cv2.putText(saved_img, obj['text'], obj['position'],
-                          obj['font'], obj['scale'], obj['color'], obj['thickness'])
+        download_folder = os.path.join(os.path.expanduser("~"), "Downloads", "beyondthebrush_app_saved_canvas")
+        os.makedirs(download_folder, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(download_folder, f"beyond_the_brush_world_{timestamp}.png")
+        # Streamed tile band by tile band - never the whole world in memory
+        size = infinite_canvas.export_png(output_path)
+        if size is None:
+            return None
+        print(f"Full canvas saved to {output_path} ({size[0]}x{size[1]})")
+        return output_path
+    except Exception as e:
+        print(f"Error saving full canvas: {e}")
+        return None
 
+def capture_canvas_for_save():
+    """Flatten ink and text onto white on the main thread; the save thread only gets this copy"""
+    drawing_versions = (ink_layer.version, keyboard_input.text_objects.version)
+
+    # Create white canvas
+    saved_img = np.ones_like(imgCanvas) * 255
+
+    # Copy non-black pixels (only tiles that hold ink are visited)
+    ink_layer.export_onto(saved_img)
+
+    # Draw text objects
+    for obj in keyboard_input.text_objects:
+        if obj.position[1] > 78:  # Only draw text below header
+            keyboard_input.sprites.draw(saved_img, obj.text, obj.position,
+                      obj.font, obj.scale, obj.color, obj.thickness,
+                      (0, 0, 0), obj.thickness + 2)
+    saved_img.flags.writeable = False
+    return saved_img, drawing_versions
+
+def btb_saved_canvas_async(saved_img, drawing_versions):
+    """Save canvas with compatibility optimizations, save to template, and optionally to MongoDB"""
+    global notification_text, notification_time, pending_saves, last_upload_versions
+
+    try:
         # Define target dimensions
         target_width = compat.settings['width']
         target_height = compat.settings['height'] - 60  # Account for header
@@ -646,12 +785,21 @@ def btb_saved_canvas_async():
         # Save to template (this will be the only version saved)
         template_path = save_to_template(final_img)
         success = template_path is not None and os.path.exists(template_path)
+
+        # The template only holds the current view - keep the whole infinite canvas too
+        if infinite_canvas is not None:
+            save_world_export()
         
         # Save to MongoDB in background
         mongo_success = False
         mongo_message = ""
         
-        if db_saver.user_data and template_path:
+        if db_saver.user_data and template_path and drawing_versions == last_upload_versions:
+            # Nothing drawn or typed since the last upload - don't store a duplicate
+            mongo_success = True
+            mongo_message = " (unchanged since last upload)"
+            print("Drawing unchanged since last upload - skipping MongoDB save")
+        elif db_saver.user_data and template_path:
             try:
                 # Save only the template version to MongoDB
                 with open(template_path, 'rb') as template_file:
@@ -661,6 +809,7 @@ def btb_saved_canvas_async():
                 # Check result
                 if result.get("success", False):
                     mongo_success = True
+                    last_upload_versions = drawing_versions
                     doc_id = result.get("document_id", "")[:8]  # First 8 chars of ID
                     mongo_message = f" (DB ID: {doc_id}...)"
                     print(f"Image saved to MongoDB with ID: {result.get('document_id', '')}")
@@ -693,25 +842,120 @@ def btb_saved_canvas_async():
         notification_text = f"Error saving image: {str(e)}"
         notification_time = time.time() + 3.0
     finally:
-        gc.collect()
+        with save_lock:
+            pending_saves -= 1
+        request_collection()
 
 def btb_saved_canvas():
-    save_thread = threading.Thread(target=btb_saved_canvas_async)
+    global pending_saves
+    # Snapshot here so the layers are never read (or their coverage caches
+    # rebuilt) from the save thread
+    saved_img, drawing_versions = capture_canvas_for_save()
+    with save_lock:
+        pending_saves += 1
+    save_thread = threading.Thread(target=btb_saved_canvas_async, args=(saved_img, drawing_versions))
     save_thread.daemon = True
     save_thread.start()
 
-def interpolate_points(x1, y1, x2, y2, num_points=5):  # Reduced points for performance
-    points = []
-    for i in range(num_points):
-        x = int(x1 + (x2 - x1) * (i / num_points))
-        y = int(y1 + (y2 - y1) * (i / num_points))
-        points.append((x, y))
-    return points
+def apply_quality_settings(settings):
+    """Apply an adaptive quality operating point to the running pipeline"""
+    global frames_to_skip
+    detector.set_model_complexity(settings['model_complexity'])
+    detector.detection_interval = settings['detection_interval']
+    keyboard_input.animations_enabled = settings['enable_animations']
+    frames_to_skip = settings['frame_skip']
+    perf_monitor.set_gauge('quality_level', quality_controller.level)
+
+def handle_key_events():
+    """Feed every queued key to the hotkeys and text input, oldest first"""
+    for event in input_pump.drain():
+        if event.key == PERF_OVERLAY_KEY:
+            perf_monitor.toggle_overlay()
+        elif keyboard_input.process_key_input(event.key, event.time) and undo_available():
+            if len(undoStack) >= MAX_UNDO_STACK_SIZE:
+                undoStack.pop(0)
+            undoStack.append(save_state())
+            redoStack.clear()
+
+def finish_frame(frame_time):
+    """Pump events, check for close and wait for the frame deadline (False ends the loop)"""
+    # Pump HighGUI keys and Tkinter events once, inside this frame's budget
+    input_pump.pump()
+    if input_pump.tk_closed:
+        return False
+    perf_monitor.lap('tk')
+
+    # Check if window should close
+    try:
+        window_visible = cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE)
+        if window_visible < 1:
+            on_close()
+            return False
+    except cv2.error:
+        on_close()
+        return False
+
+    # Check for ESC key
+    if input_pump.consume(ESC_KEY):
+        on_close()
+        return False
+
+    # Collect garbage only if it fits in the time left before the frame deadline
+    gc_manager.collect_in_slack(frame_pacer.remaining())
+    perf_monitor.mark()
+
+    # Release the frame at its absolute deadline (late frames drop their debt)
+    frame_pacer.wait(frame_time)
+    perf_monitor.lap('sleep')
+    perf_monitor.end_frame()
+    return True
+
+def get_undo_memory_mb():
+    """Memory held by undo/redo canvas snapshots, in megabytes"""
+    # Snapshots share unchanged tiles, so count each tile once
+    return snapshot_nbytes(state['canvas'] for state in undoStack + redoStack) / (1024 * 1024)
 
 # =============================================================================
 # HEADER ICON MANAGEMENT (FIXED)
 # =============================================================================
 
+def navigate_canvas(hand_tips):
+    """Two-hand pan/zoom of the infinite canvas; True while two hands are navigating"""
+    if infinite_canvas is None:
+        return False
+    change = pan_zoom.update(hand_tips)
+    if change is not None:
+        dx, dy, factor, anchor = change
+        infinite_canvas.pan(dx, dy)
+        if factor != 1.0:
+            infinite_canvas.zoom_at(factor, anchor)
+        infinite_canvas.render_view(ink_layer)
+        # Undo snapshots are views - they cannot be restored into a moved view
+        undoStack.clear()
+        redoStack.clear()
+        perf_monitor.set_gauge('canvas_zoom', round(infinite_canvas.zoom, 2))
+    return len(hand_tips) >= 2
+
+def update_header_layer():
+    """Re-render the header layer only when the selected header or the width changes"""
+    global header_layer_height
+    key = (id(header), compat.settings['width'])
+    if header_layer.source == key:
+        return
+    header_layer.clear()
+    current_header = get_header_for_resolution()
+    if current_header is not None:
+        height, width = current_header.shape[:2]
+        # Make sure we don't exceed image bounds
+        if height <= header_layer.image.shape[0] and width <= header_layer.image.shape[1]:
+            header_layer.image[0:height, 0:width] = current_header
+            header_layer.mask[0:height, 0:width] = True
+            header_layer.mark_dirty()
+        header_layer_height = height
+    else:
+        header_layer_height = 78
+    header_layer.source = key
+
 def get_header_for_resolution():
     """Get properly scaled header for current resolution"""
     if header is None:
@@ -749,6 +993,8 @@ SAVE_COOLDOWN = 1.0
 notification_text = ""
 notification_time = 0
 frame_count = 0
+pending_saves = 0
+save_lock = threading.Lock()  # pending_saves is changed by the loop and the save threads
 
 def on_close():
     global running, is_closing
@@ -777,16 +1023,6 @@ def on_close():
 def on_window_close(event=None):
     on_close()
 
-def handle_size_change(tool_type, size):
-    global brushSize, eraserSize
-    if tool_type == 'brush':
-        brushSize = size
-    else:
-        eraserSize = size
-
-# Set the callback
-size_adjuster.set_size_change_callback(handle_size_change)
-
 # Register cleanup function
 atexit.register(cleanup_resources)
 
@@ -821,27 +1057,31 @@ try:
     
     # Performance monitoring
     frame_skip_counter = 0
-    frames_to_skip = compat.settings['frame_skip']
+    frames_to_skip = quality_controller.current['frame_skip']
+    perf_monitor.set_gauge('quality_level', quality_controller.level)
     
     while running:
-        start_time = time.time()
         frame_count += 1
         frame_skip_counter += 1
 
         # Frame skipping for low-end systems
         if frame_skip_counter <= frames_to_skip:
-            # Still process some essential operations
-            try:
-                key = cv2.waitKey(1) & 0xFF
-                if key == 27:  # ESC key
-                    on_close()
-                    break
-            except:
-                pass
+            perf_monitor.count('skipped_frames')
+            # Grab without decoding so the driver never hands us a stale frame later
+            cap.skip()
+            # The grab used up this frame's slot - keep the pacer's deadline in step
+            frame_pacer.skip()
+            # Still pump and handle keys so typing is not held back by skipped frames
+            input_pump.pump()
+            if input_pump.consume(ESC_KEY):
+                on_close()
+                break
+            handle_key_events()
             continue
         frame_skip_counter = 0
+        perf_monitor.begin_frame()
 
-        # 1. Import Image
+        # 1. Import Image (decoded into the camera's reused buffer, timestamped at grab)
         success, img = cap.read()
         if not success:
             print("Failed to capture image from camera")
@@ -855,29 +1095,51 @@ try:
                 print("Could not reinitialize camera")
                 break
 
-        # Flip the image horizontally for mirror effect
-        img = cv2.flip(img, 1)
-
-        # 2. Find Hand Landmarks (with performance optimization)
-        if compat.system_type == "low_end":
-            # Reduce processing for low-end systems
-            img_small = cv2.resize(img, (320, 240))
-            img_small = detector.findHands(img_small, draw=False)
-            lmList = detector.findPosition(img_small, draw=False)
-            # Scale coordinates back to original size
-            if lmList:
-                scale_x = compat.settings['width'] / 320
-                scale_y = compat.settings['height'] / 240
-                for lm in lmList:
-                    lm[1] = int(lm[1] * scale_x)
-                    lm[2] = int(lm[2] * scale_y)
+        perf_monitor.lap('capture')
+
+        # Flip the image horizontally for mirror effect (after detection in mirror-free mode)
+        if not MIRROR_IN_DETECTOR:
+            img = cv2.flip(img, 1)
+            perf_monitor.lap('flip')
+
+        # 2. Find Hand Landmarks (inference resolution set by the quality controller,
+        # or the low idle scanning resolution while no hand is around)
+        if idle_mode.is_idle:
+            inference_width = idle_mode.idle_inference_width
         else:
-            img = detector.findHands(img, draw=False)
-            lmList = detector.findPosition(img, draw=False)
+            inference_width = quality_controller.current['inference_width']
+        # The detector downscales (keeping the aspect ratio) and maps landmarks back
+        # to full-frame coordinates itself
+        detector.set_inference_resolution(inference_width)
+        img = detector.findHands(img, draw=False, timestamp_ms=cap.timestamp_ms)
+        lmList = detector.findPosition(img, draw=False)
         
         # Reset smoothing if no hand detected
-        if not lmList or len(lmList) < 21:
+        hand_present = bool(lmList) and len(lmList) >= 21
+        if not hand_present:
             detector.reset_smoothing()
+        perf_monitor.lap('detect')
+
+        # Idle/low-power state - wakes up in this same frame when a hand appears
+        idle_mode.update(hand_present, busy=keyboard_input.active or keyboard_input.dragging)
+        perf_monitor.set_gauge('mode', idle_mode.state)
+        if (idle_mode.is_idle and detector.reused_results and
+                time.time() >= notification_time and not perf_monitor.overlay_enabled):
+            # Nothing moved and nothing to animate - the frame on screen is still current
+            perf_monitor.count('idle_skipped_renders')
+            handle_key_events()  # Tab and typed keys still count (they end idle next frame)
+            if not finish_frame(idle_mode.frame_time):
+                break
+            idle_mode.record_frame(perf_monitor.frame_times.last() / 1000.0)
+            continue
+
+        # Nothing is drawn onto the frame before this point
+        if MIRROR_IN_DETECTOR:
+            # MEMORY OPTIMIZATION: Flip straight into the reused display buffer
+            if display_buffer is None or display_buffer.shape != img.shape:
+                display_buffer = np.empty_like(img)
+            img = cv2.flip(img, 1, dst=display_buffer)
+            perf_monitor.lap('flip')
 
         # Position notification below header
         notification_y = 110
@@ -897,8 +1159,19 @@ try:
             # 3. Check which fingers are up
             fingers = detector.fingersUp()
 
+            # NAVIGATION MODE - Two hands: move both to pan, spread or pinch to zoom
+            # (both index fingers must point up, so a stray second hand does not hijack drawing)
+            hand_tips = detector.findTips(extended_only=True) if infinite_canvas is not None else []
+            if navigate_canvas(hand_tips):
+                xp, yp = 0, 0
+                swipe_start_x = None
+                if keyboard_input.dragging:
+                    keyboard_input.end_drag()
+                for tip in hand_tips[:2]:
+                    cv2.circle(img, tip, 15, (255, 200, 0), cv2.FILLED)
+
             # 4. Selection Mode - Two Fingers Up
-            if fingers[1] and fingers[2]:
+            elif fingers[1] and fingers[2]:
                 xp, yp = 0, 0  # Reset points
                 swipe_start_x = None  # Reset swipe tracking when in selection mode
 
@@ -926,7 +1199,7 @@ try:
                                     if current_time - last_save_time > SAVE_COOLDOWN:
                                         if len(overlayList) > 1:
                                             header = overlayList[1]
-                                        btb_saved_canvas_async()
+                                        btb_saved_canvas()
                                         last_save_time = current_time
                                         show_guide = False
                                         cv2.putText(img, "Saving...", (50, notification_y),
@@ -995,7 +1268,12 @@ try:
                                         header = overlayList[7]
                                     else:
                                         header = overlayList[0] if overlayList else None
-                                    if len(undoStack) > 0:
+                                    if not undo_available():
+                                        cv2.putText(img, "Undo needs 100% zoom", (50, notification_y),
+                                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 4)
+                                        cv2.putText(img, "Undo needs 100% zoom", (50, notification_y),
+                                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                                    elif len(undoStack) > 0:
                                         redoStack.append(save_state())
                                         state = undoStack.pop()
                                         restore_state(state)
@@ -1013,7 +1291,12 @@ try:
                                 elif i == 7:  # Redo
                                     if len(overlayList) > 8:
                                         header = overlayList[8]
-                                    if len(redoStack) > 0:
+                                    if not undo_available():
+                                        cv2.putText(img, "Redo needs 100% zoom", (50, notification_y),
+                                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 4)
+                                        cv2.putText(img, "Redo needs 100% zoom", (50, notification_y),
+                                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                                    elif len(redoStack) > 0:
                                         undoStack.append(save_state())
                                         state = redoStack.pop()
                                         restore_state(state)
@@ -1103,14 +1386,7 @@ try:
 
                 # Eraser: Check for overlapping with existing text
                 if drawColor == (0, 0, 0):
-                    for i, obj in enumerate(reversed(keyboard_input.text_objects)):
-                        idx = len(keyboard_input.text_objects) - 1 - i
-                        text_size = cv2.getTextSize(obj['text'], obj['font'], obj['scale'], obj['thickness'])[0]
-                        x_text, y_text = obj['position']
-                        if (x_text <= x1 <= x_text + text_size[0] and
-                                y_text - text_size[1] <= y1 <= y_text):
-                            del keyboard_input.text_objects[idx]
-                            break
+                    keyboard_input.erase_at(x1, y1)
 
                 # Visual feedback
                 cv2.circle(img, (x1, y1), 15, drawColor, cv2.FILLED)
@@ -1118,25 +1394,20 @@ try:
                 if xp == 0 and yp == 0:
                     xp, yp = x1, y1
 
-                # Smooth drawing
-                points = interpolate_points(xp, yp, x1, y1)
-                for point in points:
-                    if drawColor == (0, 0, 0):  # eraser
-                        half_size = eraserSize // 2
-                        top_left = (point[0] - half_size, point[1] - half_size)
-                        bottom_right = (point[0] + half_size, point[1] + half_size)
-                        cv2.rectangle(img, top_left, bottom_right, drawColor, -1)
-                        cv2.rectangle(imgCanvas, top_left, bottom_right, drawColor, -1)
-                    else:
-                        cv2.line(img, (xp, yp), point, drawColor, brushSize)
-                        cv2.line(imgCanvas, (xp, yp), point, drawColor, brushSize)
-                    xp, yp = point
-
-                # Update undo/redo stacks
-                if len(undoStack) >= MAX_UNDO_STACK_SIZE:
-                    undoStack.pop(0)
-                undoStack.append(save_state())
-                redoStack.clear()
+                # Smooth drawing (sizes published by the settings window as one tuple)
+                brushSize, eraserSize = size_adjuster.sizes
+                stroke_rect = stroke_bounds(xp, yp, x1, y1, max(brushSize, eraserSize))
+                if infinite_canvas is not None:
+                    infinite_canvas.draw_stroke(xp, yp, x1, y1, drawColor, brushSize, eraserSize)
+                xp, yp = draw_stroke(img, imgCanvas, xp, yp, x1, y1, drawColor, brushSize, eraserSize)
+                ink_layer.mark_dirty(stroke_rect)
+
+                # Update undo/redo stacks (no snapshots while zoomed - they could not be restored)
+                if undo_available():
+                    if len(undoStack) >= MAX_UNDO_STACK_SIZE:
+                        undoStack.pop(0)
+                    undoStack.append(save_state())
+                    redoStack.clear()
 
             # TEXT DRAGGING MODE - Two fingers, keyboard active
             elif keyboard_input.active and fingers[1] and fingers[2]:
@@ -1161,65 +1432,58 @@ try:
 
         else:
             # No hand detected
+            pan_zoom.reset()
             xp, yp = 0, 0
             swipe_start_x = None
             swipe_active = False
             if keyboard_input.dragging:
                 keyboard_input.end_drag()
 
+        perf_monitor.lap('gestures')
+
         # Handle keyboard input
         current_time = time.time()
         dt = current_time - last_time
         last_time = current_time
         keyboard_input.update(dt)
 
-        # Check for keyboard input
+        # Check for keyboard input (keys pumped since the last frame, oldest first)
         try:
-            key = cv2.waitKey(1) & 0xFF
-            if keyboard_input.process_key_input(key):
-                if len(undoStack) >= MAX_UNDO_STACK_SIZE:
-                    undoStack.pop(0)
-                undoStack.append(save_state())
-                redoStack.clear()
+            handle_key_events()
         except KeyboardInterrupt:
             print("Program terminated by user")
             on_close()
 
-        # 8. Blend the drawing canvas with the camera feed
-        mask = cv2.cvtColor(cv2.cvtColor(imgCanvas, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
-        mask = (mask > 0).astype(np.uint8) * 255
-        img = cv2.bitwise_and(img, 255 - mask)
-        img = cv2.add(img, imgCanvas)
-
-        # 9. Set Header Image (FIXED - Icons will now display properly)
-        current_header = get_header_for_resolution()
-        if current_header is not None:
-            header_height = current_header.shape[0]
-            # Make sure we don't exceed image bounds
-            if header_height <= img.shape[0] and current_header.shape[1] <= img.shape[1]:
-                img[0:header_height, 0:current_header.shape[1]] = current_header
-
-        # 10. Draw keyboard text and placeholder
+        perf_monitor.lap('keyboard')
+
+        # 8-9. Refresh changed layers (header icons, placed text); unchanged ones are reused
+        update_header_layer()
+        keyboard_input.render_layer(text_layer)
+
+        # 10. Paste ink, header and text over the camera feed, then the live text UI
         if keyboard_input.active:
+            # The typing area is shaded between the header and the text
+            canvas_layers.composite(img, ('ink', 'header'))
             typing_area = np.zeros((100, compat.settings['width'], 3), dtype=np.uint8)
             typing_area[:] = (50, 50, 50)
             img[compat.settings['height']-100:compat.settings['height'], 0:compat.settings['width']] = cv2.addWeighted(
                 img[compat.settings['height']-100:compat.settings['height'], 0:compat.settings['width']], 0.7, typing_area, 0.3, 0)
+            canvas_layers.composite(img, ('text',))
 
-            keyboard_input.draw(img)
+            keyboard_input.draw_overlay(img)
 
             instruction_text = "Press Enter to confirm text, ESC to cancel"
             cv2.putText(img, instruction_text, (20, compat.settings['height'] - 20),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
         else:
-            keyboard_input.draw(img)
+            canvas_layers.composite(img, ('ink', 'header', 'text'))
+            keyboard_input.draw_overlay(img)
+        perf_monitor.lap('composite')
 
-        # 11. Display Guide Image if active
+        # 11. Display Guide Image if active (blended in place below the header)
         if show_guide and current_guide is not None:
-            header_height = get_header_for_resolution().shape[0] if get_header_for_resolution() is not None else 78
-            guide_area = img[header_height:compat.settings['height'], 0:compat.settings['width']].copy()
-            blended_guide = cv2.addWeighted(current_guide, 0.3, guide_area, 0.3, 0)
-            img[header_height:compat.settings['height'], 0:compat.settings['width']] = blended_guide
+            guide_area = img[header_layer_height:compat.settings['height'], 0:compat.settings['width']]
+            cv2.addWeighted(current_guide, 0.3, guide_area, 0.3, 0, dst=guide_area)
 
             cv2.putText(img, f"Guide {current_guide_index + 1}/{len(guideList)}", 
                        (compat.settings['width'] - 200, notification_y),
@@ -1234,38 +1498,36 @@ try:
             cv2.putText(img, notification_text, (20, notification_y), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
 
+        # Performance overlay (toggled with Tab)
+        if perf_monitor.overlay_enabled:
+            perf_monitor.set_gauge('undo_mb', get_undo_memory_mb())
+            perf_monitor.set_gauge('save_queue', pending_saves)
+            perf_monitor.draw_overlay(img)
+        perf_monitor.lap('ui')
+
         # 12. Display the image
         cv2.imshow(window_name, img)
+        perf_monitor.lap('display')
+        # Camera-to-screen latency of this frame
+        perf_monitor.record('capture_to_display', time.perf_counter() - cap.timestamp)
 
-        # Adaptive garbage collection
-        if frame_count % 50 == 0:
-            gc.collect()
-
-        # Maintain target FPS
-        elapsed_time = time.time() - start_time
-        if elapsed_time < time_per_frame:
-            time.sleep(time_per_frame - elapsed_time)
+        perf_monitor.mark()
 
-        # Process Tkinter events
-        try:
-            size_adjuster.window.update()
-        except tk.TclError:
+        # Pace, pump events and check for close
+        if not finish_frame(idle_mode.frame_time):
             break
 
-        # Check if window should close
-        try:
-            window_visible = cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE)
-            if window_visible < 1:
-                on_close()
-                break
-        except cv2.error:
-            on_close()
-            break
-            
-        # Check for ESC key
-        if cv2.waitKey(1) & 0xFF == 27:
-            on_close()
-            break
+        # Step quality up or down based on measured frame time (idle frames
+        # run a different workload and would skew the controller)
+        busy_time = perf_monitor.frame_times.last() / 1000.0
+        idle_mode.record_frame(busy_time)
+        if idle_mode.is_idle:
+            perf_monitor.set_gauge('idle_saved_pct', round(idle_mode.savings() * 100.0, 1))
+            perf_monitor.set_gauge('idle_s', round(idle_mode.total_idle_seconds(), 1))
+        else:
+            new_settings = quality_controller.update(busy_time)
+            if new_settings is not None:
+                apply_quality_settings(new_settings)
             
 except KeyboardInterrupt:
     print("\nProgram terminated by user")
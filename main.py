@@ -906,6 +906,9 @@ class Launcher:
 # ENTRY POINT
 # ----------------------------------------------------------------------
 if __name__ == "__main__":
+    # Needed by the frozen build so the hand tracking worker process can start
+    import multiprocessing
+    multiprocessing.freeze_support()
     launcher = None
     try:
         launcher = Launcher()
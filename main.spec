@@ -20,6 +20,7 @@ def _collect_folder(folder):
 header_files = _collect_folder('header')
 guide_files  = _collect_folder('guide')
 icon_files   = _collect_folder('icon')
+model_files  = _collect_folder('models')   # optional MediaPipe Tasks models
 
 # ----------------------------------------------------------------------
 # 2. Analysis – ONEFILE mode + all datas
@@ -30,12 +31,27 @@ a = Analysis(
     binaries=[],
     datas=(
         mediapipe_datas +
-        header_files + guide_files + icon_files +
+        header_files + guide_files + icon_files + model_files +
         [
             ('VirtualPainter.py',        '.'),
             ('HandTrackingModule.py',    '.'),
             ('KeyboardInput.py',         '.'),
             ('SizeAdjustmentWindow.py',  '.'),
+            ('PerformanceMonitor.py',    '.'),
+            ('AdaptiveQuality.py',       '.'),
+            ('PerformanceCalibration.py', '.'),
+            ('HandTrackingProcess.py',   '.'),
+            ('GCManager.py',             '.'),
+            ('CameraCapture.py',         '.'),
+            ('CanvasLayers.py',          '.'),
+            ('InfiniteCanvas.py',        '.'),
+            ('PaintingPipeline.py',      '.'),
+            ('InputPump.py',             '.'),
+            ('FramePacer.py',            '.'),
+            ('TextSprite.py',            '.'),
+            ('TextIndex.py',             '.'),
+            ('TextObjectStore.py',       '.'),
+            ('TypingAnimation.py',       '.'),
             ('track_click.py',           '.'),
             ('icon/icons.png',           'icon'),
             ('icon/logo.png',            'icon'),
@@ -44,7 +60,12 @@ a = Analysis(
     ),
     hiddenimports=[
         'VirtualPainter', 'HandTrackingModule', 'KeyboardInput',
-        'SizeAdjustmentWindow', 'track_click',
+        'SizeAdjustmentWindow', 'PerformanceMonitor', 'AdaptiveQuality',
+        'PerformanceCalibration', 'HandTrackingProcess', 'GCManager',
+        'CameraCapture', 'PaintingPipeline', 'CanvasLayers',
+        'InfiniteCanvas', 'InputPump', 'FramePacer',
+        'TextSprite', 'TextIndex', 'TextObjectStore',
+        'TypingAnimation', 'track_click',
         'cv2', 'numpy', 'PIL', 'tkinter'
     ],
     hookspath=[],
@@ -0,0 +1,53 @@
+# test_adaptive_quality.py
+import pytest
+
+from AdaptiveQuality import AdaptiveQualityController
+
+LEVELS = [{"name": "low"}, {"name": "mid"}, {"name": "high"}]
+
+
+@pytest.fixture
+def controller(tmp_path):
+    # 10 ms budget, no smoothing so each frame sets the average directly
+    return AdaptiveQualityController(100, start_level=1, levels=LEVELS,
+                                     profile_path=str(tmp_path / "quality.json"),
+                                     down_after=3, up_after=5, cooldown_frames=2, smoothing=1.0)
+
+
+def feed(controller, frame_time, frames):
+    return [controller.update(frame_time) for _ in range(frames)]
+
+
+def test_cooldown_then_steps_down_after_consecutive_slow_frames(controller):
+    assert feed(controller, 0.020, 2) == [None, None]  # Startup cooldown
+    assert feed(controller, 0.020, 2) == [None, None]
+    assert controller.update(0.020) == LEVELS[0]
+    assert controller.level == 0
+
+
+def test_dead_band_holds_the_level(controller):
+    feed(controller, 0.0095, 50)  # Between budget * (1 - up_margin) and budget * (1 + down_margin)
+    assert controller.level == 1
+
+
+def test_interrupted_streak_does_not_step(controller):
+    feed(controller, 0.020, 2)
+    for _ in range(5):
+        feed(controller, 0.020, 2)
+        controller.update(0.0095)  # Back in the dead band resets the count
+    assert controller.level == 1
+
+
+def test_steps_up_after_fast_frames(controller):
+    feed(controller, 0.001, 2 + 4)
+    assert controller.level == 1
+    assert controller.update(0.001) == LEVELS[2]
+
+
+def test_upgrade_that_is_too_slow_blocks_the_next_upgrade(controller):
+    feed(controller, 0.001, 2 + 5)  # Up to level 2
+    assert controller.level == 2
+    feed(controller, 0.020, 2 + 3)  # Immediately too slow - back down
+    assert controller.level == 1
+    feed(controller, 0.001, 2 + 5)  # Would step up again without the backoff
+    assert controller.level == 1
@@ -0,0 +1,61 @@
+# test_canvas_layers.py
+import pytest
+
+np = pytest.importorskip("numpy")
+from CanvasLayers import Layer, TILE_SIZE, snapshot_nbytes
+
+
+def paint(layer, x0, y0, x1, y1, color=(255, 0, 255)):
+    layer.image[y0:y1, x0:x1] = color
+    layer.mark_dirty((x0, y0, x1, y1))
+
+
+def test_mark_dirty_versions_only_touched_tiles():
+    layer = Layer("ink", (200, 300), auto_mask=True)
+    paint(layer, 10, 10, 20, 20)
+    assert [tuple(t) for t in layer.changed_tiles(0)] == [(0, 0)]
+    paint(layer, TILE_SIZE + 5, 10, TILE_SIZE + 10, 20)
+    assert [tuple(t) for t in layer.changed_tiles(1)] == [(0, 1)]
+
+
+def test_undo_redo_round_trip_restores_pixels():
+    layer = Layer("ink", (200, 300), auto_mask=True)
+    blank = layer.snapshot()
+    paint(layer, 10, 10, 40, 40)
+    first = layer.snapshot()
+    first_pixels = layer.image.copy()
+    paint(layer, 150, 100, 220, 160, (0, 255, 0))
+    second = layer.snapshot()
+    second_pixels = layer.image.copy()
+
+    layer.load(first)  # Undo
+    assert np.array_equal(layer.image, first_pixels)
+    layer.load(blank)  # Undo again
+    assert not layer.image.any()
+    layer.load(second)  # Redo straight to the newest state
+    assert np.array_equal(layer.image, second_pixels)
+    assert np.array_equal(layer.coverage(), second_pixels.any(axis=2))
+
+
+def test_load_rewrites_only_tiles_changed_since_snapshot():
+    layer = Layer("ink", (200, 300), auto_mask=True)
+    paint(layer, 10, 10, 20, 20)
+    snapshot = layer.snapshot()
+    paint(layer, 150, 150, 160, 160)
+    version = layer.version
+    layer.load(snapshot)
+    assert [tuple(t) for t in layer.changed_tiles(version)] == [(2, 2)]
+    assert not layer.image[150:160, 150:160].any()
+    assert layer.image[10:20, 10:20].any()
+
+
+def test_snapshots_share_unchanged_tiles():
+    layer = Layer("ink", (200, 300), auto_mask=True)
+    paint(layer, 10, 10, 20, 20)
+    first = layer.snapshot()
+    paint(layer, 150, 150, 160, 160)
+    second = layer.snapshot()
+    assert second.tiles[0][0] is first.tiles[0][0]
+    assert first.tiles[2][2] is None  # Empty tiles are not copied
+    tile_bytes = TILE_SIZE * TILE_SIZE * 3
+    assert snapshot_nbytes([first, second]) == 2 * tile_bytes
@@ -0,0 +1,60 @@
+# test_detection_scheduler.py
+import pytest
+
+pytest.importorskip("mediapipe")
+from HandTrackingModule import DetectionScheduler
+
+
+def run(scheduler, frames, have_history=True):
+    """Advance frames; returns which ones inferred"""
+    decisions = []
+    for _ in range(frames):
+        infer = scheduler.should_infer(have_history)
+        if infer:
+            scheduler.inference_done()
+        decisions.append(infer)
+    return decisions
+
+
+def test_infers_every_interval_frames():
+    scheduler = DetectionScheduler(interval=3)
+    assert run(scheduler, 1, have_history=False) == [True]
+    assert run(scheduler, 9) == [False, False, True] * 3
+    assert scheduler.last_gap == 3
+    assert scheduler.inferences == 4 and scheduler.predictions == 6
+
+
+def test_interval_one_infers_every_frame():
+    assert all(run(DetectionScheduler(interval=1), 5))
+
+
+def test_no_history_always_infers():
+    assert all(run(DetectionScheduler(interval=4), 5, have_history=False))
+
+
+def test_fast_motion_forces_inference():
+    scheduler = DetectionScheduler(interval=4, motion_threshold=25.0)
+    run(scheduler, 1, have_history=False)
+    scheduler.predicted_speed = 30.0
+    assert run(scheduler, 2) == [True, True]
+    scheduler.predicted_speed = 5.0
+    assert run(scheduler, 4) == [False, False, False, True]
+
+
+def test_large_prediction_error_forces_inference_until_it_recovers():
+    scheduler = DetectionScheduler(interval=4, error_threshold=20.0)
+    run(scheduler, 1, have_history=False)
+    scheduler.record_error(35.0)
+    assert run(scheduler, 1) == [True]
+    scheduler.record_error(2.0)
+    assert run(scheduler, 1) == [False]
+    assert scheduler.prediction_error == pytest.approx(0.8 * 7.0 + 0.2 * 2.0)
+
+
+def test_reset_clears_motion_state():
+    scheduler = DetectionScheduler(interval=4)
+    scheduler.predicted_speed = 100.0
+    scheduler.record_error(100.0)
+    scheduler.reset()
+    run(scheduler, 1, have_history=False)
+    assert run(scheduler, 1) == [False]
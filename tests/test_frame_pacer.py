@@ -0,0 +1,79 @@
+# test_frame_pacer.py
+import pytest
+
+pytest.importorskip("numpy")
+import FramePacer as frame_pacer_module
+from FramePacer import FramePacer
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances perf_counter() exactly"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_pacer_module, "time", clock)
+    return clock
+
+
+def test_releases_on_absolute_deadlines(clock):
+    pacer = FramePacer(0.010)
+    start = pacer.wait()
+    for work in (0.002, 0.007, 0.004):
+        clock.now += work
+        pacer.wait()
+    assert clock.now == pytest.approx(start + 0.030)
+    assert pacer.late_frames == 0 and pacer.jitter() == pytest.approx(0.0)
+
+
+def test_small_overrun_is_late_but_keeps_the_schedule(clock):
+    pacer = FramePacer(0.010)
+    start = pacer.wait()
+    clock.now += 0.015  # 5 ms late for the first deadline
+    pacer.wait()
+    assert pacer.late_frames == 1 and pacer.resyncs == 0
+    pacer.wait()
+    assert clock.now == pytest.approx(start + 0.020)  # Back on the original grid
+
+
+def test_large_overrun_resyncs_instead_of_bursting(clock):
+    pacer = FramePacer(0.010)
+    pacer.wait()
+    clock.now += 0.035
+    release = pacer.wait()
+    assert pacer.resyncs == 1
+    assert pacer.deadline == pytest.approx(release + 0.010)
+
+
+def test_skipped_frames_are_not_counted_late(clock):
+    pacer = FramePacer(0.010)
+    pacer.wait()
+    for _ in range(10):
+        clock.now += 0.010  # cap.skip() blocks for one camera frame
+        pacer.skip()
+        clock.now += 0.004  # Processed frame
+        pacer.wait()
+    stats = pacer.stats()
+    assert pacer.late_frames == 0 and pacer.resyncs == 0
+    assert stats['skipped'] == 10
+    assert stats['mean_ms'] == pytest.approx(10.0) and stats['jitter_ms'] == pytest.approx(0.0)
+
+
+def test_rate_change_replans_from_now(clock):
+    pacer = FramePacer(0.010)
+    pacer.wait()
+    clock.now += 0.003
+    release = pacer.wait(0.100)  # Idle mode
+    assert release == pytest.approx(clock.now) and pacer.frame_time == 0.100
+    pacer.wait()
+    assert clock.now == pytest.approx(release + 0.100)
@@ -0,0 +1,60 @@
+# test_gc_manager.py
+import gc
+import time
+import pytest
+
+import GCManager
+from GCManager import GCManager as Manager, request_collection
+
+
+@pytest.fixture
+def manager():
+    # Thresholds nobody reaches in a test, so only explicit requests are due
+    manager = Manager(thresholds=(10 ** 9, 10 ** 9, 10 ** 9), max_defer=0.05)
+    enabled = gc.isenabled()
+    manager.start()
+    yield manager
+    manager.stop()
+    assert gc.isenabled() == enabled
+
+
+def test_start_takes_over_and_stop_hands_back(manager):
+    assert not gc.isenabled()
+    assert GCManager._active is manager
+    manager.stop()
+    assert GCManager._active is None
+
+
+def test_nothing_due_does_nothing(manager):
+    assert manager.collect_in_slack(1.0) == -1
+    assert manager.collections == [0, 0, 0]
+
+
+def test_request_runs_in_slack_that_fits(manager):
+    manager.pause_ms = [0.1, 1.0, 10.0]
+    request_collection(2)  # Deferred while the manager runs
+    assert manager.collections == [0, 0, 0]
+    assert manager.collect_in_slack(0.02) == 2
+    assert manager.collections[2] == 1
+    assert manager.collect_in_slack(0.02) == -1  # Request consumed
+
+
+def test_short_slack_runs_a_younger_generation_and_keeps_the_request(manager):
+    manager.pause_ms = [0.1, 1.0, 50.0]
+    manager.request(2)
+    assert manager.collect_in_slack(0.005) == 1  # 4 ms budget: gen 2 does not fit
+    assert manager._requested == 2
+
+
+def test_no_slack_defers_then_forces_when_overdue(manager):
+    manager.pause_ms = [0.1, 1.0, 10.0]
+    manager.request(2)
+    assert manager.collect_in_slack(0.0) == -1
+    time.sleep(0.06)
+    assert manager.collect_in_slack(0.0) == 2
+    assert manager.forced == 1
+
+
+def test_request_collects_immediately_without_a_manager():
+    assert GCManager._active is None
+    request_collection(0)  # Plain gc.collect - must not raise
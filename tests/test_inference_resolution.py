@@ -0,0 +1,64 @@
+# test_inference_resolution.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mediapipe")
+from HandTrackingModule import HandDetector, LandmarkResults
+
+
+@pytest.fixture
+def detector():
+    detector = HandDetector(maxHands=1)
+    yield detector
+    detector.cleanup()
+
+
+def test_full_resolution_passes_the_frame_through(detector):
+    img = np.zeros((480, 640, 3), np.uint8)
+    assert detector._prepare_inference_frame(img) is img
+    detector.set_inference_resolution(1280, 720)  # Larger than the frame - no upscaling
+    assert detector._prepare_inference_frame(img) is img
+    assert detector._to_frame_coords(0.3, 0.6) == (0.3, 0.6)
+
+
+def test_letterbox_pads_and_keeps_the_aspect_ratio(detector):
+    img = np.full((480, 640, 3), 200, np.uint8)
+    detector.set_inference_resolution(320, 320)
+    box = detector._prepare_inference_frame(img)
+    assert box.shape == (320, 320, 3)
+    assert not box[:40].any() and not box[280:].any()  # 40 px bars above and below
+    assert (box[40:280] == 200).all()
+
+
+def test_letterboxed_landmarks_map_back_to_the_frame(detector):
+    detector.set_inference_resolution(320, 320)
+    detector._prepare_inference_frame(np.zeros((480, 640, 3), np.uint8))
+    x, y = detector._to_frame_coords(0.5, 40 / 320)
+    assert (x, y) == pytest.approx((0.5, 0.0))
+    x, y = detector._to_frame_coords(1.0, 280 / 320)
+    assert (x, y) == pytest.approx((1.0, 1.0))
+
+
+def test_width_only_keeps_the_frame_aspect(detector):
+    detector.set_inference_resolution(320)
+    box = detector._prepare_inference_frame(np.zeros((480, 640, 3), np.uint8))
+    assert box.shape == (240, 320, 3)
+    assert detector._to_frame_coords(0.25, 0.75) == pytest.approx((0.25, 0.75))
+
+
+@pytest.mark.parametrize("reuse_buffers", [False, True])
+def test_find_position_maps_letterboxed_results_to_pixels(reuse_buffers):
+    detector = HandDetector(maxHands=1, reuse_buffers=reuse_buffers)
+    try:
+        detector.smoothing_enabled = False
+        img = np.zeros((480, 640, 3), np.uint8)
+        detector.set_inference_resolution(320, 320)
+        detector._prepare_inference_frame(img)
+        hand = np.zeros((1, 21, 3))
+        hand[0, :, 0] = 0.25
+        hand[0, :, 1] = (40 + 0.5 * 240) / 320  # Middle of the picture area
+        detector.results = LandmarkResults.from_array(hand)
+        lm_list = detector.findPosition(img, draw=False)
+        assert lm_list[8] == [8, 160, 240]
+    finally:
+        detector.cleanup()
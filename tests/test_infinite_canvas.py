@@ -0,0 +1,147 @@
+# test_infinite_canvas.py
+import os
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+from CanvasLayers import Layer
+from InfiniteCanvas import InfiniteCanvas, PanZoomGesture, TileStore, prune_sessions
+from PaintingPipeline import draw_stroke
+
+VIEW = (240, 320)
+INK = (255, 0, 255)
+
+
+@pytest.fixture
+def canvas(tmp_path):
+    canvas = InfiniteCanvas(VIEW, directory=str(tmp_path), tile_size=64, max_resident=4)
+    yield canvas
+    canvas.close()
+
+
+def stroke(canvas, layer, xp, yp, x1, y1, color=INK):
+    canvas.draw_stroke(xp, yp, x1, y1, color, 9, 30)
+    draw_stroke(np.zeros_like(layer.image), layer.image, xp, yp, x1, y1, color, 9, 30)
+    layer.mark_dirty()
+
+
+def view_of(canvas):
+    layer = Layer("view", VIEW)
+    canvas.render_view(layer)
+    return layer.image
+
+
+def test_tile_store_keeps_only_max_resident_tiles_mapped(tmp_path):
+    store = TileStore(str(tmp_path), tile_size=16, max_resident=2)
+    for tx in range(4):
+        store.get(tx, 0, create=True)[:] = tx + 1
+    assert store.stats()['resident'] == 2 and len(store) == 4
+    assert store.get(9, 9) is None  # Empty space has no tile
+    assert (store.get(0, 0) == 1).all()  # Evicted tiles were flushed to disk
+    store.close()
+
+
+def test_tile_store_reopens_tiles_on_disk(tmp_path):
+    store = TileStore(str(tmp_path), tile_size=16)
+    store.get(-2, 3, create=True)[:] = 7
+    store.close()
+    reopened = TileStore(str(tmp_path), tile_size=16)
+    assert (-2, 3) in reopened and len(reopened) == 1
+    assert (reopened.get(-2, 3) == 7).all()
+
+
+def test_strokes_survive_panning_away_and_back(canvas):
+    layer = Layer("ink", VIEW, auto_mask=True)
+    stroke(canvas, layer, 20, 20, 300, 200)
+    drawn = layer.image.copy()
+    canvas.pan(-500, 0)
+    assert not view_of(canvas).any()
+    canvas.pan(500, 0)
+    assert np.array_equal(view_of(canvas), drawn)
+
+
+def test_erasing_empty_space_creates_no_tiles(canvas):
+    canvas.draw_stroke(10, 10, 200, 100, (0, 0, 0), 9, 30)
+    assert len(canvas.store) == 0
+
+
+def test_zoom_keeps_the_anchor_fixed_and_snaps_to_one(canvas):
+    before = canvas.to_world(100, 80)
+    canvas.zoom_at(2.0, (100, 80))
+    assert canvas.zoom == 2.0
+    assert canvas.to_world(100, 80) == pytest.approx(before)
+    canvas.zoom_at(0.51, (100, 80))
+    assert canvas.zoom == 1.0  # Within 5% of 1:1
+
+
+def test_zoomed_out_view_shows_a_smaller_copy(canvas):
+    layer = Layer("ink", VIEW, auto_mask=True)
+    stroke(canvas, layer, 0, 100, 319, 100)
+    canvas.zoom_at(0.5, (0, 0))
+    rows = np.flatnonzero(view_of(canvas).any(axis=(1, 2)))
+    assert 45 <= rows.min() and rows.max() <= 55
+
+
+def test_undo_restores_the_world_and_is_refused_when_zoomed(canvas):
+    layer = Layer("ink", VIEW, auto_mask=True)
+    canvas.pan(-37, -11)
+    canvas.render_view(layer)
+    blank = layer.snapshot()
+    stroke(canvas, layer, 10, 10, 200, 150)
+    stroke(canvas, layer, 300, 20, 50, 230, (0, 255, 0))
+    drawn = layer.snapshot()
+    drawn_pixels = layer.image.copy()
+
+    canvas.restore_layer(layer, blank)
+    assert not view_of(canvas).any()
+    canvas.restore_layer(layer, drawn)
+    assert np.array_equal(view_of(canvas), drawn_pixels)
+    canvas.zoom_at(2.0, (0, 0))
+    with pytest.raises(ValueError):
+        canvas.restore_layer(layer, blank)
+
+
+def test_export_png_streams_the_inked_area_at_one_to_one(canvas, tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    assert canvas.export_png(str(tmp_path / "blank.png")) is None
+    layer = Layer("ink", VIEW, auto_mask=True)
+    canvas.pan(-100, -30)
+    stroke(canvas, layer, 10, 10, 300, 200)
+    canvas.pan(700, 400)
+    stroke(canvas, layer, 20, 200, 250, 40, (0, 200, 0))
+
+    path = str(tmp_path / "world.png")
+    x0, y0, x1, y1 = canvas.ink_bounds()
+    assert canvas.export_png(path) == (x1 - x0, y1 - y0)
+    exported = cv2.imread(path)
+    assert exported.shape == (y1 - y0, x1 - x0, 3)
+    # Compare every tile against the file, with blank pixels on white
+    for tx, ty in canvas.store.keys():
+        tile = canvas.store.get(tx, ty)
+        ox, oy = tx * canvas.tile_size - x0, ty * canvas.tile_size - y0
+        ink = tile.any(axis=2)
+        ys, xs = np.nonzero(ink)
+        assert np.array_equal(exported[oy + ys, ox + xs], tile[ys, xs])
+    assert (exported == 255).all(axis=2).any()  # Blank space is the background colour
+
+
+def test_prune_sessions_keeps_the_newest(tmp_path):
+    for i in range(4):
+        path = tmp_path / f"session_{i}"
+        path.mkdir()
+        os.utime(path, (time.time() + i, time.time() + i))
+    (tmp_path / "other").mkdir()
+    assert prune_sessions(str(tmp_path), keep=1) == 3
+    assert sorted(os.listdir(tmp_path)) == ["other", "session_3"]
+
+
+def test_pan_zoom_gesture():
+    gesture = PanZoomGesture(dead_zone=2.0)
+    assert gesture.update([(100, 100), (200, 100)]) is None  # First sighting sets the reference
+    assert gesture.update([(101, 100), (201, 100)]) is None  # Inside the dead zone
+    dx, dy, factor, anchor = gesture.update([(110, 120), (230, 120)])
+    assert (dx, dy) == (20.0, 20.0)
+    assert factor == pytest.approx(1.2)
+    assert anchor == (170, 120)
+    assert gesture.update([(110, 120)]) is None  # One hand ends the gesture
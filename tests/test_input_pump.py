@@ -0,0 +1,87 @@
+# test_input_pump.py
+import pytest
+
+pytest.importorskip("cv2")
+from InputPump import InputPump, EMPTY_KEY, ESC_KEY, NO_KEY
+
+
+def scripted(pump, keys):
+    """Feed pollKey() from a list; NO_KEY once it runs out"""
+    keys = list(keys)
+    pump._poll = lambda: keys.pop(0) if keys else NO_KEY
+
+
+def test_keys_are_queued_in_order_with_low_byte_codes():
+    pump = InputPump()
+    scripted(pump, [ord('a'), 0x100000 | ord('b'), NO_KEY])
+    assert pump.pump() == 2
+    assert [event.key for event in pump.drain()] == [ord('a'), ord('b')]
+    assert pump.drain() == []
+
+
+def test_each_key_is_stamped_when_read(monkeypatch):
+    pump = InputPump()
+    scripted(pump, [ord('l'), ord('l')])
+    clock = iter([10.0, 10.05, 10.1])
+    monkeypatch.setattr("InputPump.time.time", lambda: next(clock))
+    pump.pump()
+    first, second = pump.drain()
+    assert second.time - first.time == pytest.approx(0.05)
+
+
+def test_empty_pumps_queue_one_reset_event():
+    pump = InputPump()
+    scripted(pump, [ord('l'), NO_KEY, NO_KEY, NO_KEY, ord('l')])
+    for _ in range(4):
+        pump.pump()
+    assert [event.key for event in pump.drain()] == [ord('l'), EMPTY_KEY, ord('l')]
+
+
+def test_pump_reads_at_most_max_keys():
+    pump = InputPump(max_keys_per_pump=2)
+    scripted(pump, [1, 2, 3])
+    assert pump.pump() == 2
+    assert pump.pump() == 1
+
+
+def test_consume_takes_only_the_oldest_matching_key():
+    pump = InputPump()
+    scripted(pump, [ord('x'), ESC_KEY, ESC_KEY])
+    pump.pump()
+    assert pump.consume(ESC_KEY)
+    assert [event.key for event in pump.drain()] == [ord('x'), ESC_KEY]
+    assert not pump.consume(ESC_KEY)
+
+
+def test_queue_is_bounded():
+    pump = InputPump(max_queue=3, max_keys_per_pump=10)
+    scripted(pump, [1, 2, 3, 4, 5])
+    pump.pump()
+    assert [event.key for event in pump.drain()] == [3, 4, 5]
+
+
+class FakeTk:
+    def __init__(self, events, exists=True):
+        self.events = events
+        self.exists = exists
+        self.tk = self
+
+    def winfo_exists(self):
+        return self.exists
+
+    def dooneevent(self, flags):
+        if self.events:
+            self.events -= 1
+            return True
+        return False
+
+
+def test_tk_events_are_pumped_and_a_closed_window_is_reported():
+    root = FakeTk(events=5)
+    pump = InputPump(tk_root=root)
+    scripted(pump, [])
+    pump.pump()
+    assert root.events == 0 and not pump.tk_closed
+    root.exists = False
+    pump.pump()
+    assert pump.tk_closed
@@ -0,0 +1,15 @@
+# test_latency_harness.py
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+from LatencyHarness import CONFIGS, measure_config
+
+
+@pytest.mark.parametrize("config", [CONFIGS[0], dict(CONFIGS[0], frame_skip=1)], ids=["sync", "skip1"])
+def test_every_frame_paints_the_mirrored_marker(config):
+    latencies, missed = measure_config(config, frames=30, warmup=5, inference_ms=0.0,
+                                       speed=150.0, realtime=False)
+    assert missed == 0
+    assert len(latencies) == 30
@@ -0,0 +1,50 @@
+# test_mirror.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mediapipe")
+from HandTrackingModule import HandDetector, LandmarkResults
+
+
+def hand_at(x, y, index_tip=None):
+    hand = np.zeros((1, 21, 3))
+    hand[0, :, 0], hand[0, :, 1] = x, y
+    if index_tip is not None:
+        hand[0, 8, :2] = index_tip
+    return LandmarkResults.from_array(hand)
+
+
+@pytest.mark.parametrize("reuse_buffers", [False, True])
+def test_mirror_flips_x_like_detection_on_a_flipped_frame(reuse_buffers):
+    img = np.zeros((480, 640, 3), np.uint8)
+    detectors = [HandDetector(maxHands=1, reuse_buffers=reuse_buffers) for _ in range(2)]
+    try:
+        plain, mirrored = detectors
+        mirrored.mirror = True
+        for detector in detectors:
+            detector.smoothing_enabled = False
+        plain.results = hand_at(0.75, 0.5)  # What a flipped frame would show
+        mirrored.results = hand_at(0.25, 0.5)  # Same hand on the raw frame
+        assert (mirrored.findPosition(img, draw=False) ==
+                plain.findPosition(img, draw=False))
+        assert mirrored.lmList[0] == [0, 480, 240]
+    finally:
+        for detector in detectors:
+            detector.cleanup()
+
+
+def test_find_tips_are_mirrored_and_skip_folded_fingers():
+    detector = HandDetector(maxHands=2)
+    try:
+        detector.mirror = True
+        detector._img_shape = (480, 640, 3)
+        extended = np.zeros((21, 3))
+        extended[:, :2] = 0.5
+        extended[8, :2] = (0.1, 0.2)  # Tip above its middle joint (landmark 6)
+        folded = extended.copy()
+        folded[8, :2] = (0.75, 0.9)
+        detector.results = LandmarkResults.from_array(np.stack([extended, folded]))
+        assert detector.findTips() == [(576, 96), (160, 432)]
+        assert detector.findTips(extended_only=True) == [(576, 96)]
+    finally:
+        detector.cleanup()
@@ -0,0 +1,60 @@
+# test_motion_gate.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mediapipe")
+from HandTrackingModule import MotionGate
+
+
+def frame(value=100, shape=(240, 320)):
+    return np.full((shape[0], shape[1], 3), value, np.uint8)
+
+
+def test_first_frame_wakes_then_identical_frames_skip():
+    gate = MotionGate()
+    assert not gate.is_static(frame())
+    assert gate.is_static(frame())
+    assert gate.is_static(frame())
+    assert gate.skip_ratio() == pytest.approx(2 / 3)
+
+
+def test_motion_above_threshold_wakes():
+    gate = MotionGate(pixel_threshold=12, motion_fraction=0.01)
+    gate.is_static(frame())
+    moved = frame()
+    moved[100:140, 100:160] = 200
+    assert not gate.is_static(moved)
+    assert gate.is_static(moved)  # The woken frame becomes the new reference
+
+
+def test_noise_below_threshold_stays_static():
+    gate = MotionGate(pixel_threshold=12)
+    gate.is_static(frame(100))
+    assert gate.is_static(frame(108))
+
+
+def test_max_skip_forces_a_refresh():
+    gate = MotionGate(max_skip=3)
+    gate.is_static(frame())
+    assert [gate.is_static(frame()) for _ in range(4)] == [True, True, True, False]
+
+
+def test_roi_ignores_motion_away_from_the_hand():
+    gate = MotionGate()
+    gate.is_static(frame())
+    gate.update_roi([[0, 20, 20], [8, 60, 60]], (240, 320))
+    elsewhere = frame()
+    elsewhere[160:240, 220:320] = 255
+    assert gate.is_static(elsewhere)
+    near_hand = frame()
+    near_hand[20:60, 20:60] = 255
+    assert not gate.is_static(near_hand)
+
+
+def test_mirrored_roi_is_flipped_into_frame_coordinates():
+    gate = MotionGate(roi_margin=0.0)
+    gate.update_roi([[0, 10, 10], [8, 70, 50]], (240, 320), mirrored=True)
+    x0, y0, x1, y1 = gate.roi
+    assert x0 == pytest.approx(1 - 80 / 320) and x1 == pytest.approx(1 - 0 / 320)
+    gate.update_roi([], (240, 320))
+    assert gate.roi is None
@@ -0,0 +1,80 @@
+# test_performance_monitor.py
+import threading
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+from PerformanceMonitor import CROSS_THREAD_STAGES, PerformanceMonitor, TimingRing
+
+
+def test_empty_ring_reports_zero():
+    ring = TimingRing(4)
+    assert len(ring) == 0
+    assert ring.last() == ring.mean() == ring.max() == 0.0
+    assert ring.values().size == 0
+
+
+def test_ring_wraps_and_keeps_newest_samples_in_order():
+    ring = TimingRing(4)
+    for value in range(1, 7):
+        ring.push(float(value))
+    assert len(ring) == 4
+    assert ring.values().tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert ring.last() == 6.0
+    assert ring.mean() == 4.5
+    assert ring.max() == 6.0
+
+
+def test_ring_clear():
+    ring = TimingRing(3)
+    ring.push(1.0)
+    ring.clear()
+    assert len(ring) == 0
+    ring.push(2.0)
+    assert ring.values().tolist() == [2.0]
+
+
+def test_record_stores_milliseconds_per_stage():
+    monitor = PerformanceMonitor(target_fps=30, capacity=8)
+    try:
+        monitor.record('hands.process', 0.004)
+        monitor.record('hands.process', 0.006)
+        assert monitor.stage('hands.process').values().tolist() == pytest.approx([4.0, 6.0])
+    finally:
+        monitor.close()
+
+
+def test_cross_thread_stages_exist_up_front_and_hide_until_recorded():
+    monitor = PerformanceMonitor(target_fps=30, capacity=8)
+    try:
+        assert set(CROSS_THREAD_STAGES) <= set(monitor.stages)
+        assert 'hands.async_latency' not in monitor.summary()['stages']
+        monitor.record('hands.async_latency', 0.010)
+        assert monitor.summary()['stages']['hands.async_latency'] == 10.0
+    finally:
+        monitor.close()
+
+
+def test_overlay_survives_stages_added_from_another_thread():
+    monitor = PerformanceMonitor(target_fps=30, capacity=8)
+    monitor.overlay_enabled = True
+    img = np.zeros((480, 640, 3), np.uint8)
+    stop = threading.Event()
+
+    def add_stages():
+        i = 0
+        while not stop.is_set():
+            monitor.record(f"worker.{i}", 0.001)
+            monitor.set_gauge(f"gauge.{i}", i)
+            i += 1
+
+    worker = threading.Thread(target=add_stages)
+    worker.start()
+    try:
+        for _ in range(200):
+            monitor.draw_overlay(img)
+            monitor.summary()
+    finally:
+        stop.set()
+        worker.join()
+        monitor.close()
@@ -0,0 +1,76 @@
+# test_tasks_hand_detector.py
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mediapipe")
+from HandTrackingModule import TasksHandDetector
+
+
+class FakeLandmarker:
+    """Stands in for HandLandmarker: records submissions, optionally fails or answers at once"""
+
+    def __init__(self):
+        self.submitted = []
+        self.fail = False
+        self.on_submit = None
+
+    def detect_async(self, image, timestamp):
+        if self.fail:
+            raise RuntimeError("graph error")
+        self.submitted.append(timestamp)
+        if self.on_submit is not None:
+            self.on_submit(timestamp)
+
+    def close(self):
+        pass
+
+
+class FakeTasksDetector(TasksHandDetector):
+    def _create_hands(self):
+        return FakeLandmarker()
+
+
+@pytest.fixture
+def detector(tmp_path):
+    model = tmp_path / "hand_landmarker.task"
+    model.write_bytes(b"")
+    detector = FakeTasksDetector(model_path=str(model), pending_timeout=0.05)
+    yield detector
+    detector.cleanup()
+
+
+def frame():
+    return np.zeros((48, 64, 3), np.uint8)
+
+
+def test_failed_submit_does_not_leave_a_frame_pending(detector):
+    detector.hands.fail = True
+    with pytest.raises(RuntimeError):
+        detector._process(frame())
+    assert not detector._pending
+    detector.hands.fail = False
+    detector._process(frame())
+    assert len(detector.hands.submitted) == 1
+
+
+def test_frames_are_dropped_while_a_result_is_in_flight(detector):
+    detector._process(frame())
+    detector._process(frame())
+    assert len(detector.hands.submitted) == 1
+    detector._on_result(None, None, detector.hands.submitted[0])
+    detector._process(frame())
+    assert len(detector.hands.submitted) == 2
+
+
+def test_lost_result_expires_after_the_timeout(detector):
+    detector._process(frame())
+    time.sleep(0.06)
+    detector._process(frame())
+    assert len(detector.hands.submitted) == 2
+
+
+def test_result_delivered_during_submit_is_not_pending(detector):
+    detector.hands.on_submit = lambda timestamp: detector._on_result(None, None, timestamp)
+    detector._process(frame())
+    assert not detector._pending
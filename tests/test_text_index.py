@@ -0,0 +1,41 @@
+# test_text_index.py
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("numpy")
+import TextIndex
+from TextIndex import TextGridIndex
+from TextObjectStore import TextObject
+
+
+def test_hit_returns_topmost_box():
+    index = TextGridIndex(cell_size=64)
+    index.insert(1, (10, 10, 100, 40))
+    index.insert(2, (50, 20, 200, 60))
+    assert index.hit(20, 20) == 1
+    assert index.hit(60, 30) == 2  # Overlap - the later (topmost) box wins
+    assert index.hit(150, 55) == 2
+
+
+def test_hit_misses_outside_boxes_and_in_empty_cells():
+    index = TextGridIndex(cell_size=64)
+    index.insert(1, (10, 10, 100, 40))
+    assert index.hit(5, 5) is None  # Same cell, outside the box
+    assert index.hit(500, 500) is None  # No candidates at all
+
+
+def test_boxes_spanning_cells_are_found_in_each():
+    index = TextGridIndex(cell_size=32)
+    index.insert(7, (0, 0, 200, 10))
+    assert all(index.hit(x, 5) == 7 for x in (0, 40, 100, 199))
+
+
+def test_built_from_objects_in_draw_order(monkeypatch):
+    monkeypatch.setattr(TextIndex, "text_metrics", lambda text, font, scale, thickness: (10 * len(text), 20))
+    objects = [TextObject(1, "long label", (0, 100), (0, 0, 0), 0, 1.0, 2),
+               TextObject(2, "top", (20, 100), (0, 0, 0), 0, 1.0, 2)]
+    index = TextGridIndex(objects)
+    assert len(index) == 2
+    assert index.hit(25, 90) == 2
+    assert index.hit(80, 90) == 1
+    assert index.hit(25, 101) is None  # Below the baseline
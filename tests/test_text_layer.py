@@ -0,0 +1,72 @@
+# test_text_layer.py
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+from CanvasLayers import Layer
+from KeyboardInput import KeyboardInput
+
+SHAPE = (720, 1280)
+
+
+def full_render(keyboard):
+    layer = Layer("expected", SHAPE)
+    keyboard.draw_labels(layer.image, layer.mask)
+    return layer
+
+
+def add_labels(keyboard, count=10):
+    return [keyboard.text_objects.add(f"label {i}", (60 + 110 * i, 120 + 50 * i), (255, 255, 255),
+                                      cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2) for i in range(count)]
+
+
+def assert_matches_full_render(keyboard, layer):
+    expected = full_render(keyboard)
+    assert np.array_equal(layer.image, expected.image)
+    assert np.array_equal(layer.mask, expected.mask)
+
+
+def test_drag_redraws_only_the_moved_label():
+    keyboard = KeyboardInput()
+    ids = add_labels(keyboard)
+    layer = Layer("text", SHAPE)
+    keyboard.render_layer(layer)
+    version = layer.version
+
+    # Drag over an overlapping neighbour, frame by frame
+    for step in range(1, 6):
+        keyboard.text_objects.update(ids[3], position=(390 + 20 * step, 270 + 5 * step))
+        assert keyboard.render_layer(layer)
+        assert_matches_full_render(keyboard, layer)
+    assert len(layer.changed_tiles(version)) < layer.grid.count // 4
+
+
+def test_edits_removals_and_offscreen_moves_match_a_full_render():
+    keyboard = KeyboardInput()
+    ids = add_labels(keyboard)
+    layer = Layer("text", SHAPE)
+    keyboard.render_layer(layer)
+    keyboard.text_objects.update(ids[0], text="label 0 edited")
+    keyboard.render_layer(layer)
+    keyboard.text_objects.remove(ids[5])
+    keyboard.render_layer(layer)
+    keyboard.text_objects.update(ids[9], position=(1250, 700))
+    keyboard.render_layer(layer)
+    keyboard.text_objects.update(ids[9], position=(5000, 5000))
+    keyboard.render_layer(layer)
+    assert_matches_full_render(keyboard, layer)
+    assert not keyboard.render_layer(layer)  # Nothing changed since
+
+
+def test_many_changes_fall_back_to_a_full_redraw():
+    keyboard = KeyboardInput()
+    add_labels(keyboard)
+    layer = Layer("text", SHAPE)
+    keyboard.render_layer(layer)
+    snapshot = keyboard.text_objects.snapshot()
+    keyboard.text_objects.clear()
+    keyboard.render_layer(layer)
+    assert not layer.image.any()
+    keyboard.text_objects.restore(snapshot)
+    keyboard.render_layer(layer)
+    assert_matches_full_render(keyboard, layer)
@@ -0,0 +1,51 @@
+# test_text_object_store.py
+from TextObjectStore import TextObjectStore
+
+
+def add(store, text, position=(100, 200)):
+    return store.add(text, position, (255, 255, 255), 0, 1.0, 2)
+
+
+def test_snapshot_is_isolated_from_later_changes():
+    store = TextObjectStore()
+    first = add(store, "hello")
+    snapshot = store.snapshot()
+    second = add(store, "world")
+    store.update(first, text="hi")
+    store.remove(second)
+
+    assert list(snapshot) == [first]
+    assert snapshot[first].text == "hello"
+    assert store.get(first).text == "hi"
+
+
+def test_restore_keeps_ids_and_clears_selection():
+    store = TextObjectStore()
+    first = add(store, "a")
+    snapshot = store.snapshot()
+    add(store, "b")
+    store.select(first)
+    store.restore(snapshot)
+
+    assert [obj.text for obj in store] == ["a"]
+    assert store.get(first).text == "a"
+    assert store.selected is None
+
+
+def test_restored_snapshot_is_copied_before_writing():
+    store = TextObjectStore()
+    first = add(store, "a")
+    snapshot = store.snapshot()
+    store.restore(snapshot)
+    store.update(first, position=(10, 10))
+    assert snapshot[first].position == (100, 200)
+
+
+def test_version_bumps_on_every_change():
+    store = TextObjectStore()
+    version = store.version
+    object_id = add(store, "a")
+    store.update(object_id, text="b")
+    store.remove(object_id)
+    assert store.version == version + 3
+    assert store.remove(object_id) is False
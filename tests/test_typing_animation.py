@@ -0,0 +1,57 @@
+# test_typing_animation.py
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("numpy")
+import TypingAnimation
+from TypingAnimation import PrefixWidths
+
+
+@pytest.fixture
+def measured(monkeypatch):
+    """Fake metrics (10 px per character) that record every measured string"""
+    calls = []
+
+    def text_metrics(text, font, scale, thickness):
+        calls.append(text)
+        return (10 * len(text), 20)
+
+    monkeypatch.setattr(TypingAnimation, "text_metrics", text_metrics)
+    return calls
+
+
+def test_typing_measures_only_new_prefixes(measured):
+    widths = PrefixWidths(0, 1.0, 2)
+    widths.update("ab")
+    widths.update("abc")
+    assert measured == ["a", "ab", "abc"]
+    assert widths.width() == 30
+    assert widths.width(1) == 10
+
+
+def test_backspace_drops_prefixes_without_measuring(measured):
+    widths = PrefixWidths(0, 1.0, 2)
+    widths.update("hello")
+    del measured[:]
+    widths.update("hel")
+    assert measured == []
+    assert widths.widths == [0, 10, 20, 30]
+    assert widths.width() == 30
+
+
+def test_typing_after_backspace_continues_from_the_shorter_text(measured):
+    widths = PrefixWidths(0, 1.0, 2)
+    widths.update("hello")
+    widths.update("he")
+    widths.update("hey")
+    assert widths.widths == [0, 10, 20, 30]
+    assert measured[-1] == "hey"
+
+
+def test_replaced_text_is_measured_from_scratch(measured):
+    widths = PrefixWidths(0, 1.0, 2)
+    widths.update("cat")
+    widths.update("dog")
+    assert widths.widths == [0, 10, 20, 30]
+    widths.update("")
+    assert widths.width() == 0